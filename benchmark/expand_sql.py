@@ -0,0 +1,72 @@
+import os
+import sys
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool.helper import *
+from tool.generator import DashboardGenerator, load_dashboard_jobs
+from tool.sql_expander import GrafanaSQLExpander, iter_panel_sql, fetch_variable_options, ALL_VALUE
+
+"""
+This script prints the panel SQL of a dashboard as plain SQL, with the Grafana macros and variables expanded. -> tool/sql_expander.py
+    - The output can be run or `EXPLAIN`ed with psql, e.g. `python benchmark/expand_sql.py "General Info" | psql ...`.
+    - The variables keep the dashboard's current values ('All' for the dropdowns) unless set with `--var`.
+    - 'All' of a dropdown without a custom all value needs its options: `--option name=a,b,c`,
+      or `--fetch-options` to run the variable queries with psql like Grafana does.
+
+Usage: python benchmark/expand_sql.py TITLE [--panel TITLE] [--from now-6h] [--to now] [--var name=a,b] [--option name=a,b] [--fetch-options] [--interval 5m]
+"""
+
+def parse_assignments(items: list) -> dict:
+    """Parse `name=a,b` into {name: [a, b]}, `name=` into {name: ""} and `name=All` into {name: ALL_VALUE}.
+    """
+    values = {}
+    for item in items or []:
+        name, _, value = item.partition("=")
+        if value == "All":
+            values[name] = ALL_VALUE
+        elif "," in value:
+            values[name] = value.split(",")
+        else:
+            values[name] = value
+    return values
+
+def main():
+    parser = argparse.ArgumentParser(description="Expand the Grafana macros and variables of a dashboard's panel SQL.")
+    parser.add_argument("title", help="dashboard title, as in the config yaml")
+    parser.add_argument("--panel", help="only the panels with this title")
+    parser.add_argument("--from", dest="time_from", default="now-6h")
+    parser.add_argument("--to", dest="time_to", default="now")
+    parser.add_argument("--var", action="append", help="variable value(s): name=a or name=a,b or name=All")
+    parser.add_argument("--option", action="append", help="every value of a dropdown, for 'All': name=a,b,c")
+    parser.add_argument("--fetch-options", action="store_true", help="read the options of the dropdowns from the database with psql")
+    parser.add_argument("--interval", help="$__interval, e.g. 5m (default: from the time range)")
+    args = parser.parse_args()
+
+    job = next((dashboard for folder, dashboard in load_dashboard_jobs() if dashboard["title"] == args.title), None)
+    if job is None:
+        print(f"[ERROR] Dashboard not found: {args.title}")
+        sys.exit(1)
+
+    dashboard_json = DashboardGenerator().generate(job)
+    options = {name: value if isinstance(value, list) else [value] for name, value in parse_assignments(args.option).items()}
+    expander = GrafanaSQLExpander.for_dashboard(
+        dashboard_json, time_from=args.time_from, time_to=args.time_to,
+        variables=parse_assignments(args.var), options=options, interval=args.interval
+    )
+    if args.fetch_options:
+        expander.options = {**fetch_variable_options(dashboard_json, expander), **options}
+
+    for panel_title, sql in iter_panel_sql(dashboard_json):
+        if args.panel and panel_title != args.panel:
+            continue
+        try:
+            expanded = expander.expand(sql)
+        except (KeyError, ValueError) as e:
+            print(f"-- [SKIPPED] {panel_title} | Reason: {e}\n")
+            continue
+        print(f"-- {args.title} / {panel_title} (key {expander.cache_key(sql)})\n{expanded.strip().rstrip(';')};\n")
+
+
+if __name__ == "__main__":
+    main()
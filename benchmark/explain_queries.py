@@ -0,0 +1,71 @@
+import os
+import sys
+import argparse
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool.helper import *
+from tool.generator import load_dashboard_jobs
+from tool.query_benchmark import run_benchmark, save_report, load_report, compare_reports, print_comparison
+
+"""
+This script measures every panel and template variable query with `EXPLAIN (ANALYZE, BUFFERS)`. -> tool/query_benchmark.py
+    - Run it against a local copy of the database (`--dsn`), not production: every query is executed `runs` times.
+    - `--create-schema` first creates the tables of tool/postgres_tables in that database.
+    - The report (planning / execution time, rows, buffers per query) is saved to `benchmark/results/explain_<time>.json` and `.csv`,
+      and compared with the baseline `benchmark/explain_baseline.json` if it exists. `--save-baseline` replaces the baseline.
+    - Exit with code 1 if a query is `--threshold` times slower than in the baseline.
+
+Usage: python benchmark/explain_queries.py [--dsn DSN] [--create-schema] [--dashboard TITLE] [--from now-90d] [--to now] [--var name=value] [--runs 3] [--save-baseline]
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE every generated query and compare with a baseline.")
+    parser.add_argument("--dsn", help="database to run on, e.g. postgresql://postgres@localhost/hgcdb_bench (default: db_conn.yaml)")
+    parser.add_argument("--create-schema", action="store_true", help="create the tables of tool/postgres_tables first")
+    parser.add_argument("--dashboard", action="append", help="only these dashboards (title)")
+    parser.add_argument("--from", dest="time_from", default="now-90d")
+    parser.add_argument("--to", dest="time_to", default="now")
+    parser.add_argument("--var", action="append", help="variable value for every dashboard: name=value, e.g. a module name for the textboxes")
+    parser.add_argument("--runs", type=int, default=3, help="runs per query, the median time is kept")
+    parser.add_argument("--timeout", type=int, default=60, help="statement timeout per query, in seconds")
+    parser.add_argument("--baseline", default=EXPLAIN_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=1.5)
+    args = parser.parse_args()
+
+    if args.create_schema:
+        from tool.schema import get_schema_catalog
+        from tool.latest_views import run_psql
+
+        result = run_psql(get_schema_catalog().create_schema_sql(), dsn=args.dsn)
+        if result.returncode != 0:
+            print(f"[ERROR] Failed to create the schema | Reason: {result.stderr.strip()}")
+            sys.exit(1)
+        print("[Benchmark] Schema created")
+
+    jobs = [job for job in load_dashboard_jobs() if not args.dashboard or job[1]["title"] in args.dashboard]
+    variables = dict(item.partition("=")[::2] for item in args.var or [])
+
+    results = run_benchmark(jobs, args.dsn, variables, args.time_from, args.time_to, args.runs, args.timeout)
+    meta = {"time_from": args.time_from, "time_to": args.time_to, "runs": args.runs, "variables": variables}
+    save_report(results, os.path.join(BENCHMARK_RESULTS_PATH, f"explain_{datetime.now():%Y%m%d_%H%M%S}"), meta)
+
+    slowest = sorted((r for r in results if r.execution_ms is not None), key=lambda r: -r.execution_ms)[:10]
+    for result in slowest:
+        print(f"[Benchmark] Slowest: {result.label} | {result.execution_ms:.1f} ms, {result.shared_read} buffers read")
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        diff = compare_reports(results, load_report(args.baseline), args.threshold)
+        print_comparison(diff)
+        regressions = diff["regressions"]
+
+    if args.save_baseline:
+        save_report(results, args.baseline, meta)
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
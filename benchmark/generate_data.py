@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool.helper import *
+from tool.data_generator import SyntheticDatabase
+
+"""
+This script fills a local database with synthetic HGCDB data, for `explain_queries.py` and `views/create_indexes.py`. -> tool/data_generator.py
+    - Run it against a local benchmark database (`--dsn`), never production: the tables are filled (and emptied with `--truncate`).
+    - `--create-schema` first creates the tables of tool/postgres_tables in that database.
+    - Production scale, e.g. `--modules 50000 --tests 3 --log-days 180` (about 30M log rows); the defaults make a small database quickly.
+    - `--csv-dir DIR --csv-only` only writes the COPY files, e.g. to load them elsewhere with `\\copy`.
+
+Usage: python benchmark/generate_data.py --dsn DSN [--create-schema] [--truncate] [--modules 1000] [--tests 2] [--log-days 30] [--log-interval 60] [--seed 0]
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a database with synthetic HGCDB data.")
+    parser.add_argument("--dsn", help="database to fill, e.g. postgresql://postgres@localhost/hgcdb_bench")
+    parser.add_argument("--create-schema", action="store_true", help="create the tables of tool/postgres_tables first")
+    parser.add_argument("--truncate", action="store_true", help="empty the tables first")
+    parser.add_argument("--modules", type=int, default=1000, help="modules, each with its proto-module, hexaboard, baseplate and sensor")
+    parser.add_argument("--tests", type=int, default=2, help="average rows per part of the test tables")
+    parser.add_argument("--history-days", type=int, default=365, help="the modules are assembled over these last days")
+    parser.add_argument("--log-days", type=int, default=30, help="days of environment and MMTS sensor logs")
+    parser.add_argument("--log-interval", type=int, default=60, help="seconds between two log rows of a device")
+    parser.add_argument("--channels", type=int, default=0, help="length of the per-channel arrays (default: 222 LD / 444 HD full module)")
+    parser.add_argument("--blob-bytes", type=int, default=1024, help="size of the plots")
+    parser.add_argument("--other-rows", type=int, default=100, help="rows of the other tables, e.g. mmts_inventory")
+    parser.add_argument("--table", action="append", help="only these tables")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv-dir", help="keep the COPY files in this folder")
+    parser.add_argument("--csv-only", action="store_true", help="only write the COPY files (needs --csv-dir)")
+    args = parser.parse_args()
+
+    if args.csv_only and not args.csv_dir:
+        parser.error("--csv-only needs --csv-dir")
+    if not args.csv_only and not args.dsn:
+        parser.error("--dsn is required to load the data (the db_conn.yaml database is not filled by accident)")
+
+    if args.create_schema and not args.csv_only:
+        from tool.schema import get_schema_catalog
+        from tool.latest_views import run_psql
+
+        result = run_psql(get_schema_catalog().create_schema_sql(), dsn=args.dsn)
+        if result.returncode != 0:
+            print(f"[ERROR] Failed to create the schema | Reason: {result.stderr.strip()}")
+            sys.exit(1)
+        print("[Data] Schema created")
+
+    database = SyntheticDatabase(
+        modules=args.modules, tests=args.tests, history_days=args.history_days, log_days=args.log_days, log_interval=args.log_interval,
+        channels=args.channels, blob_bytes=args.blob_bytes, other_rows=args.other_rows, seed=args.seed,
+    )
+
+    began = time.time()
+    try:
+        counts = database.load(args.dsn, args.table, args.csv_dir, load=not args.csv_only, truncate=args.truncate)
+    except (RuntimeError, FileNotFoundError) as e:
+        print(f"[ERROR] Failed to load the data | Reason: {e}")
+        sys.exit(1)
+
+    print(f"[Data] {sum(counts.values())} rows in {len(counts)} tables ({time.time() - began:.0f}s)")
+
+
+if __name__ == "__main__":
+    main()
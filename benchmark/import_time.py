@@ -0,0 +1,55 @@
+import os
+import sys
+import argparse
+import subprocess
+import tempfile
+
+"""
+This script measures how long `import tool.builders.sql_builder` takes in a fresh interpreter.
+    - The import runs from an empty folder, so it must not need `db_conn.yaml` / `gf_conn.yaml`.
+    - Exit with code 1 if the median import time is over the threshold.
+
+Usage: python benchmark/import_time.py [threshold_ms] [runs]
+"""
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULE = "tool.builders.sql_builder"
+
+# time only the import, not the interpreter start up
+SNIPPET = f"""
+import sys, time
+sys.path.insert(0, {ROOT_PATH!r})
+start = time.perf_counter()
+import {MODULE}
+print((time.perf_counter() - start) * 1000)
+"""
+
+def time_import(cwd: str) -> float:
+    """Import the module once in a new interpreter and return the import time in ms.
+    """
+    result = subprocess.run([sys.executable, "-c", SNIPPET], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"[ERROR] import {MODULE} failed:\n{result.stderr}")
+        sys.exit(1)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Measure the import time of {MODULE}.")
+    parser.add_argument("threshold_ms", nargs="?", type=float, default=50, help="maximum median import time")
+    parser.add_argument("runs", nargs="?", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as empty_folder:
+        timings = sorted(time_import(empty_folder) for _ in range(args.runs))
+
+    median = timings[len(timings) // 2]
+    print(f"[Import] {MODULE}: median {median:.1f} ms, min {timings[0]:.1f} ms, max {timings[-1]:.1f} ms ({args.runs} runs)")
+
+    if median > args.threshold_ms:
+        print(f"[ERROR] Import time over the {args.threshold_ms:.0f} ms threshold")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,12 @@ gf_conn = {
     # Things might need to change:
     'GF_PORT': '3000', # default 
     'GF_PROTOCAL': 'http', # default
+    'GF_POOL_SIZE': 10, # number of keep-alive connections to Grafana
+    'GF_TIMEOUT': 30, # seconds per request
+    'GF_MAX_RETRIES': 5, # retries on 429/5xx/connection resets, with exponential backoff
+    'GF_UPLOAD_WORKERS': 10, # max dashboards uploaded in parallel
+    'GF_BUILD_WORKERS': None, # dashboards built in parallel, None = number of cores
+    'GF_BUILD_MODE': 'process', # 'process', 'thread' or 'inline'
 
     # Things will be auto-updated:
     'GF_USER': 'admin', # default
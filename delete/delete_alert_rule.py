@@ -3,6 +3,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tool.helper import *
+from tool.helper import client
 
 """
 This script is used to delete an alert rule from Grafana based on user requested UID.
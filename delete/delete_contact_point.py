@@ -3,6 +3,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tool.helper import *
+from tool.helper import client
 
 result = client.list_contact_points_uid()
 print(f" >> Existing contact points uids: {result} \n")
@@ -1,10 +1,6 @@
-import os
-import subprocess
-from time import sleep
-
-import yaml
-
 from tool.helper import *
+from tool.helper import gf_conn
+from tool.pipeline import Pipeline
 
 """
 This file does EVERYTHING for you.
@@ -28,29 +24,17 @@ def main():
 
     run_times = int(gf_conn.get('GF_RUN_TIMES'))
 
+    # every stage runs in this process and shares one client and one parsed config
+    pipeline = Pipeline()
+
     # First run
     if run_times == 0:
         print(" >> First run, preSteps will be executed.\n")
-
-        # preSteps in order
-        subprocess.run(["python", "./preSteps/get_api_key.py"], check=True)
-        sleep(0.5)    # wait for token to be generated
-
-        # rebuild GrafanaClient with new token
-        gf_conn.reload()
-        new_token = gf_conn.get("GF_API_KEY")
-        client = GrafanaClient(new_token, GF_URL)
-
-        subprocess.run(["python", "./preSteps/add_dbsource.py"], check=True)
-
     else:
         print(" >>>> preSteps skipped.\n")
 
-    # Everything Need To Generate
-    subprocess.run(["python3", "create/create_folders.py"], check=True)
-    sleep(0.5)    # wait for folders to be added
-    subprocess.run(["python3", "create/create_dashboards.py"], check=True)
-    # subprocess.run(["python", "create/create_alerts.py"], check=True)
+    # Everything Need To Generate (alerts are not generated for now)
+    pipeline.run(first_run=(run_times == 0), alerts=False)
 
     # Add run times
     gf_conn.set('GF_RUN_TIMES', run_times + 1)
@@ -2,16 +2,16 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from tool.helper import *
+from tool.pipeline import Pipeline
 
 """
 Add the PostgreSQL data source to Grafana as default.
+    - The logic lives in `Pipeline.add_datasource` (tool/pipeline.py).
 """
 
-# reload info
-gf_conn.reload()
+def main():
+    Pipeline().add_datasource()
 
-datasource_name = gf_conn.get('GF_DATA_SOURCE_NAME')
-datasource_uid  = gf_conn.get('GF_DATA_SOURCE_UID')
 
-client.add_postgres_datasource(datasource_name, datasource_uid, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from tool.schema import SchemaCatalog
+
+@pytest.fixture(scope="session")
+def catalog() -> SchemaCatalog:
+    """The table definitions of tool/postgres_tables, parsed without the on-disk cache.
+    """
+    return SchemaCatalog(cache_path=None)
@@ -0,0 +1,83 @@
+from tool.index_advisor import IndexAdvisor, IndexCandidate, MAX_NAME_LENGTH
+
+
+# ============================================================
+# === IndexCandidate =========================================
+# ============================================================
+
+def test_name_joins_the_table_and_keys_without_the_sort_order():
+    assert IndexCandidate("module_info", ("module_name", "module_no DESC")).name == "module_info_module_name_module_no_idx"
+
+def test_name_suffix_follows_the_method():
+    assert IndexCandidate("mmts_sensors_logging", ("log_timestamp",), "brin").name == "mmts_sensors_logging_log_timestamp_brin"
+    assert IndexCandidate("module_iv_test", ("batch_name",), "gin").name == "module_iv_test_batch_name_trgm"
+
+def test_name_of_an_expression_key_keeps_its_words():
+    candidate = IndexCandidate("module_inspect", ("(date_inspect + time_inspect)",))
+
+    assert candidate.name == "module_inspect_date_inspect_time_inspect_idx"
+
+def test_long_names_are_truncated_with_a_stable_hash():
+    keys = ("module_name", "xml_upload_success", "mod_pedtest_no DESC")
+    name = IndexCandidate("module_pedestal_test", keys).name
+
+    assert len(name) == MAX_NAME_LENGTH
+    assert name.startswith("module_pedestal_test_module_name_xml_upload_success_")
+    assert name == IndexCandidate("module_pedestal_test", keys).name
+    assert name != IndexCandidate("module_pedestal_test", keys[:2] + ("mod_pedtest_no",), "brin").name
+
+def test_create_sql():
+    assert IndexCandidate("module_info", ("assembled",)).create_sql() == \
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS module_info_assembled_idx ON module_info (assembled);"
+    assert IndexCandidate("sensor", ("sen_name",), "gin").create_sql(concurrently=False) == \
+        "CREATE INDEX IF NOT EXISTS sensor_sen_name_trgm ON sensor USING gin (sen_name gin_trgm_ops);"
+
+
+# ============================================================
+# === IndexAdvisor.recommend =================================
+# ============================================================
+
+def test_recommend_drops_filters_on_enum_like_columns(catalog):
+    advisor = IndexAdvisor(catalog)
+    advisor.analyze("SELECT * FROM module_info WHERE module_info.geometry = ANY(ARRAY['Full'])", "derived")
+    advisor.analyze("SELECT DISTINCT status_desc FROM module_iv_test", "dropdown")
+    advisor.analyze("SELECT * FROM module_iv_test WHERE module_iv_test.status_desc = 'Bolted'", "dropdown")
+    advisor.analyze("SELECT * FROM module_info WHERE module_info.hxb_name = 'X'", "identifier")
+
+    assert [c.name for c in advisor.recommend(min_queries=1)] == ["module_info_hxb_name_idx"]
+
+def test_recommend_keeps_an_enum_like_column_that_serves_a_join(catalog):
+    advisor = IndexAdvisor(catalog)
+    advisor.analyze("SELECT * FROM module_info WHERE module_info.geometry = 'Full'", "a")
+    advisor.analyze("SELECT * FROM module_info JOIN hexaboard ON module_info.geometry = hexaboard.geometry", "b")
+
+    names = [c.name for c in advisor.recommend(min_queries=1)]
+
+    assert "module_info_geometry_idx" in names
+
+def test_recommend_folds_a_btree_into_the_shorter_one_it_extends(catalog):
+    advisor = IndexAdvisor(catalog)
+    advisor._add("module_info", ("module_name", "module_no DESC"), "btree", "distinct on", "a")
+    advisor._add("module_info", ("module_name", "xml_upload_success", "module_no DESC"), "btree", "distinct on", "b")
+    advisor._add("module_info", ("module_name", "xml_upload_success", "assembled"), "btree", "distinct on", "c")
+
+    recommended = {c.keys: c.sources for c in advisor.recommend(min_queries=1)}
+
+    assert recommended == {
+        ("module_name", "module_no DESC"): ["a", "b"],
+        ("module_name", "xml_upload_success", "assembled"): ["c"],
+    }
+
+def test_recommend_skips_the_primary_key_and_rare_indexes(catalog):
+    advisor = IndexAdvisor(catalog)
+    advisor.analyze("SELECT * FROM module_info WHERE module_info.module_no = 1", "a")
+    advisor.analyze("SELECT * FROM module_info WHERE module_info.hxb_name = 'X'", "a")
+
+    assert [c.name for c in advisor.recommend(min_queries=1)] == ["module_info_hxb_name_idx"]
+    assert advisor.recommend(min_queries=2) == []
+
+def test_analyze_sees_a_joined_table_without_alias(catalog):
+    advisor = IndexAdvisor(catalog)
+    advisor.analyze("SELECT * FROM module_info JOIN hexaboard ON module_info.hxb_name = hexaboard.hxb_name", "a")
+
+    assert {key[:2] for key in advisor.candidates} == {("module_info", ("hxb_name",)), ("hexaboard", ("hxb_name",))}
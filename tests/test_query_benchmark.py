@@ -0,0 +1,47 @@
+from tool.query_benchmark import QueryResult, compare_reports, load_report, save_report
+
+
+def result(query: str, execution_ms: float = None, key: str = "k", error: str = None) -> QueryResult:
+    return QueryResult("Modules", query, "panel", key=key, planning_ms=1.0, execution_ms=execution_ms, error=error)
+
+
+def test_regressions_and_improvements_need_the_threshold():
+    baseline = [result("slower", 10), result("faster", 30), result("same", 10), result("a bit slower", 10)]
+    results = [result("slower", 16), result("faster", 20), result("same", 11), result("a bit slower", 14)]
+
+    diff = compare_reports(results, baseline, threshold=1.5)
+
+    assert diff["regressions"] == [("Modules / slower", 10, 16)]
+    assert diff["improvements"] == [("Modules / faster", 30, 20)]
+
+def test_small_differences_are_timing_noise():
+    diff = compare_reports([result("tiny", 3)], [result("tiny", 0.5)], threshold=1.5, min_ms=5)
+
+    assert diff["regressions"] == []
+
+def test_changed_added_removed_and_failing():
+    baseline = [result("edited", 10, key="a"), result("dropped", 10), result("broken", 10)]
+    results = [result("edited", 10, key="b"), result("new", 10), result("broken", error="syntax error")]
+
+    diff = compare_reports(results, baseline)
+
+    assert diff["changed"] == ["Modules / edited"]
+    assert diff["added"] == ["Modules / new"]
+    assert diff["removed"] == ["Modules / dropped"]
+    assert diff["failing"] == ["Modules / broken"]
+    assert diff["regressions"] == diff["improvements"] == []
+
+def test_baseline_without_timing_is_skipped():
+    diff = compare_reports([result("q", 100)], [result("q", error="timeout")])
+
+    assert diff["regressions"] == []
+
+def test_report_round_trip(tmp_path):
+    path = str(tmp_path / "report.json")
+    save_report([result("q", 12.5)], path, {"time_from": "now-90d"})
+
+    [loaded] = load_report(path)
+
+    assert loaded.label == "Modules / q"
+    assert loaded.execution_ms == 12.5
+    assert (tmp_path / "report.csv").exists()
@@ -0,0 +1,18 @@
+def test_stable_columns_are_the_distinct_key_and_the_serial_derived_columns(catalog):
+    assert catalog.stable_columns("baseplate", ["bp_name"]) == {"bp_name", "bp_material", "geometry", "resolution"}
+    assert catalog.stable_columns("hexaboard", ["hxb_name"]) == {"hxb_name", "geometry", "resolution", "roc_version"}
+    assert catalog.stable_columns("sensor", ["sen_name"]) == {"sen_name", "geometry", "resolution", "thickness"}
+
+def test_stable_columns_exclude_the_other_columns_of_a_component_table(catalog):
+    stable = catalog.stable_columns("module_info", ["module_name"])
+
+    assert catalog.is_component_table("module_info")
+    assert stable == {"module_name"}
+    assert "assembled" not in stable
+
+def test_stable_columns_of_an_unknown_table_are_the_distinct_key(catalog):
+    assert catalog.stable_columns("latest_module_info", ["module_name"]) == {"module_name"}
+
+def test_derived_columns_come_from_the_csv_description(catalog):
+    assert sorted(catalog.table("baseplate").derived) == ["bp_material", "geometry", "resolution"]
+    assert catalog.table("module_info").derived == []
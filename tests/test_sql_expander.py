@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from tool.sql_expander import ALL_VALUE, GrafanaSQLExpander, format_interval, parse_interval, round_interval
+
+NOW = datetime(2026, 1, 2, 12, 0, tzinfo=timezone.utc)
+
+TEMPLATING = [
+    {"name": "module", "current": {"value": "320MLF3W2CM0101"}},
+    {"name": "status", "multi": True, "includeAll": True, "current": {"value": ALL_VALUE},
+     "options": [{"value": ALL_VALUE}, {"value": "Bolted"}, {"value": "Encapsulated"}]},
+    {"name": "geometry", "includeAll": True, "allValue": "geometry", "current": {"value": ALL_VALUE}},
+]
+
+
+def expander(**kwargs) -> GrafanaSQLExpander:
+    return GrafanaSQLExpander(time_from="now-6h", time_to="now", templating=TEMPLATING, now=NOW, **kwargs)
+
+
+# ============================================================
+# === Macros =================================================
+# ============================================================
+
+def test_time_filter_and_range():
+    sql = expander().expand("WHERE $__timeFilter(module_info.assembled) AND x > $__timeFrom() AND x < $__timeTo()")
+
+    assert sql == ("WHERE module_info.assembled BETWEEN '2026-01-02T06:00:00Z' AND '2026-01-02T12:00:00Z'"
+                   " AND x > '2026-01-02T06:00:00Z' AND x < '2026-01-02T12:00:00Z'")
+
+def test_time_group():
+    assert expander().expand("$__timeGroup(log_timestamp, '5m')") == "floor(extract(epoch from log_timestamp)/300)*300"
+    assert expander().expand("$__timeGroupAlias(log_timestamp, 1h)") == 'floor(extract(epoch from log_timestamp)/3600)*3600 AS "time"'
+
+def test_unix_epoch_filter():
+    start, end = int(NOW.timestamp()) - 6 * 3600, int(NOW.timestamp())
+
+    assert expander().expand("$__unixEpochFilter(ts)") == f"ts >= {start} AND ts <= {end}"
+
+def test_nested_macros_expand_innermost_first():
+    sql = expander().expand("$__time($__timeGroup(log_timestamp, 60))")
+
+    assert sql == 'floor(extract(epoch from log_timestamp)/60)*60 AS "time"'
+
+def test_unknown_macro_raises():
+    with pytest.raises(ValueError):
+        expander().expand("$__timeShift(x)")
+
+def test_global_variables():
+    sql = expander().expand("$__interval $__interval_ms $__range $__range_s")
+
+    assert sql == "20s 20000 6h 21600"      # 6 h / 1000 points = 21.6 s, rounded to 20 s
+    assert expander(interval="1m").expand("$__interval") == "1m"
+
+
+# ============================================================
+# === Variables ==============================================
+# ============================================================
+
+def test_single_value_is_escaped_not_quoted():
+    assert expander().expand("module_name = '$module'") == "module_name = '320MLF3W2CM0101'"
+    assert expander(variables={"module": "it's"}).expand("'${module}'") == "'it''s'"
+
+def test_all_expands_to_the_options_quoted():
+    assert expander().expand("status_desc IN ($status)") == "status_desc IN ('Bolted','Encapsulated')"
+    assert expander(options={"status": ["A"]}).expand("IN ([[status]])") == "IN ('A')"
+
+def test_custom_all_value_is_inserted_as_is():
+    assert expander().expand("geometry IN ($geometry)") == "geometry IN (geometry)"
+
+def test_formats():
+    sql = "${status:sqlstring} ${status:csv} ${status:pipe} ${status:singlequote} ${status:doublequote}"
+    expanded = expander(variables={"status": ["a'b", 'c"d']}).expand(sql)
+
+    assert expanded == "'a''b','c\"d' a'b,c\"d a'b|c\"d 'a\\'b','c\"d' \"a'b\",\"c\\\"d\""
+
+def test_unsupported_format_raises():
+    with pytest.raises(ValueError):
+        expander().expand("${module:json}")
+
+def test_unknown_variable_raises():
+    with pytest.raises(KeyError):
+        expander().expand("$missing")
+
+def test_cache_key_ignores_whitespace():
+    assert expander().cache_key("SELECT 1\n  WHERE $__timeFilter(t)") == expander().cache_key("SELECT 1 WHERE  $__timeFilter(t)")
+    assert expander().cache_key("SELECT $module") != expander(variables={"module": "X"}).cache_key("SELECT $module")
+
+
+# ============================================================
+# === Intervals ==============================================
+# ============================================================
+
+def test_intervals():
+    assert parse_interval("'500ms'") == 0.5
+    assert parse_interval("5m") == 300
+    assert round_interval(250) == 300
+    assert format_interval(300) == "5m"
+    assert format_interval(0.5) == "500ms"
+    with pytest.raises(ValueError):
+        parse_interval("five minutes")
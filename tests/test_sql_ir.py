@@ -0,0 +1,142 @@
+from tool.builders.sql_ir import SelectQuery, CTE, Join, Predicate, SelectItem, merge_duplicate_ctes, push_down_predicates, eliminate_unused_joins, optimize
+
+
+def baseplate_query(where: list = None, select: list = None) -> SelectQuery:
+    """`temp_table_0` (latest baseplate) LEFT JOIN `temp_table_1` (latest bp_inspect).
+    """
+    return SelectQuery(
+        "temp_table_0",
+        ctes=[
+            CTE("temp_table_0", "baseplate", ["bp_name"], ["bp_name", "bp_no DESC"]),
+            CTE("temp_table_1", "bp_inspect", ["bp_name"], ["bp_name", "bp_row_no DESC"]),
+        ],
+        select=select or [SelectItem("temp_table_0.bp_name", {"temp_table_0"})],
+        joins=[Join("temp_table_1", "bp_inspect", "temp_table_0", "bp_name")],
+        where=where or [],
+    )
+
+
+# ============================================================
+# === merge_duplicate_ctes ===================================
+# ============================================================
+
+def test_merge_duplicate_ctes_keeps_one_copy():
+    query = baseplate_query(select=[SelectItem("temp_table_2.grade", {"temp_table_2"})])
+    query.ctes.append(CTE("temp_table_2", "bp_inspect", ["bp_name"], ["bp_name", "bp_row_no DESC"]))
+    query.joins.append(Join("temp_table_2", "bp_inspect", "temp_table_0", "bp_name"))
+
+    merge_duplicate_ctes(query)
+
+    assert [cte.name for cte in query.ctes] == ["temp_table_0", "temp_table_1"]
+    assert [join.target for join in query.joins] == ["temp_table_1"]
+    assert query.select[0].sql == "temp_table_1.grade"
+
+def test_merge_duplicate_ctes_drops_the_self_join_on_the_distinct_key():
+    query = baseplate_query()
+    query.ctes[1] = CTE("temp_table_1", "baseplate", ["bp_name"], ["bp_name", "bp_no DESC"])
+    query.joins = [Join("temp_table_1", "baseplate", "temp_table_0", "bp_name")]
+
+    merge_duplicate_ctes(query)
+
+    assert [cte.name for cte in query.ctes] == ["temp_table_0"]
+    assert query.joins == []
+
+def test_merge_duplicate_ctes_keeps_different_filters_apart():
+    query = baseplate_query()
+    query.ctes.append(CTE("temp_table_2", "bp_inspect", ["bp_name"], ["bp_name", "bp_row_no DESC"], where=[Predicate("bp_inspect.grade = 'A'")]))
+
+    merge_duplicate_ctes(query)
+
+    assert len(query.ctes) == 3
+
+
+# ============================================================
+# === eliminate_unused_joins =================================
+# ============================================================
+
+def test_eliminate_unused_joins_drops_an_unreferenced_unique_join(catalog):
+    query = eliminate_unused_joins(baseplate_query(), catalog)
+
+    assert query.joins == []
+    assert [cte.name for cte in query.ctes] == ["temp_table_0"]
+
+def test_eliminate_unused_joins_keeps_a_filtering_join(catalog):
+    where = [Predicate("temp_table_1.grade = 'A'", {"temp_table_1"}, {"grade"}, kind="filter")]
+    query = eliminate_unused_joins(baseplate_query(where), catalog)
+
+    assert [join.target for join in query.joins] == ["temp_table_1"]
+
+def test_eliminate_unused_joins_keeps_a_join_mentioned_by_opaque_sql(catalog):
+    where = [Predicate("temp_table_1.bp_name IS NULL")]
+    query = eliminate_unused_joins(baseplate_query(where), catalog)
+
+    assert [join.target for join in query.joins] == ["temp_table_1"]
+
+def test_eliminate_unused_joins_keeps_a_join_that_can_add_rows(catalog):
+    query = SelectQuery(
+        "baseplate",
+        select=[SelectItem("baseplate.bp_name", {"baseplate"})],
+        joins=[Join("bp_inspect", "bp_inspect", "baseplate", "bp_name")],     # several inspections per baseplate
+    )
+    query = eliminate_unused_joins(query, catalog)
+
+    assert [join.target for join in query.joins] == ["bp_inspect"]
+
+
+# ============================================================
+# === Render =================================================
+# ============================================================
+
+def test_render_where_without_predicates_is_true():
+    assert baseplate_query().render_where() == "TRUE"
+
+def test_optimize_runs_the_given_passes_in_order():
+    calls = []
+    optimize(baseplate_query(), [lambda q: calls.append("a") or q, lambda q: calls.append("b") or q])
+
+    assert calls == ["a", "b"]
+
+
+# ============================================================
+# === push_down_predicates ===================================
+# ============================================================
+
+def test_push_down_moves_serial_derived_filters_into_the_distinct_on_cte(catalog):
+    where = [Predicate("temp_table_0.geometry = 'Full'", {"temp_table_0"}, {"geometry"}, kind="filter")]
+    query = push_down_predicates(baseplate_query(where), catalog)
+
+    assert query.where == []
+    assert [p.sql for p in query.get_cte("temp_table_0").where] == ["baseplate.geometry = 'Full'"]
+
+def test_push_down_keeps_other_filters_outside_with_a_key_semijoin(catalog):
+    where = [
+        Predicate("temp_table_0.obsolete = false", {"temp_table_0"}, {"obsolete"}, kind="filter"),
+        Predicate("temp_table_0.comment ILIKE '%x%'", {"temp_table_0"}, {"comment"}, kind="contains_input"),
+    ]
+    query = push_down_predicates(baseplate_query(where), catalog)
+
+    assert [p.sql for p in query.where] == ["temp_table_0.obsolete = false", "temp_table_0.comment ILIKE '%x%'"]
+    (semijoin,) = query.get_cte("temp_table_0").where
+    assert semijoin.kind == "semijoin"
+    assert " ".join(semijoin.sql.split()) == (
+        "bp_name IN ( SELECT bp_name FROM baseplate WHERE baseplate.obsolete = false AND baseplate.comment ILIKE '%x%' )"
+    )
+
+def test_push_down_leaves_joined_and_opaque_predicates_alone(catalog):
+    where = [
+        Predicate("temp_table_1.grade = 'A'", {"temp_table_1"}, {"grade"}, kind="filter"),
+        Predicate("bp_name IS NOT NULL"),
+    ]
+    query = push_down_predicates(baseplate_query(where), catalog)
+
+    assert len(query.where) == 2
+    assert all(cte.where == [] for cte in query.ctes)
+
+def test_push_down_moves_every_filter_into_a_cte_without_distinct_on(catalog):
+    query = baseplate_query([Predicate("temp_table_0.obsolete = false", {"temp_table_0"}, {"obsolete"}, kind="filter")])
+    query.ctes[0].distinct_on = []
+
+    push_down_predicates(query, catalog)
+
+    assert query.where == []
+    assert [p.sql for p in query.get_cte("temp_table_0").where] == ["baseplate.obsolete = false"]
@@ -1,2 +1,12 @@
-from .builders import *
-from .misc import *
\ No newline at end of file
+from . import builders, misc
+
+__all__ = builders.__all__ + misc.__all__
+
+def __getattr__(name: str):
+    """Resolve `from tool import AlertBuilder` etc. without importing every builder up front (PEP 562).
+    """
+    if name in builders.__all__:
+        return getattr(builders, name)
+    if name in misc.__all__:
+        return getattr(misc, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,29 @@
-from .alert_builder import *
-from .dashboard_builder import *
-from .other_builder import *
-from .panel_builder import *
-from .mmts_logging_builder import *
-from .mmts_batch_logging_builder import *
\ No newline at end of file
+import importlib
+
+# builder class -> submodule, imported on first access so `import tool.builders.sql_builder` stays cheap
+_LAZY_CLASSES = {
+    "AlertBuilder":             "alert_builder",
+    "DashboardBuilder":         "dashboard_builder",
+    "PanelBuilder":             "panel_builder",
+    "FilterBuilder":            "filter_builder",
+    "InputBuilder":             "filter_builder",
+    "IVCurveBuilder":           "iv_curve_builder",
+    "ComponentsLookUpFormBuilder": "components_lookup_builder",
+    "HexmapPlotsBuilder":       "hexmap_builder",
+    "OffsetPlotsBuilder":       "offset_plots_builder",
+    "GeneralInfoBuilder":       "general_info_builder",
+    "ModuleAssemblyBuilder":    "module_assembly_builder",
+    "XMLSuccessBuilder":        "xml_success_builder",
+    "ModuleGradesBuilder":      "module_grades_builder",
+    "AllDataBuilder":           "all_data_builder",
+    "MMTSLoggingBuilder":       "mmts_logging_builder",
+    "MMTSBatchLoggingBuilder":  "mmts_batch_logging_builder",
+}
+
+__all__ = list(_LAZY_CLASSES)
+
+def __getattr__(name: str):
+    if name in _LAZY_CLASSES:
+        module = importlib.import_module(f".{_LAZY_CLASSES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -14,11 +14,10 @@ class AlertBuilder:
         """Build all alerts based on the given alert_dict.
         """ 
         # generate alert json
+        alert_sql = self.get_alert_sql(alert)
         if "sql" not in alert:
-            alert_sql = self._generate_alertSQL(alert['parameter'], alert['table'])
             alert_json = self.generate_alert_rule(alert_sql, alert, alert['dashboard'], folder_name)
         else:
-            alert_sql = alert["sql"]
             # fetch the dashboard name of the data source
             match = re.search(r'\bFROM\s+([a-zA-Z_][\w]*)', alert_sql, re.IGNORECASE)
             alert_json = self.generate_alert_rule(alert_sql,alert, match.group(1),folder_name)
@@ -41,7 +40,7 @@ class AlertBuilder:
         if folderName == "General":  # invalid folder
             raise ValueError("[Error] Alert rule in invalid folder: General folder can not store alert rule.")
         else:
-            folder_uid_map = gf_conn.get("GF_FOLDER_UIDS", {})
+            folder_uid_map = settings.gf_conn.get("GF_FOLDER_UIDS", {})
             if folderName not in folder_uid_map:
                 raise ValueError(f"Dashboard Folder '{folderName}' not in GF_FOLDER_UIDS")
             folder_uid = folder_uid_map[folderName]
@@ -133,6 +132,13 @@ class AlertBuilder:
 
         return alert_json
     
+    def get_alert_sql(self, alert: dict) -> str:
+        """Get the SQL of an alert: its own `sql`, or the latest value of `parameter` in `table`.
+        """
+        if "sql" in alert:
+            return alert["sql"]
+        return self._generate_alertSQL(alert['parameter'], alert['table'])
+
     def _generate_alertSQL(self, parameter: str, source: str) -> str:
         alertSQL = f"""
         SELECT
@@ -198,11 +204,11 @@ class AlertBuilder:
 
         print(f"Alerts saved to {path} \n")
 
-    def upload_alerts(self, file_path: str):
+    def upload_alerts(self, file_path: str, gf_client: "GrafanaClient" = None):
         """Upload one alert JSON file into Grafana folder.
+           - `gf_client` defaults to the shared client in helper.py.
         """
-        # reload gf_conn.yaml
-        gf_conn.reload()
+        gf_client = gf_client if gf_client else settings.client
 
         # get folder and file name
         folder_name = os.path.basename(os.path.dirname(file_path)).replace("_", " ")
@@ -212,7 +218,7 @@ class AlertBuilder:
         if folder_name == "General":  # main dashboards: empty uid
             folder_uid = ""
         else:
-            folder_uid_map = gf_conn.get("GF_FOLDER_UIDS", {})
+            folder_uid_map = settings.gf_conn.get("GF_FOLDER_UIDS", {})
             if folder_name not in folder_uid_map:
                 raise ValueError(f"Dashboard Folder '{folder_name}' not in GF_FOLDER_UIDS")
             folder_uid = folder_uid_map[folder_name]
@@ -221,8 +227,9 @@ class AlertBuilder:
             alert_json = json.load(file)
 
         # upload alerts
+        import requests     # imported on use, building alerts does not need it
         try:
-            client.upload_alert_json(alert_json, alert_json["uid"])
+            gf_client.upload_alert_json(alert_json, alert_json["uid"])
 
         except requests.RequestException as e:
             print(f"[ERROR] Failed to upload alert '{file_name}': {e}")
\ No newline at end of file
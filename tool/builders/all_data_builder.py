@@ -1,6 +1,5 @@
-import os
-
 from tool.helper import *
+from tool.schema import get_schema_catalog
 
 """
 This file defines the class for building the "All Data" dashboard in Grafana.
@@ -14,14 +13,9 @@ class AllDataBuilder:
         self.dashboard_uid = create_uid("All Data")
 
     def get_table_names(self) -> list:
-        """List all available table names from the postgres_tables schema folder.
+        """List all available table names from the postgres_tables schema catalog.
         """
-        table_names = sorted(
-            os.path.splitext(f)[0]
-            for f in os.listdir(DB_INFO_PATH)
-            if f.endswith(".csv")
-        )
-        return table_names
+        return get_schema_catalog().table_names
 
     def generate_dashboard_json(self) -> dict:
         """Generate the dashboard JSON for the "All Data" table viewer.
@@ -1,4 +1,7 @@
+import re
+
 from tool.helper import *
+
 class ComponentsLookUpFormBuilder:
     """I know it looks gross, can't help sorry."""
 
@@ -13,11 +16,24 @@ class ComponentsLookUpFormBuilder:
         self.sen_name = "UPPER('${sen_name}')"
         self.proto_name = "UPPER('${proto_name}')"
         self.module_name = "UPPER(REPLACE('${module_name}', '-', ''))"
+
+        ## == Look-up ==
+        # the module_info rows of the identifiers, one branch each -> lookup_sql
+        self.matched_module_sql = self.lookup_sql("module_info.module_no, module_info.module_name", [
+            ("module_info", "module_info.module_name", self.module_name),
+            ("module_info", "module_info.proto_name", self.proto_name),
+            ("module_info", "module_info.sen_name", self.sen_name),
+            ("module_info", "module_info.bp_name", self.bp_name),
+            ("module_info", "module_info.hxb_name", self.hxb_name),
+        ])
+
         ## === SQL ===
         self.module_info_sql = f"""
-        WITH selected_module_inspect AS (
+        WITH matched_module AS ({self.matched_module_sql}),
+        selected_module_inspect AS (
             SELECT DISTINCT ON (module_name) *
-            FROM module_inspect    
+            FROM module_inspect
+            WHERE module_name IN (SELECT module_name FROM matched_module)
             ORDER BY module_name, module_row_no DESC
         )
         SELECT
@@ -29,17 +45,21 @@ class ComponentsLookUpFormBuilder:
             selected_module_inspect.ang_offset_deg
         FROM module_info
         LEFT JOIN selected_module_inspect ON module_info.module_name = selected_module_inspect.module_name
-        WHERE  (hxb_name = {self.hxb_name})
-            OR (bp_name = {self.bp_name})
-            OR (sen_name = {self.sen_name})
-            OR (proto_name = {self.proto_name})
-            OR (module_info.module_name = {self.module_name})
+        WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         """
 
         self.proto_info_sql = f"""
-        WITH selected_proto_inspect AS (
+        WITH matched_proto AS ({self.lookup_sql("proto_assembly.proto_no, proto_assembly.proto_name", [
+            ("proto_assembly", "proto_assembly.bp_name", self.bp_name),
+            ("proto_assembly", "proto_assembly.sen_name", self.sen_name),
+            ("proto_assembly", "proto_assembly.proto_name", self.proto_name),
+            ("proto_assembly JOIN module_info ON module_info.proto_name = proto_assembly.proto_name", "module_info.module_name", self.module_name),
+            ("proto_assembly JOIN module_info ON module_info.proto_name = proto_assembly.proto_name", "module_info.hxb_name", self.hxb_name),
+        ])}),
+        selected_proto_inspect AS (
             SELECT DISTINCT ON (proto_name) *
             FROM proto_inspect
+            WHERE proto_name IN (SELECT proto_name FROM matched_proto)
             ORDER BY proto_name, proto_row_no DESC
         )
         SELECT    
@@ -52,29 +72,46 @@ class ComponentsLookUpFormBuilder:
         FROM proto_assembly 
         LEFT JOIN module_info ON module_info.proto_name = proto_assembly.proto_name
         LEFT JOIN selected_proto_inspect ON module_info.proto_name = selected_proto_inspect.proto_name
-        WHERE  (proto_assembly.bp_name = {self.bp_name})
+        WHERE proto_assembly.proto_no IN (SELECT proto_no FROM matched_proto)
+          AND ((proto_assembly.bp_name = {self.bp_name})
             OR (proto_assembly.sen_name = {self.sen_name})
             OR (proto_assembly.proto_name = {self.proto_name})
             OR (module_info.module_name = {self.module_name})
-            OR (module_info.hxb_name = {self.hxb_name})
+            OR (module_info.hxb_name = {self.hxb_name}))
         """
 
         self.sensor_info_sql = f"""
+        WITH matched_sensor AS ({self.lookup_sql("sensor.sen_no", [
+            ("sensor", "sensor.sen_name", self.sen_name),
+            ("sensor JOIN proto_assembly ON proto_assembly.sen_name = sensor.sen_name", "proto_assembly.proto_name", self.proto_name),
+            ("sensor JOIN module_info ON module_info.sen_name = sensor.sen_name", "module_info.module_name", self.module_name),
+            ("sensor JOIN module_info ON module_info.sen_name = sensor.sen_name", "module_info.bp_name", self.bp_name),
+            ("sensor JOIN module_info ON module_info.sen_name = sensor.sen_name", "module_info.hxb_name", self.hxb_name),
+        ])})
         SELECT sensor.*
         FROM sensor
         LEFT JOIN module_info ON module_info.sen_name = sensor.sen_name
         LEFT JOIN proto_assembly ON proto_assembly.sen_name = sensor.sen_name
-        WHERE  (sensor.sen_name = {self.sen_name})    
+        WHERE sensor.sen_no IN (SELECT sen_no FROM matched_sensor)
+          AND ((sensor.sen_name = {self.sen_name})
             OR (proto_assembly.proto_name = {self.proto_name})
             OR (module_name = {self.module_name})
             OR (module_info.bp_name = {self.bp_name})
-            OR (module_info.hxb_name = {self.hxb_name})
+            OR (module_info.hxb_name = {self.hxb_name}))
         """
 
         self.bp_info_sql = f"""
-        WITH selected_bp_inspect AS (
+        WITH matched_bp AS ({self.lookup_sql("baseplate.bp_no, baseplate.bp_name", [
+            ("baseplate", "baseplate.bp_name", self.bp_name),
+            ("baseplate JOIN proto_assembly ON proto_assembly.bp_name = baseplate.bp_name", "proto_assembly.proto_name", self.proto_name),
+            ("baseplate JOIN module_info ON module_info.bp_name = baseplate.bp_name", "module_info.module_name", self.module_name),
+            ("baseplate JOIN module_info ON module_info.bp_name = baseplate.bp_name", "module_info.hxb_name", self.hxb_name),
+            ("baseplate JOIN module_info ON module_info.bp_name = baseplate.bp_name", "module_info.sen_name", self.sen_name),
+        ])}),
+        selected_bp_inspect AS (
             SELECT DISTINCT ON (bp_name) *
             FROM bp_inspect
+            WHERE bp_name IN (SELECT bp_name FROM matched_bp)
             ORDER BY bp_name, bp_row_no DESC
         )
         SELECT
@@ -85,17 +122,26 @@ class ComponentsLookUpFormBuilder:
         LEFT JOIN module_info ON module_info.bp_name = baseplate.bp_name
         LEFT JOIN proto_assembly ON proto_assembly.bp_name = baseplate.bp_name
         LEFT JOIN selected_bp_inspect ON selected_bp_inspect.bp_name = baseplate.bp_name
-        WHERE  (baseplate.bp_name = {self.bp_name})
+        WHERE baseplate.bp_no IN (SELECT bp_no FROM matched_bp)
+          AND ((baseplate.bp_name = {self.bp_name})
             OR (proto_assembly.proto_name = {self.proto_name})
             OR (module_info.module_name = {self.module_name})
             OR (module_info.hxb_name = {self.hxb_name})
-            OR (module_info.sen_name = {self.sen_name})
+            OR (module_info.sen_name = {self.sen_name}))
         """
     
         self.hxb_info_sql = f"""
-        WITH selected_hxb_inspect AS (
+        WITH matched_hxb AS ({self.lookup_sql("hexaboard.hxb_no, hexaboard.hxb_name", [
+            ("hexaboard", "hexaboard.hxb_name", self.hxb_name),
+            ("hexaboard JOIN module_info ON module_info.hxb_name = hexaboard.hxb_name", "module_info.module_name", self.module_name),
+            ("hexaboard JOIN module_info ON module_info.hxb_name = hexaboard.hxb_name", "module_info.proto_name", self.proto_name),
+            ("hexaboard JOIN module_info ON module_info.hxb_name = hexaboard.hxb_name", "module_info.sen_name", self.sen_name),
+            ("hexaboard JOIN module_info ON module_info.hxb_name = hexaboard.hxb_name", "module_info.bp_name", self.bp_name),
+        ])}),
+        selected_hxb_inspect AS (
             SELECT DISTINCT ON (hxb_name) *
             FROM hxb_inspect
+            WHERE hxb_name IN (SELECT hxb_name FROM matched_hxb)
             ORDER BY hxb_name, hxb_row_no DESC
         )
         SELECT
@@ -105,14 +151,16 @@ class ComponentsLookUpFormBuilder:
         FROM hexaboard
         LEFT JOIN module_info ON module_info.hxb_name = hexaboard.hxb_name
         LEFT JOIN selected_hxb_inspect ON selected_hxb_inspect.hxb_name = hexaboard.hxb_name
-        WHERE  (hexaboard.hxb_name = {self.hxb_name})
+        WHERE hexaboard.hxb_no IN (SELECT hxb_no FROM matched_hxb)
+          AND ((hexaboard.hxb_name = {self.hxb_name})
             OR (module_info.module_name = {self.module_name})
             OR (module_info.proto_name = {self.proto_name})
             OR (module_info.sen_name = {self.sen_name})
-            OR (module_info.bp_name = {self.bp_name})
+            OR (module_info.bp_name = {self.bp_name}))
         """
 
         self.module_pedestal_sql = f"""
+        WITH matched_module AS ({self.matched_module_sql})
         SELECT 
             module_pedestal_test.mod_pedtest_no,
             module_pedestal_test.module_no,
@@ -138,15 +186,18 @@ class ComponentsLookUpFormBuilder:
             module_pedestal_test.pedestal_config_json
         FROM module_pedestal_test
         LEFT JOIN module_info ON module_info.module_name = module_pedestal_test.module_name
-        WHERE  (module_info.hxb_name = {self.hxb_name})
-            OR (module_info.module_name = {self.module_name})
-            OR (module_info.proto_name = {self.proto_name})
-            OR (module_info.sen_name = {self.sen_name})
-            OR (module_info.bp_name = {self.bp_name})
+        WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         ORDER BY module_pedestal_test.mod_pedtest_no DESC
         """
 
         self.hxb_pedestal_sql = f"""
+        WITH matched_hxb_pedestal AS ({self.lookup_sql("hxb_pedestal_test.hxb_pedtest_no", [
+            ("hxb_pedestal_test", "hxb_pedestal_test.hxb_name", self.hxb_name),
+            ("hxb_pedestal_test JOIN module_info ON module_info.hxb_name = hxb_pedestal_test.hxb_name", "module_info.module_name", self.module_name),
+            ("hxb_pedestal_test JOIN module_info ON module_info.hxb_name = hxb_pedestal_test.hxb_name", "module_info.proto_name", self.proto_name),
+            ("hxb_pedestal_test JOIN module_info ON module_info.hxb_name = hxb_pedestal_test.hxb_name", "module_info.sen_name", self.sen_name),
+            ("hxb_pedestal_test JOIN module_info ON module_info.hxb_name = hxb_pedestal_test.hxb_name", "module_info.bp_name", self.bp_name),
+        ])})
         SELECT
             hxb_pedestal_test.hxb_pedtest_no,
             hxb_pedestal_test.hxb_no,
@@ -168,24 +219,22 @@ class ComponentsLookUpFormBuilder:
             hxb_pedestal_test.pedestal_config_json
         FROM hxb_pedestal_test
         LEFT JOIN module_info ON module_info.hxb_name = hxb_pedestal_test.hxb_name
-        WHERE  (hxb_pedestal_test.hxb_name = {self.hxb_name})
+        WHERE hxb_pedestal_test.hxb_pedtest_no IN (SELECT hxb_pedtest_no FROM matched_hxb_pedestal)
+          AND ((hxb_pedestal_test.hxb_name = {self.hxb_name})
             OR (module_info.module_name = {self.module_name})
             OR (module_info.proto_name = {self.proto_name})
             OR (module_info.sen_name = {self.sen_name})
-            OR (module_info.bp_name = {self.bp_name})
+            OR (module_info.bp_name = {self.bp_name}))
         ORDER BY hxb_pedestal_test.hxb_pedtest_no DESC
         """
 
         self.all_module_iv_curve_sql = rf"""
-        WITH filtered_iv AS (
+        WITH matched_module AS ({self.matched_module_sql}),
+        filtered_iv AS (
             SELECT module_iv_test.*
             FROM module_iv_test
             JOIN module_info ON module_iv_test.module_name = module_info.module_name
-            WHERE (module_info.module_name = {self.module_name}
-                OR module_info.proto_name = {self.proto_name}
-                OR module_info.sen_name = {self.sen_name}
-                OR module_info.bp_name = {self.bp_name}
-                OR module_info.hxb_name = {self.hxb_name})
+            WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
                 AND (meas_v IS NOT NULL AND meas_i IS NOT NULL)
             ORDER BY mod_ivtest_no ASC
         ),
@@ -203,9 +252,11 @@ class ComponentsLookUpFormBuilder:
         """
 
         self.wirebond_info_sql = f"""
-        WITH selected_front_wirebond AS (
+        WITH matched_module AS ({self.matched_module_sql}),
+        selected_front_wirebond AS (
             SELECT DISTINCT ON (module_name) *
             FROM front_wirebond
+            WHERE module_name IN (SELECT module_name FROM matched_module)
             ORDER BY module_name, frwirebond_no DESC
         )
         SELECT
@@ -218,14 +269,11 @@ class ComponentsLookUpFormBuilder:
             selected_front_wirebond.comment
         FROM selected_front_wirebond
         JOIN module_info ON selected_front_wirebond.module_name = module_info.module_name
-        WHERE (module_info.module_name = {self.module_name}
-            OR module_info.proto_name = {self.proto_name}
-            OR module_info.sen_name = {self.sen_name}
-            OR module_info.bp_name = {self.bp_name}
-            OR module_info.hxb_name = {self.hxb_name})
+        WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         """
         
         self.bond_pull_info_sql = f"""
+        WITH matched_module AS ({self.matched_module_sql})
         SELECT
             bond_pull_test.pulltest_no,
             bond_pull_test.module_name,
@@ -235,56 +283,42 @@ class ComponentsLookUpFormBuilder:
             bond_pull_test.comment
         FROM bond_pull_test
         JOIN module_info ON bond_pull_test.module_name = module_info.module_name
-        WHERE (module_info.module_name = {self.module_name}
-            OR module_info.proto_name = {self.proto_name}
-            OR module_info.sen_name = {self.sen_name}
-            OR module_info.bp_name = {self.bp_name}
-            OR module_info.hxb_name = {self.hxb_name})
+        WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         """
 
         self.module_module_name_sql = f"""
+        WITH matched_module AS ({self.matched_module_sql})
         SELECT module_name
         FROM module_info
-        WHERE (module_info.module_name = {self.module_name}
-            OR module_info.proto_name = {self.proto_name}
-            OR module_info.sen_name = {self.sen_name}
-            OR module_info.bp_name = {self.bp_name}
-            OR module_info.hxb_name = {self.hxb_name})
+        WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         """
 
         self.module_hex_name_sql = f"""
+        WITH matched_module AS ({self.matched_module_sql})
         SELECT hxb_name
         FROM module_info
-        WHERE (module_info.module_name = {self.module_name}
-            OR module_info.proto_name = {self.proto_name}
-            OR module_info.sen_name = {self.sen_name}
-            OR module_info.bp_name = {self.bp_name}
-            OR module_info.hxb_name = {self.hxb_name})
+        WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         """
 
-        self.qc_data_list = self.generate_qc_data_list()
+        # the QC values of the "Module QC Summary" panel, `${column}` of QC_COLUMNS -> generate_qc_summary_sql
+        self.qc_summary_md = "- **final_grade**: ${final_grade}\n  - **iv_grade**: ${iv_grade}\n  - **readout_grade**: ${readout_grade}\n  - **module_grade**: ${module_grade}\n  - **proto_grade**: ${proto_grade}\n- **comments_all**:\n  ```  \n  ${comments_all}\n  ```\n\n---\n\n## Measurements\n\n|              | flatness (mm)        | avg_thickness (mm)     | max_thickness (mm)    | x_offset (μm)        | y_offset (μm)      | ang_offset  (deg)     |\n|--------------|------------------|----------------------|----------------------|------------------|------------------|---------------------|\n| **Proto**| ${proto_flatness} | ${proto_avg_thickness} | ${proto_max_thickness} | ${proto_x_offset} | ${proto_y_offset} | ${proto_ang_offset} |\n| **Module**   | ${module_flatness} | ${module_avg_thickness} | ${module_max_thickness} | ${module_x_offset} | ${module_y_offset} | ${module_ang_offset} |\n\n---\n\n## Cell Info\n\n- **list_cells_unbonded**: ${list_cells_unbonded}  \n- **list_cells_grounded**: ${list_cells_grounded}  \n- **list_noisy_cells**: ${list_noisy_cells}  \n- **list_dead_cells**: ${list_dead_cells}  \n- **count_bad_cells**: ${count_bad_cells}  \n\n---\n\n## IV Info\n\n- **i_ratio_ref_b_over_a**: ${i_ratio_ref_b_over_a}\n- **ref_volt_a**: ${ref_volt_a} V\n- **ref_volt_b**: ${ref_volt_b} V\n- **i_at_ref_a**: ${i_at_ref_a} A"
+        self.qc_summary_sql = self.generate_qc_summary_sql(self.qc_summary_md)
 
         self.mean_hexmap_sql = f"""
+        WITH matched_module AS ({self.matched_module_sql})
         SELECT DISTINCT ON (module_pedestal_plots.module_name) encode(adc_mean_hexmap, 'base64') AS hex_img
         FROM module_pedestal_plots
         JOIN module_info ON module_pedestal_plots.module_name = module_info.module_name
-        WHERE (module_info.module_name = {self.module_name}
-            OR module_info.proto_name = {self.proto_name}
-            OR module_info.sen_name = {self.sen_name}
-            OR module_info.bp_name = {self.bp_name}
-            OR module_info.hxb_name = {self.hxb_name})
+        WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         ORDER BY module_pedestal_plots.module_name, module_pedestal_plots.mod_plottest_no DESC
         """
 
         self.std_hexmap_sql = f"""
+        WITH matched_module AS ({self.matched_module_sql})
         SELECT DISTINCT ON (module_pedestal_plots.module_name) encode(adc_std_hexmap, 'base64') AS hex_img
         FROM module_pedestal_plots
         JOIN module_info ON module_pedestal_plots.module_name = module_info.module_name
-        WHERE (module_info.module_name = {self.module_name}
-            OR module_info.proto_name = {self.proto_name}
-            OR module_info.sen_name = {self.sen_name}
-            OR module_info.bp_name = {self.bp_name}
-            OR module_info.hxb_name = {self.hxb_name})
+        WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         ORDER BY module_pedestal_plots.module_name, module_pedestal_plots.mod_plottest_no DESC
         """
 
@@ -292,7 +326,8 @@ class ComponentsLookUpFormBuilder:
         self.std_hexmap_md = '<img src="data:image/png;base64,${std_hex_map}" style="width: auto; height: auto;"/>'
 
         self.encap_info_sql = f"""
-        WITH encap AS (
+        WITH matched_module AS ({self.matched_module_sql}),
+        encap AS (
             SELECT DISTINCT ON (front_encap.module_name)
                 'front_encap' AS source,
                 front_encap.module_name,
@@ -307,11 +342,7 @@ class ComponentsLookUpFormBuilder:
                 front_encap.cure_end
             FROM front_encap
             JOIN module_info ON front_encap.module_name = module_info.module_name
-            WHERE (module_info.module_name = {self.module_name}
-                OR module_info.proto_name = {self.proto_name}
-                OR module_info.sen_name = {self.sen_name}
-                OR module_info.bp_name = {self.bp_name}
-                OR module_info.hxb_name = {self.hxb_name})
+            WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
         
             UNION ALL
 
@@ -329,17 +360,20 @@ class ComponentsLookUpFormBuilder:
                 back_encap.cure_end
             FROM back_encap
             JOIN module_info ON back_encap.module_name = module_info.module_name
-            WHERE (module_info.module_name = {self.module_name}
-                OR module_info.proto_name = {self.proto_name}
-                OR module_info.sen_name = {self.sen_name}
-                OR module_info.bp_name = {self.bp_name}
-                OR module_info.hxb_name = {self.hxb_name})
+            WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
             )
 
         SELECT *
         FROM encap
         """
 
+    def lookup_sql(self, columns: str, branches: list) -> str:
+        """Select `columns` of the rows matched by any identifier of the form: one branch per (source, column, value), merged with UNION.
+           - Each branch is an index seek on its column; an OR over the columns of several joined tables is a sequential scan of each table.
+        """
+        selects = [f"SELECT {columns} FROM {source} WHERE {column} = {value}" for source, column, value in branches]
+        return "\n            " + "\n            UNION\n            ".join(selects) + "\n        "
+
 
     ######################################
     def generate_dashboard_json(self):
@@ -477,7 +511,7 @@ class ComponentsLookUpFormBuilder:
                 "showLineNumbers": False,
                 "showMiniMap": False
                 },
-                "content": "## Basic Info\n\n- **module_name**: ${module_module_name}  \n- **final_grade**: ${final_grade}\n  - **iv_grade**: ${iv_grade}\n  - **readout_grade**: ${readout_grade}\n  - **module_grade**: ${module_grade}\n  - **proto_grade**: ${proto_grade}\n- **comments_all**:\n  ```  \n  ${comments_all}\n  ```\n\n---\n\n## Measurements\n\n|              | flatness (mm)        | avg_thickness (mm)     | max_thickness (mm)    | x_offset (μm)        | y_offset (μm)      | ang_offset  (deg)     |\n|--------------|------------------|----------------------|----------------------|------------------|------------------|---------------------|\n| **Proto**| ${proto_flatness} | ${proto_avg_thickness} | ${proto_max_thickness} | ${proto_x_offset} | ${proto_y_offset} | ${proto_ang_offset} |\n| **Module**   | ${module_flatness} | ${module_avg_thickness} | ${module_max_thickness} | ${module_x_offset} | ${module_y_offset} | ${module_ang_offset} |\n\n---\n\n## Cell Info\n\n- **list_cells_unbonded**: ${list_cells_unbonded}  \n- **list_cells_grounded**: ${list_cells_grounded}  \n- **list_noisy_cells**: ${list_noisy_cells}  \n- **list_dead_cells**: ${list_dead_cells}  \n- **count_bad_cells**: ${count_bad_cells}  \n\n---\n\n## IV Info\n\n- **i_ratio_ref_b_over_a**: ${i_ratio_ref_b_over_a}\n- **ref_volt_a**: ${ref_volt_a} V\n- **ref_volt_b**: ${ref_volt_b} V\n- **i_at_ref_a**: ${i_at_ref_a} A"
+                "content": "## Basic Info\n\n- **module_name**: ${module_module_name}  \n${qc_summary}"
             }
             },
     # Panel: Proto Info
@@ -901,7 +935,7 @@ class ComponentsLookUpFormBuilder:
             "links":[
                 {
                 "title": "All Hexmap Plots",
-                "url": f"{GF_URL}/d/hexmap-plots?var-module_name="+"${module_module_name}",
+                "url": f"{settings.GF_URL}/d/hexmap-plots?var-module_name="+"${module_module_name}",
                 "targetBlank": True
                 }
             ]
@@ -995,7 +1029,7 @@ class ComponentsLookUpFormBuilder:
             "links":[
                 {
                 "title": "All Hexmap Plots",
-                "url": f"{GF_URL}/d/hexmap-plots?var-module_name="+"${module_hex_name}",
+                "url": f"{settings.GF_URL}/d/hexmap-plots?var-module_name="+"${module_hex_name}",
                 "targetBlank": True
                 }
             ]
@@ -1186,7 +1220,7 @@ class ComponentsLookUpFormBuilder:
             "links":[
                 {
                 "title": "All Hexmap Plots",
-                "url": f"{GF_URL}/d/hexmap-plots?var-module_name="+"${module_module_name}",
+                "url": f"{settings.GF_URL}/d/hexmap-plots?var-module_name="+"${module_module_name}",
                 "targetBlank": True
                 }
             ]
@@ -1221,7 +1255,7 @@ class ComponentsLookUpFormBuilder:
             "links":[
                 {
                 "title": "All Hexmap Plots",
-                "url": f"{GF_URL}/d/hexmap-plots?var-module_name="+"${module_module_name}",
+                "url": f"{settings.GF_URL}/d/hexmap-plots?var-module_name="+"${module_module_name}",
                 "targetBlank": True
                 }
             ]
@@ -1652,7 +1686,24 @@ class ComponentsLookUpFormBuilder:
                 },
                 "type": "query"
             },
-            ] + self.qc_data_list
+            {
+                "name": "qc_summary",
+                "label": "QC Summary",
+                "type": "query",
+                "hide": 2,
+                "refresh": 1,
+                "skipUrlSync": True,
+                "datasource": {
+                    "type": "postgres",
+                    "uid": f"{self.datasource_uid}"
+                },
+                "query": self.qc_summary_sql,
+                "current": {
+                "text": "",
+                "value": ""
+                }
+            },
+            ]
         },
         "time": {
             "from": "now-6h",
@@ -1667,46 +1718,34 @@ class ComponentsLookUpFormBuilder:
 
         return dashboard_json
 
-    def generate_qc_data_list(self):
-        qc_data_list = []
-
-        for qc_data in QC_COLUMNS:
-            raw_sql = f"""
-            SELECT 
-                CASE 
-                    WHEN {qc_data}::text = '1e+10' THEN 'null'
-                    ELSE {qc_data}::text 
-                END AS {qc_data}
-            FROM module_qc_summary
-            JOIN module_info ON module_qc_summary.module_name = module_info.module_name
-            WHERE (module_info.module_name = {self.module_name}
-                OR module_info.proto_name = {self.proto_name}
-                OR module_info.sen_name = {self.sen_name}
-                OR module_info.bp_name = {self.bp_name}
-                OR module_info.hxb_name = {self.hxb_name})
-            ORDER BY mod_qc_no DESC
-            LIMIT 1;
-            """
-
-            arg = {
-                "name": f"{qc_data}",
-                "label": f"{qc_data}",
-                "type": "query",
-                "hide": 2,
-                "refresh": 1,
-                "skipUrlSync": True,
-                "datasource": {
-                    "type": "postgres",
-                    "uid": f"{self.datasource_uid}"
-                },
-                "query": raw_sql,
-                "current": {
-                "text": "",
-                "value": ""
-                }
-            }
-
-            qc_data_list.append(arg)
+    def generate_qc_summary_sql(self, markdown: str) -> str:
+        """Render the `${column}` of QC_COLUMNS in `markdown` with the latest QC row, in one query (instead of one variable per column).
+           - 1e+10 is shown as 'null', a missing value or row as nothing.
+        """
+        columns = re.findall(r"\$\{(\w+)\}", markdown)
+        unknown = [column for column in columns if column not in QC_COLUMNS]
+        if unknown:
+            raise ValueError(f"[Look-up] Not in QC_COLUMNS: {unknown}")
 
-        return qc_data_list
+        template = re.sub(r"\$\{\w+\}", "%s", markdown.replace("%", "%%")).replace("'", "''")
+        values = ",\n".join(
+            f"""                CASE WHEN qc.{column}::text = '1e+10' THEN 'null' ELSE qc.{column}::text END"""
+            for column in columns
+        )
 
+        return f"""
+            WITH matched_module AS ({self.matched_module_sql})
+            SELECT format(
+                '{template}',
+{values}
+            ) AS qc_summary
+            FROM (VALUES (1)) AS one
+            LEFT JOIN LATERAL (
+                SELECT module_qc_summary.*
+                FROM module_qc_summary
+                JOIN module_info ON module_qc_summary.module_name = module_info.module_name
+                WHERE module_info.module_no IN (SELECT module_no FROM matched_module)
+                ORDER BY mod_qc_no DESC
+                LIMIT 1
+            ) AS qc ON TRUE;
+            """
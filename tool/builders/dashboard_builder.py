@@ -67,15 +67,15 @@ class DashboardBuilder:
 
         return dashboard
 
-    def save_dashboard_json(self, dashboard: dict, dashboard_json: dict, folder: str):
-        """Save a dashboard JSON into Dashboards/<folder>/<dashboard_title>.json.
+    def save_dashboard_json(self, dashboard: dict, dashboard_json: dict, folder: str, export_path: str = DASHBOARDS_FOLDER_PATH):
+        """Save a dashboard JSON into <export_path>/<folder>/<dashboard_title>.json.
         """
         # Get the safe title for the filename
         safe_title = dashboard["title"].replace(" ", "_")
         filename = safe_title + ".json"
 
         # create path
-        folder_path = os.path.join("Dashboards", folder)
+        folder_path = os.path.join(export_path, folder)
         os.makedirs(folder_path, exist_ok=True)  # create the new Dashboards/folder
 
         path = os.path.join(folder_path, filename)
@@ -86,31 +86,50 @@ class DashboardBuilder:
         
         print(f"[DASHBOARD] Saved to {path}")
 
-    def upload_dashboards(self, file_path: str):
-        """Upload one dashboard JSON file into Grafana folder.
+    def get_folder_uid(self, folder_name: str) -> str:
+        """Get the Grafana folder uid of a dashboard folder from gf_conn.yaml.
         """
-        # reload gf_conn.yaml
-        gf_conn.reload()
-
-        # get folder and file name
-        folder_name = os.path.basename(os.path.dirname(file_path)).replace("_", " ")
-        file_name = os.path.basename(file_path).split(".")[0].replace("_", " ")
-        
-        # get folder uid
         if folder_name == "General":  # main dashboards: empty uid
-            folder_uid = ""
-        else:
-            folder_uid_map = gf_conn.get("GF_FOLDER_UIDS", {})
-            if folder_name not in folder_uid_map:
-                raise ValueError(f"Dashboard Folder '{folder_name}' not in GF_DASHBOARD_FOLDER_UIDS")
-            folder_uid = folder_uid_map[folder_name]
+            return ""
 
-        with open(file_path, 'r', encoding='utf-8') as file:
-            dashboard_json = json.load(file)
+        folder_uid_map = settings.gf_conn.get("GF_FOLDER_UIDS", {})
+        if folder_name not in folder_uid_map:
+            raise ValueError(f"Dashboard Folder '{folder_name}' not in GF_DASHBOARD_FOLDER_UIDS")
+
+        return folder_uid_map[folder_name]
+
+    def upload_dashboard(self, dashboard_json: dict, folder: str, gf_client: "GrafanaClient" = None, inventory: "DashboardInventory" = None, skip_unchanged: bool = True) -> int:
+        """Upload one dashboard json into Grafana folder. Return the response status code.
+           - `folder` is the config file name, e.g. `Modules_QC_Summary`.
+           - `gf_client` defaults to the shared client in helper.py.
+           - `inventory` is the cached remote state from `GrafanaClient.fetch_inventory`.
+           - If the remote copy has the same content hash, the upload is skipped and 304 is returned.
+        """
+        gf_client = gf_client if gf_client else settings.client
+        folder_uid = self.get_folder_uid(folder.replace("_", " "))
+
+        # skip unchanged dashboard
+        content_hash = compute_dashboard_hash(dashboard_json, folder_uid)
+        if skip_unchanged and inventory is not None and inventory.content_hash(dashboard_json.get("uid")) == content_hash:
+            print(f"[Skip] Dashboard: {dashboard_json['title']} | Unchanged")
+            return 304
+        stamp_dashboard_hash(dashboard_json, content_hash)
 
         # upload dashboard
+        import requests     # imported on use, building dashboards does not need it
         try:
-            client.upload_dashboard_json(dashboard_json, folder_uid)
+            return gf_client.upload_dashboard_json(dashboard_json, folder_uid, inventory)
 
         except requests.RequestException as e:
-            print(f"[ERROR] Failed to upload dashboard '{file_name}': {e}")
\ No newline at end of file
+            print(f"[ERROR] Failed to upload dashboard '{dashboard_json['title']}': {e}")
+            return None
+
+    def upload_dashboards(self, file_path: str, gf_client: "GrafanaClient" = None, inventory: "DashboardInventory" = None, skip_unchanged: bool = True) -> int:
+        """Upload one exported dashboard JSON file into Grafana folder. Return the response status code.
+        """
+        folder = os.path.basename(os.path.dirname(file_path))
+
+        with open(file_path, 'r', encoding='utf-8') as file:
+            dashboard_json = json.load(file)
+
+        return self.upload_dashboard(dashboard_json, folder, gf_client, inventory, skip_unchanged)
@@ -5,8 +5,9 @@ class FilterBuilder:
     def __init__(self, datasource_uid):
         self.datasource_uid = datasource_uid
 
-    def generate_filter(self, filter_name: str, filter_sql: str) -> dict:
+    def generate_filter(self, filter_name: str, filter_sql: str, filter_mode: str = "legacy") -> dict:
         """Generate a template json based on the given .
+           - filter_mode "indexed": 'All' is sent as FILTER_ALL_VALUE instead of every value.
         """
         # generate the filter json:
         filter_json = {
@@ -31,6 +32,9 @@ class FilterBuilder:
                 "type": "query"
             }
 
+        if filter_mode == "indexed":
+            filter_json["allValue"] = f"'{FILTER_ALL_VALUE}'"   # inserted as-is, Grafana does not format a custom all value
+
         return filter_json
 
     def generate_filterSQL(self, filter_name: str, filters_table: str) -> str:
@@ -61,7 +65,7 @@ class FilterBuilder:
 
         return filter_sql
 
-    def build_template_list(self, filters: dict, exist_filter: set) -> list:
+    def build_template_list(self, filters: dict, exist_filter: set, filter_mode: str = "legacy") -> list:
         """Build all filters based on the given filter_dict.
         """
         filters_table_list = list(filters.keys())
@@ -78,7 +82,7 @@ class FilterBuilder:
 
                 # generate the filter's json
                 filter_sql = self.generate_filterSQL(elem, filters_table)
-                filter_json = self.generate_filter(elem, filter_sql)
+                filter_json = self.generate_filter(elem, filter_sql, filter_mode)
                 template_list.append(filter_json)
 
         return template_list
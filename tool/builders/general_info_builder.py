@@ -117,7 +117,7 @@ class GeneralInfoBuilder:
                     "editorMode": "code",
                     "format": "table",
                     "rawQuery": True,
-                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_info\n                ORDER BY module_name, module_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_qc_summary\n                ORDER BY module_name, mod_qc_no DESC\n                )\n        SELECT \n            temp_table_0.bp_material::text || '/' || temp_table_0.resolution::text || '/' || temp_table_0.roc_version::text || '/' || temp_table_0.sen_thickness::text || '/' || temp_table_0.geometry::text AS label,\n            COUNT(*) AS count\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.module_name = temp_table_1.module_name\n        WHERE \n                ('All' = ANY(ARRAY[${bp_material}]) OR \n                (temp_table_0.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR \n                temp_table_0.bp_material::text = ANY(ARRAY[${bp_material}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${roc_version}]) OR \n                (temp_table_0.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR \n                temp_table_0.roc_version::text = ANY(ARRAY[${roc_version}]))\n          AND \n                ('All' = ANY(ARRAY[${sen_thickness}]) OR \n                (temp_table_0.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR \n                temp_table_0.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND $__timeFilter(temp_table_0.assembled AT TIME ZONE 'America/New_York')\n          AND \n                ('All' = ANY(ARRAY[${final_grade}]) OR \n                (temp_table_1.final_grade IS NULL AND 'NULL' = ANY(ARRAY[${final_grade}])) OR \n                temp_table_1.final_grade::text = ANY(ARRAY[${final_grade}]))\n          AND bp_material IS NOT NULL AND resolution IS NOT NULL AND roc_version IS NOT NULL AND geometry IS NOT NULL\n        GROUP BY label\n        ORDER BY label;",
+                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_info\n                -- modules with any matching row: DISTINCT ON still sees all their rows, the outer WHERE checks the latest one\n                WHERE module_name IN (\n                    SELECT module_name FROM module_info\n                    WHERE ('All' = ANY(ARRAY[${bp_material}]) OR\n                        (module_info.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR\n                        module_info.bp_material::text = ANY(ARRAY[${bp_material}]))\n                    AND ('All' = ANY(ARRAY[${resolution}]) OR\n                        (module_info.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR\n                        module_info.resolution::text = ANY(ARRAY[${resolution}]))\n                    AND ('All' = ANY(ARRAY[${roc_version}]) OR\n                        (module_info.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR\n                        module_info.roc_version::text = ANY(ARRAY[${roc_version}]))\n                    AND ('All' = ANY(ARRAY[${sen_thickness}]) OR\n                        (module_info.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR\n                        module_info.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n                    AND ('All' = ANY(ARRAY[${geometry}]) OR\n                        (module_info.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR\n                        module_info.geometry::text = ANY(ARRAY[${geometry}]))\n                    AND module_info.assembled BETWEEN ($__timeFrom()::timestamptz AT TIME ZONE 'America/New_York') AND ($__timeTo()::timestamptz AT TIME ZONE 'America/New_York')\n                )\n                ORDER BY module_name, module_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_qc_summary\n                ORDER BY module_name, mod_qc_no DESC\n                )\n        SELECT \n            temp_table_0.bp_material::text || '/' || temp_table_0.resolution::text || '/' || temp_table_0.roc_version::text || '/' || temp_table_0.sen_thickness::text || '/' || temp_table_0.geometry::text AS label,\n            COUNT(*) AS count\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.module_name = temp_table_1.module_name\n        WHERE \n                ('All' = ANY(ARRAY[${bp_material}]) OR \n                (temp_table_0.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR \n                temp_table_0.bp_material::text = ANY(ARRAY[${bp_material}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${roc_version}]) OR \n                (temp_table_0.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR \n                temp_table_0.roc_version::text = ANY(ARRAY[${roc_version}]))\n          AND \n                ('All' = ANY(ARRAY[${sen_thickness}]) OR \n                (temp_table_0.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR \n                temp_table_0.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND temp_table_0.assembled BETWEEN ($__timeFrom()::timestamptz AT TIME ZONE 'America/New_York') AND ($__timeTo()::timestamptz AT TIME ZONE 'America/New_York')\n          AND \n                ('All' = ANY(ARRAY[${final_grade}]) OR \n                (temp_table_1.final_grade IS NULL AND 'NULL' = ANY(ARRAY[${final_grade}])) OR \n                temp_table_1.final_grade::text = ANY(ARRAY[${final_grade}]))\n          AND bp_material IS NOT NULL AND resolution IS NOT NULL AND roc_version IS NOT NULL AND geometry IS NOT NULL\n        GROUP BY label\n        ORDER BY label;",
                     "refId": "A",
                     "sql": {
                         "columns": [
@@ -200,7 +200,7 @@ class GeneralInfoBuilder:
                     "editorMode": "code",
                     "format": "table",
                     "rawQuery": True,
-                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_info\n                ORDER BY module_name, module_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_qc_summary\n                ORDER BY module_name, mod_qc_no DESC\n                )\n        SELECT \n            COUNT(*) FILTER (WHERE final_grade = 'A') AS grade_a,\n            COUNT(*) FILTER (WHERE final_grade = 'B') AS grade_b,\n            COUNT(*) FILTER (WHERE final_grade = 'C') AS grade_c,\n            COUNT(*) FILTER (WHERE final_grade = 'F') AS grade_f\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.module_name = temp_table_1.module_name\n        WHERE \n                ('All' = ANY(ARRAY[${bp_material}]) OR \n                (temp_table_0.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR \n                temp_table_0.bp_material::text = ANY(ARRAY[${bp_material}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${roc_version}]) OR \n                (temp_table_0.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR \n                temp_table_0.roc_version::text = ANY(ARRAY[${roc_version}]))\n          AND \n                ('All' = ANY(ARRAY[${sen_thickness}]) OR \n                (temp_table_0.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR \n                temp_table_0.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND $__timeFilter(temp_table_0.assembled AT TIME ZONE 'America/New_York')\n          AND \n                ('All' = ANY(ARRAY[${final_grade}]) OR \n                (temp_table_1.final_grade IS NULL AND 'NULL' = ANY(ARRAY[${final_grade}])) OR \n                temp_table_1.final_grade::text = ANY(ARRAY[${final_grade}]))\n          AND bp_material IS NOT NULL AND resolution IS NOT NULL AND roc_version IS NOT NULL AND geometry IS NOT NULL",
+                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_info\n                -- modules with any matching row: DISTINCT ON still sees all their rows, the outer WHERE checks the latest one\n                WHERE module_name IN (\n                    SELECT module_name FROM module_info\n                    WHERE ('All' = ANY(ARRAY[${bp_material}]) OR\n                        (module_info.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR\n                        module_info.bp_material::text = ANY(ARRAY[${bp_material}]))\n                    AND ('All' = ANY(ARRAY[${resolution}]) OR\n                        (module_info.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR\n                        module_info.resolution::text = ANY(ARRAY[${resolution}]))\n                    AND ('All' = ANY(ARRAY[${roc_version}]) OR\n                        (module_info.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR\n                        module_info.roc_version::text = ANY(ARRAY[${roc_version}]))\n                    AND ('All' = ANY(ARRAY[${sen_thickness}]) OR\n                        (module_info.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR\n                        module_info.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n                    AND ('All' = ANY(ARRAY[${geometry}]) OR\n                        (module_info.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR\n                        module_info.geometry::text = ANY(ARRAY[${geometry}]))\n                    AND module_info.assembled BETWEEN ($__timeFrom()::timestamptz AT TIME ZONE 'America/New_York') AND ($__timeTo()::timestamptz AT TIME ZONE 'America/New_York')\n                )\n                ORDER BY module_name, module_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_qc_summary\n                ORDER BY module_name, mod_qc_no DESC\n                )\n        SELECT \n            COUNT(*) FILTER (WHERE final_grade = 'A') AS grade_a,\n            COUNT(*) FILTER (WHERE final_grade = 'B') AS grade_b,\n            COUNT(*) FILTER (WHERE final_grade = 'C') AS grade_c,\n            COUNT(*) FILTER (WHERE final_grade = 'F') AS grade_f\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.module_name = temp_table_1.module_name\n        WHERE \n                ('All' = ANY(ARRAY[${bp_material}]) OR \n                (temp_table_0.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR \n                temp_table_0.bp_material::text = ANY(ARRAY[${bp_material}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${roc_version}]) OR \n                (temp_table_0.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR \n                temp_table_0.roc_version::text = ANY(ARRAY[${roc_version}]))\n          AND \n                ('All' = ANY(ARRAY[${sen_thickness}]) OR \n                (temp_table_0.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR \n                temp_table_0.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND temp_table_0.assembled BETWEEN ($__timeFrom()::timestamptz AT TIME ZONE 'America/New_York') AND ($__timeTo()::timestamptz AT TIME ZONE 'America/New_York')\n          AND \n                ('All' = ANY(ARRAY[${final_grade}]) OR \n                (temp_table_1.final_grade IS NULL AND 'NULL' = ANY(ARRAY[${final_grade}])) OR \n                temp_table_1.final_grade::text = ANY(ARRAY[${final_grade}]))\n          AND bp_material IS NOT NULL AND resolution IS NOT NULL AND roc_version IS NOT NULL AND geometry IS NOT NULL",
                     "refId": "A",
                     "sql": {
                         "columns": [
@@ -283,7 +283,7 @@ class GeneralInfoBuilder:
                     "editorMode": "code",
                     "format": "table",
                     "rawQuery": True,
-                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_info\n                ORDER BY module_name, module_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_qc_summary\n                ORDER BY module_name, mod_qc_no DESC\n                )\n        SELECT \n            COUNT(*) FILTER (WHERE shipped_datetime IS NULL) AS not_shipped,\n            COUNT(*) FILTER (WHERE shipped_datetime IS NOT NULL) AS shipped\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.module_name = temp_table_1.module_name\n        WHERE \n                ('All' = ANY(ARRAY[${bp_material}]) OR \n                (temp_table_0.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR \n                temp_table_0.bp_material::text = ANY(ARRAY[${bp_material}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${roc_version}]) OR \n                (temp_table_0.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR \n                temp_table_0.roc_version::text = ANY(ARRAY[${roc_version}]))\n          AND \n                ('All' = ANY(ARRAY[${sen_thickness}]) OR \n                (temp_table_0.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR \n                temp_table_0.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND $__timeFilter(temp_table_0.assembled AT TIME ZONE 'America/New_York')\n          AND \n                ('All' = ANY(ARRAY[${final_grade}]) OR \n                (temp_table_1.final_grade IS NULL AND 'NULL' = ANY(ARRAY[${final_grade}])) OR \n                temp_table_1.final_grade::text = ANY(ARRAY[${final_grade}]))\n          AND bp_material IS NOT NULL AND resolution IS NOT NULL AND roc_version IS NOT NULL AND geometry IS NOT NULL",
+                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_info\n                -- modules with any matching row: DISTINCT ON still sees all their rows, the outer WHERE checks the latest one\n                WHERE module_name IN (\n                    SELECT module_name FROM module_info\n                    WHERE ('All' = ANY(ARRAY[${bp_material}]) OR\n                        (module_info.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR\n                        module_info.bp_material::text = ANY(ARRAY[${bp_material}]))\n                    AND ('All' = ANY(ARRAY[${resolution}]) OR\n                        (module_info.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR\n                        module_info.resolution::text = ANY(ARRAY[${resolution}]))\n                    AND ('All' = ANY(ARRAY[${roc_version}]) OR\n                        (module_info.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR\n                        module_info.roc_version::text = ANY(ARRAY[${roc_version}]))\n                    AND ('All' = ANY(ARRAY[${sen_thickness}]) OR\n                        (module_info.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR\n                        module_info.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n                    AND ('All' = ANY(ARRAY[${geometry}]) OR\n                        (module_info.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR\n                        module_info.geometry::text = ANY(ARRAY[${geometry}]))\n                    AND module_info.assembled BETWEEN ($__timeFrom()::timestamptz AT TIME ZONE 'America/New_York') AND ($__timeTo()::timestamptz AT TIME ZONE 'America/New_York')\n                )\n                ORDER BY module_name, module_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (module_name) *\n                FROM module_qc_summary\n                ORDER BY module_name, mod_qc_no DESC\n                )\n        SELECT \n            COUNT(*) FILTER (WHERE shipped_datetime IS NULL) AS not_shipped,\n            COUNT(*) FILTER (WHERE shipped_datetime IS NOT NULL) AS shipped\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.module_name = temp_table_1.module_name\n        WHERE \n                ('All' = ANY(ARRAY[${bp_material}]) OR \n                (temp_table_0.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR \n                temp_table_0.bp_material::text = ANY(ARRAY[${bp_material}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${roc_version}]) OR \n                (temp_table_0.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR \n                temp_table_0.roc_version::text = ANY(ARRAY[${roc_version}]))\n          AND \n                ('All' = ANY(ARRAY[${sen_thickness}]) OR \n                (temp_table_0.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR \n                temp_table_0.sen_thickness::text = ANY(ARRAY[${sen_thickness}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND temp_table_0.assembled BETWEEN ($__timeFrom()::timestamptz AT TIME ZONE 'America/New_York') AND ($__timeTo()::timestamptz AT TIME ZONE 'America/New_York')\n          AND \n                ('All' = ANY(ARRAY[${final_grade}]) OR \n                (temp_table_1.final_grade IS NULL AND 'NULL' = ANY(ARRAY[${final_grade}])) OR \n                temp_table_1.final_grade::text = ANY(ARRAY[${final_grade}]))\n          AND bp_material IS NOT NULL AND resolution IS NOT NULL AND roc_version IS NOT NULL AND geometry IS NOT NULL",
                     "refId": "A",
                     "sql": {
                         "columns": [
@@ -633,7 +633,7 @@ class GeneralInfoBuilder:
                     "editorMode": "code",
                     "format": "table",
                     "rawQuery": True,
-                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (bp_name) *\n                FROM baseplate\n                ORDER BY bp_name, bp_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (bp_name) *\n                FROM bp_inspect\n                ORDER BY bp_name, bp_row_no DESC\n                )\n        SELECT \n            temp_table_0.bp_material::text || '/' || temp_table_0.resolution::text || '/' || temp_table_0.geometry::text AS label,\n            COUNT(*) AS count\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.bp_name = temp_table_1.bp_name\n        WHERE \n                ('All' = ANY(ARRAY[${bp_material}]) OR\n                  (temp_table_0.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR\n                  (\n                  CASE temp_table_0.bp_material\n                        WHEN 'Ti' THEN 'Titanium'\n                        WHEN 'CF' THEN 'Carbon Fiber' \n                        ELSE temp_table_0.bp_material::text\n                  END\n                  ) = ANY(ARRAY[${bp_material}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND proto_no IS NULL\n        GROUP BY label\n        ORDER BY label;",
+                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (bp_name) *\n                FROM baseplate\n                WHERE \n                ('All' = ANY(ARRAY[${bp_material}]) OR\n                  (baseplate.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${bp_material}])) OR\n                  (\n                  CASE baseplate.bp_material\n                        WHEN 'Ti' THEN 'Titanium'\n                        WHEN 'CF' THEN 'Carbon Fiber' \n                        ELSE baseplate.bp_material::text\n                  END\n                  ) = ANY(ARRAY[${bp_material}]))\n                  AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (baseplate.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                baseplate.resolution::text = ANY(ARRAY[${resolution}]))\n                  AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (baseplate.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                baseplate.geometry::text = ANY(ARRAY[${geometry}]))\n                ORDER BY bp_name, bp_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (bp_name) *\n                FROM bp_inspect\n                ORDER BY bp_name, bp_row_no DESC\n                )\n        SELECT \n            temp_table_0.bp_material::text || '/' || temp_table_0.resolution::text || '/' || temp_table_0.geometry::text AS label,\n            COUNT(*) AS count\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.bp_name = temp_table_1.bp_name\n        WHERE proto_no IS NULL\n        GROUP BY label\n        ORDER BY label;",
                     "refId": "A",
                     "sql": {
                         "columns": [
@@ -740,7 +740,7 @@ class GeneralInfoBuilder:
                     "editorMode": "code",
                     "format": "table",
                     "rawQuery": True,
-                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (hxb_name) *\n                FROM hexaboard\n                ORDER BY hxb_name, hxb_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (hxb_name) *\n                FROM hxb_pedestal_test\n                ORDER BY hxb_name, hxb_pedtest_no DESC\n                )\n        SELECT \n            temp_table_0.roc_version::text || '/' || temp_table_0.resolution::text || '/' || temp_table_0.geometry::text AS label,\n            COUNT(*) AS count\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.hxb_name = temp_table_1.hxb_name\n        WHERE \n                ('All' = ANY(ARRAY[${roc_version}]) OR \n                (temp_table_0.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR \n                temp_table_0.roc_version::text = ANY(ARRAY[${roc_version}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND module_no is NULL\n        GROUP BY label\n        ORDER BY label;",
+                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (hxb_name) *\n                FROM hexaboard\n                WHERE \n                ('All' = ANY(ARRAY[${roc_version}]) OR \n                (hexaboard.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${roc_version}])) OR \n                hexaboard.roc_version::text = ANY(ARRAY[${roc_version}]))\n                  AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (hexaboard.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                hexaboard.resolution::text = ANY(ARRAY[${resolution}]))\n                  AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (hexaboard.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                hexaboard.geometry::text = ANY(ARRAY[${geometry}]))\n                ORDER BY hxb_name, hxb_no DESC\n                ),\n\n                temp_table_1 AS (\n                SELECT DISTINCT ON (hxb_name) *\n                FROM hxb_pedestal_test\n                ORDER BY hxb_name, hxb_pedtest_no DESC\n                )\n        SELECT \n            temp_table_0.roc_version::text || '/' || temp_table_0.resolution::text || '/' || temp_table_0.geometry::text AS label,\n            COUNT(*) AS count\n        FROM temp_table_0\n        LEFT JOIN temp_table_1 ON temp_table_0.hxb_name = temp_table_1.hxb_name\n        WHERE module_no is NULL\n        GROUP BY label\n        ORDER BY label;",
                     "refId": "A",
                     "sql": {
                         "columns": [
@@ -847,7 +847,7 @@ class GeneralInfoBuilder:
                     "editorMode": "code",
                     "format": "table",
                     "rawQuery": True,
-                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (sen_name) *\n                FROM sensor\n                ORDER BY sen_name, sen_no DESC\n                )\n        SELECT \n            temp_table_0.thickness::text || '/' || temp_table_0.resolution::text || '/' || temp_table_0.geometry::text AS label,\n            COUNT(*) AS count\n        FROM temp_table_0\n        \n        WHERE \n                ('All' = ANY(ARRAY[${sen_thickness}]) OR \n                (temp_table_0.thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR \n                temp_table_0.thickness::text = ANY(ARRAY[${sen_thickness}]))\n          AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (temp_table_0.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                temp_table_0.resolution::text = ANY(ARRAY[${resolution}]))\n          AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                temp_table_0.geometry::text = ANY(ARRAY[${geometry}]))\n          AND proto_no IS NULL\n        GROUP BY label\n        ORDER BY label;",
+                    "rawSql": "WITH\n                temp_table_0 AS (\n                SELECT DISTINCT ON (sen_name) *\n                FROM sensor\n                WHERE \n                ('All' = ANY(ARRAY[${sen_thickness}]) OR \n                (sensor.thickness IS NULL AND 'NULL' = ANY(ARRAY[${sen_thickness}])) OR \n                sensor.thickness::text = ANY(ARRAY[${sen_thickness}]))\n                  AND \n                ('All' = ANY(ARRAY[${resolution}]) OR \n                (sensor.resolution IS NULL AND 'NULL' = ANY(ARRAY[${resolution}])) OR \n                sensor.resolution::text = ANY(ARRAY[${resolution}]))\n                  AND \n                ('All' = ANY(ARRAY[${geometry}]) OR \n                (sensor.geometry IS NULL AND 'NULL' = ANY(ARRAY[${geometry}])) OR \n                sensor.geometry::text = ANY(ARRAY[${geometry}]))\n                ORDER BY sen_name, sen_no DESC\n                )\n        SELECT \n            temp_table_0.thickness::text || '/' || temp_table_0.resolution::text || '/' || temp_table_0.geometry::text AS label,\n            COUNT(*) AS count\n        FROM temp_table_0\n        \n        WHERE proto_no IS NULL\n        GROUP BY label\n        ORDER BY label;",
                     "refId": "A",
                     "sql": {
                         "columns": [
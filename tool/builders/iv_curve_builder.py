@@ -8,7 +8,7 @@ class IVCurveBuilder:
         self.SQLgenerator = BaseSQLGenerator()
 
     # -- IV Curve Plot Version 2.0 --
-    def IV_curve_panel_filter(self, filters: dict) -> str:
+    def IV_curve_panel_filter(self, filters: dict, filter_mode: str = "legacy") -> str:
         """Build the WHERE clause for IV curve plot based on the given filters.
         """
         module_where_clauses = []
@@ -17,12 +17,12 @@ class IVCurveBuilder:
         for filter_table, _ in filters.items():
             if filter_table == "module_info":
                 for elem in filters[filter_table]:
-                    arg = self.SQLgenerator._build_filter_argument(elem, filter_table)
+                    arg = self.SQLgenerator._build_filter_argument(elem, filter_table, filter_mode)
                     module_where_clauses.append(arg)
                     module_where_arg = " AND ".join(module_where_clauses)
             elif filter_table == "module_qc_summary":
                 for elem in filters[filter_table]:
-                    arg = self.SQLgenerator._build_filter_argument(elem, "latest_qc_summary")
+                    arg = self.SQLgenerator._build_filter_argument(elem, "latest_qc_summary", filter_mode, filter_table)
                         # filter_table rename due to the distinct fetch for `module_qc_summary` table
                     iv_where_clauses.append(arg)
                     iv_where_arg = " AND ".join(iv_where_clauses)
@@ -42,13 +42,13 @@ class IVCurveBuilder:
 
         return " AND ".join(contains_inputs_clauses)
 
-    def MMTS_IV_curve_panel_sql(self, filters: dict, temp_condition: str, rel_hum_condition: str, contains_inputs: dict = None, iteration_ilike: str = None) -> str:
+    def MMTS_IV_curve_panel_sql(self, filters: dict, temp_condition: str, rel_hum_condition: str, contains_inputs: dict = None, iteration_ilike: str = None, filter_mode: str = "legacy") -> str:
         """Generate a simplified SQL command for the MMTS IV curve plot.
            MMTS pages are already scoped to a single batch_name, so this skips the
            N_MODULE_SHOW limit and best-per-module dedup used by IV_curve_panel_sql,
            but keeps the module_info / module_qc_summary (iv_grade) filters.
         """
-        module_where_arg, iv_where_arg = self.IV_curve_panel_filter(filters)
+        module_where_arg, iv_where_arg = self.IV_curve_panel_filter(filters, filter_mode)
         contains_inputs_arg = self.IV_curve_panel_contains_inputs(contains_inputs, "module_iv_test")
         iteration_arg = f"AND module_iv_test.iteration ILIKE '%{iteration_ilike}%'" if iteration_ilike else ""
 
@@ -98,12 +98,12 @@ class IVCurveBuilder:
 
         return raw_sql
 
-    def IV_curve_panel_sql(self, filters: dict, temp_condition: str, rel_hum_condition: str, N_MODULE_SHOW="${N_MODULE_SHOW}", contains_inputs: dict = None, show_best_only="${show_best_only}") -> str:
+    def IV_curve_panel_sql(self, filters: dict, temp_condition: str, rel_hum_condition: str, N_MODULE_SHOW="${N_MODULE_SHOW}", contains_inputs: dict = None, show_best_only="${show_best_only}", filter_mode: str = "legacy") -> str:
         """Generate the SQL command for IV curve plot based on temp_condition and rel_hum_condition.
            Core filtering logic: Andrew C. Roberts
         """
         # build the WHERE clause
-        module_where_arg, iv_where_arg = self.IV_curve_panel_filter(filters)
+        module_where_arg, iv_where_arg = self.IV_curve_panel_filter(filters, filter_mode)
         contains_inputs_arg = self.IV_curve_panel_contains_inputs(contains_inputs, "module_iv_test")
         filtered_iv_contains_inputs_arg = self.IV_curve_panel_contains_inputs(contains_inputs, "filtered_iv")
 
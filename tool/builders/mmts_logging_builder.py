@@ -292,7 +292,7 @@ class MMTSLoggingBuilder:
   value
 FROM mmts_sensors_logging
 WHERE
-  $__timeFilter(log_timestamp AT TIME ZONE '{self.timezone}')
+  {build_time_filter('log_timestamp', self.timezone)}
   AND device_name IN ('RTD-01','RTD-02','RTD-03','RTD-04','RTD-05','RTD-06','RTD-07','RTD-08','Chiller-01','Chiller-T')
   AND mmts_sensors_logging.metric = 'temperature_C'
 ORDER BY 1, 2;""",
@@ -423,7 +423,7 @@ ORDER BY 1, 2;""",
   value
 FROM mmts_sensors_logging
 WHERE
-  $__timeFilter(log_timestamp AT TIME ZONE '{self.timezone}')
+  {build_time_filter('log_timestamp', self.timezone)}
   AND device_name IN ('DMT-01','DMT-02')
   AND metric = 'dewpoint_C'
 ORDER BY 1, 2;""",
@@ -579,7 +579,7 @@ ORDER BY 1, 2;""",
   value::int AS "System Status"
 FROM mmts_sensors_logging
 WHERE
-  $__timeFilter(log_timestamp AT TIME ZONE '{self.timezone}')
+  {build_time_filter('log_timestamp', self.timezone)}
   AND device_name IN ('System Status')
   AND mmts_sensors_logging.metric = 'system_C'
 ORDER BY 1;""",
@@ -20,6 +20,26 @@ class ModuleAssemblyBuilder:
                 SELECT DISTINCT ON (module_name) *
                 FROM module_info
                 WHERE ('${self.module_name}' = '' OR module_name ILIKE '%' || '${self.module_name}' || '%')
+                -- modules with any matching row: DISTINCT ON still sees all their rows, the outer WHERE checks the latest one
+                AND module_name IN (
+                    SELECT module_name FROM module_info
+                    WHERE ('All' = ANY(ARRAY[${self.bp_material}]) OR 
+                        (module_info.bp_material IS NULL AND 'NULL' = ANY(ARRAY[${self.bp_material}])) OR 
+                        module_info.bp_material::text = ANY(ARRAY[${self.bp_material}]))
+                    AND ('All' = ANY(ARRAY[${self.resolution}]) OR 
+                        (module_info.resolution IS NULL AND 'NULL' = ANY(ARRAY[${self.resolution}])) OR 
+                        module_info.resolution::text = ANY(ARRAY[${self.resolution}]))
+                    AND ('All' = ANY(ARRAY[${self.roc_version}]) OR 
+                        (module_info.roc_version IS NULL AND 'NULL' = ANY(ARRAY[${self.roc_version}])) OR 
+                        module_info.roc_version::text = ANY(ARRAY[${self.roc_version}]))
+                    AND ('All' = ANY(ARRAY[${self.sen_thickness}]) OR 
+                        (module_info.sen_thickness IS NULL AND 'NULL' = ANY(ARRAY[${self.sen_thickness}])) OR 
+                        module_info.sen_thickness::text = ANY(ARRAY[${self.sen_thickness}]))
+                    AND ('All' = ANY(ARRAY[${self.geometry}]) OR 
+                        (module_info.geometry IS NULL AND 'NULL' = ANY(ARRAY[${self.geometry}])) OR 
+                        module_info.geometry::text = ANY(ARRAY[${self.geometry}]))
+                    AND {build_time_filter('module_info.assembled', self.timezone, 'DATE')}
+                )
                 ORDER BY module_name, module_no DESC
                 ),
 
@@ -131,7 +151,7 @@ class ModuleAssemblyBuilder:
                 ('All' = ANY(ARRAY[${self.geometry}]) OR 
                 (temp_table_0.geometry IS NULL AND 'NULL' = ANY(ARRAY[${self.geometry}])) OR 
                 temp_table_0.geometry::text = ANY(ARRAY[${self.geometry}]))
-          AND $__timeFilter(temp_table_0.assembled AT TIME ZONE '{self.timezone}')
+          AND {build_time_filter('temp_table_0.assembled', self.timezone, 'DATE')}
           AND 
                 ('All' = ANY(ARRAY[${self.final_grade}]) OR 
                 (temp_table_1.final_grade IS NULL AND 'NULL' = ANY(ARRAY[${self.final_grade}])) OR 
@@ -68,7 +68,7 @@ WHERE
     ('All' = ANY(ARRAY[${self.final_grade}]) OR
      (module_qc_summary.final_grade IS NULL AND 'NULL' = ANY(ARRAY[${self.final_grade}])) OR
      module_qc_summary.final_grade::text = ANY(ARRAY[${self.final_grade}]))
-  AND $__timeFilter(module_info.assembled AT TIME ZONE '{self.timezone}')
+  AND {build_time_filter('module_info.assembled', self.timezone, 'DATE')}
   AND module_info.bp_material IS NOT NULL
   AND module_info.resolution IS NOT NULL
   AND module_info.roc_version IS NOT NULL
@@ -1,4 +1,8 @@
 from tool.helper import *
+
+DASHBOARD_DATASOURCE = {"type": "datasource", "uid": "-- Dashboard --"}
+SHARED_PANEL_ID = 100   # "X-Y offsets for modules and protomodules": runs every database query of the dashboard
+
 class OffsetPlotsBuilder:
     def __init__(self, datasource_uid, timezone = 'America/New_York'):
         self.datasource_uid = datasource_uid
@@ -36,9 +40,7 @@ class OffsetPlotsBuilder:
                 ('All' = ANY(ARRAY[${self.geometry}]) OR 
                 (module_info.geometry IS NULL AND 'NULL' = ANY(ARRAY[${self.geometry}])) OR 
                 module_info.geometry::text = ANY(ARRAY[${self.geometry}]))
-          AND (module_inspect.date_inspect::timestamp + module_inspect.time_inspect::time)
-                BETWEEN ($__timeFrom() AT TIME ZONE '{self.timezone}')
-                    AND ($__timeTo()   AT TIME ZONE '{self.timezone}')
+          AND {build_time_filter(build_datetime_expression('module_inspect', 'date_inspect'), self.timezone)}
           AND 
                 ('All' = ANY(ARRAY[${self.grade}]) OR 
                 (module_inspect.grade IS NULL AND 'NULL' = ANY(ARRAY[${self.grade}])) OR 
@@ -76,9 +78,7 @@ class OffsetPlotsBuilder:
                 ('All' = ANY(ARRAY[${self.geometry}]) OR 
                 (module_info.geometry IS NULL AND 'NULL' = ANY(ARRAY[${self.geometry}])) OR 
                 module_info.geometry::text = ANY(ARRAY[${self.geometry}]))
-          AND (proto_inspect.date_inspect::timestamp + proto_inspect.time_inspect::time)
-                BETWEEN ($__timeFrom() AT TIME ZONE '{self.timezone}')
-                    AND ($__timeTo()   AT TIME ZONE '{self.timezone}')
+          AND {build_time_filter(build_datetime_expression('proto_inspect', 'date_inspect'), self.timezone)}
           AND 
                 ('All' = ANY(ARRAY[${self.grade}]) OR 
                 (proto_inspect.grade IS NULL AND 'NULL' = ANY(ARRAY[${self.grade}])) OR 
@@ -93,89 +93,47 @@ class OffsetPlotsBuilder:
                 proto_assembly.ass_tray_id::text = ANY(ARRAY[${self.ass_tray_id}]))
         """
 
-        self.module_offset_sql = """
-        SELECT x_offset_mu, y_offset_mu, module_inspect.module_name
-        FROM module_inspect 
-        """ + self.module_filter_sql
-
-        self.proto_offset_sql = """
-        SELECT x_offset_mu, y_offset_mu, proto_inspect.proto_name
-        FROM proto_inspect
-        """ + self.proto_filter_sql
-
-        self.module_offset_range_sql = """
-        WITH range AS (
-            SELECT GREATEST(MAX(ABS(x_offset_mu)), MAX(ABS(y_offset_mu))) AS r
+        # -- Shared queries --
+        # The inspections are queried once per entity, by the "X-Y offsets" panel (SHARED_PANEL_ID).
+        # The other panels read its results through the `-- Dashboard --` datasource and keep their frames and columns -> shared_transformations
+        self.module_offset_sql = self.offset_sql("""
+            SELECT x_offset_mu, y_offset_mu, module_inspect.module_name, module_inspect.ang_offset_deg, 0.05 AS y_zero, module_inspect.avg_thickness
             FROM module_inspect
-            """ + self.module_filter_sql + """
-        )
-        SELECT r AS x_offset_mu, r AS y_offset_mu FROM range
-        UNION ALL
-        SELECT -r AS x_offset_mu, -r AS y_offset_mu FROM range
-        """
+            """ + self.module_filter_sql)
 
-        self.proto_offset_range_sql = """
-        WITH range AS (
-            SELECT GREATEST(MAX(ABS(x_offset_mu)), MAX(ABS(y_offset_mu))) AS r
+        self.proto_offset_sql = self.offset_sql("""
+            SELECT x_offset_mu, y_offset_mu, proto_inspect.proto_name, proto_inspect.ang_offset_deg, 0 AS y_zero, proto_inspect.avg_thickness
             FROM proto_inspect
-            """ + self.proto_filter_sql + """
+            """ + self.proto_filter_sql)
+
+    def offset_sql(self, points_sql: str) -> str:
+        """Append the range of the offsets to the inspections, computed from the same scan.
+           - Two rows with only x_offset_mu = r or y_offset_mu = r, the largest offset: never drawn, but with `axisCenteredZero` the axes are symmetric and the same on x and y.
+        """
+        return f"""
+        WITH points AS ({points_sql}),
+        range AS (
+            SELECT GREATEST(MAX(ABS(x_offset_mu)), MAX(ABS(y_offset_mu))) AS r FROM points
         )
-        SELECT r AS x_offset_mu, r AS y_offset_mu FROM range
+        SELECT * FROM points
+        UNION ALL
+        SELECT r, NULL, NULL, NULL, NULL, NULL FROM range
         UNION ALL
-        SELECT -r AS x_offset_mu, -r AS y_offset_mu FROM range
+        SELECT NULL, r, NULL, NULL, NULL, NULL FROM range
         """
 
-        self.module_avg_thickness_sql = """
-        SELECT module_inspect.avg_thickness
-        FROM module_inspect
-        """ + self.module_filter_sql
-
-        self.proto_avg_thickness_sql = """
-        SELECT proto_inspect.avg_thickness
-        FROM proto_inspect
-        """ + self.proto_filter_sql
-
-        self.module_angular_offset_sql = """
-        SELECT module_inspect.ang_offset_deg
-        FROM module_inspect
-        """ + self.module_filter_sql
-
-        self.proto_angular_offset_sql = """
-        SELECT proto_inspect.ang_offset_deg
-        FROM proto_inspect
-        """ + self.proto_filter_sql
-
-        self.module_ang_vs_zero_sql = """
-        SELECT module_inspect.ang_offset_deg, 0.05 AS y_zero, module_inspect.module_name
-        FROM module_inspect
-        """ + self.module_filter_sql
-
-        self.proto_ang_vs_zero_sql = """
-        SELECT proto_inspect.ang_offset_deg, 0 AS y_zero, proto_inspect.proto_name
-        FROM proto_inspect
-        """ + self.proto_filter_sql
-
-        self.module_ang_range_sql = """
-        WITH range AS (
-            SELECT MAX(ABS(ang_offset_deg)) AS r
-            FROM module_inspect
-            """ + self.module_filter_sql + """
-        )
-        SELECT r AS ang_offset_deg, 0 AS y_zero FROM range
-        UNION ALL
-        SELECT -r AS ang_offset_deg, 0 AS y_zero FROM range
+    def shared_targets(self) -> list:
+        """The query of a panel reading the results of the shared panel.
         """
+        return [{"datasource": DASHBOARD_DATASOURCE, "panelId": SHARED_PANEL_ID, "refId": "A"}]
 
-        self.proto_ang_range_sql = """
-        WITH range AS (
-            SELECT MAX(ABS(ang_offset_deg)) AS r
-            FROM proto_inspect
-            """ + self.proto_filter_sql + """
-        )
-        SELECT r AS ang_offset_deg, 0 AS y_zero FROM range
-        UNION ALL
-        SELECT -r AS ang_offset_deg, 0 AS y_zero FROM range
+    def shared_transformations(self, ref_ids: str, fields: list) -> list:
+        """Keep the frames `ref_ids` (e.g. "B|C") of the shared panel, and their `fields`.
         """
+        return [
+            {"id": "filterByRefId", "options": {"include": ref_ids}},
+            {"id": "filterFieldsByName", "options": {"include": {"names": fields}}},
+        ]
 
     ######################################
     def generate_dashboard_json(self):
@@ -204,10 +162,7 @@ class OffsetPlotsBuilder:
 
     ### Module XY Offset
                 {
-                "datasource": {
-                    "type": "grafana-postgresql-datasource",
-                    "uid": self.datasource_uid
-                },
+                "datasource": DASHBOARD_DATASOURCE,
                 "gridPos": {
                     "h": 14,
                     "w": 12,
@@ -233,80 +188,8 @@ class OffsetPlotsBuilder:
                     }
                 },
                 "pluginVersion": "12.0.0",
-                "targets": [
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.module_offset_sql,
-                    "refId": "A",
-                    "sql": {
-                        "columns": [
-                        {
-                            "parameters": [],
-                            "type": "function"
-                        }
-                        ],
-                        "groupBy": [
-                        {
-                            "property": {
-                            "type": "string"
-                            },
-                            "type": "groupBy"
-                        }
-                        ],
-                        "limit": 50
-                    }
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (-75,-75),(-75,75),(75,75),(75,-75),(-75,-75)) AS t(x_offset_mu, y_offset_mu)",
-                    "refId": "B"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (-110,-110),(-110,110),(110,110),(110,-110),(-110,-110)) AS t(x_offset_mu, y_offset_mu)",
-                    "refId": "C"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (0,0)) AS t(x_offset_mu, y_offset_mu)",
-                    "refId": "D"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.module_offset_range_sql,
-                    "refId": "E"
-                    }
-                ],
+                "targets": self.shared_targets(),
+                "transformations": self.shared_transformations("B|C|D|E", ["module_name", "x_offset_mu", "y_offset_mu"]),
                 "fieldConfig": {
                     "defaults": {
                     "color": {
@@ -348,7 +231,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "A"
+                        "options": "B"
                         },
                         "properties": [
                         {
@@ -384,7 +267,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "B"
+                        "options": "C"
                         },
                         "properties": [
                         {
@@ -419,7 +302,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "C"
+                        "options": "D"
                         },
                         "properties": [
                         {
@@ -454,7 +337,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "D"
+                        "options": "E"
                         },
                         "properties": [
                         {
@@ -481,22 +364,6 @@ class OffsetPlotsBuilder:
                             "value": "circle"
                         }
                         ]
-                    },
-                    {
-                        "matcher": {
-                        "id": "byFrameRefID",
-                        "options": "E"
-                        },
-                        "properties": [
-                        {
-                            "id": "custom.hideFrom",
-                            "value": {
-                            "legend": True,
-                            "tooltip": True,
-                            "viz": True
-                            }
-                        }
-                        ]
                     }
                     ]
                 },
@@ -506,10 +373,7 @@ class OffsetPlotsBuilder:
 
     ### Proto XY Offset
                 {
-                "datasource": {
-                    "type": "grafana-postgresql-datasource",
-                    "uid": self.datasource_uid
-                },
+                "datasource": DASHBOARD_DATASOURCE,
                 "fieldConfig": {
                     "defaults": {
                     "color": {
@@ -587,7 +451,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "B"
+                        "options": "C"
                         },
                         "properties": [
                         {
@@ -622,7 +486,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "C"
+                        "options": "D"
                         },
                         "properties": [
                         {
@@ -657,7 +521,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "D"
+                        "options": "E"
                         },
                         "properties": [
                         {
@@ -684,22 +548,6 @@ class OffsetPlotsBuilder:
                             "value": "circle"
                         }
                         ]
-                    },
-                    {
-                        "matcher": {
-                        "id": "byFrameRefID",
-                        "options": "E"
-                        },
-                        "properties": [
-                        {
-                            "id": "custom.hideFrom",
-                            "value": {
-                            "legend": True,
-                            "tooltip": True,
-                            "viz": True
-                            }
-                        }
-                        ]
                     }
                     ]
                 },
@@ -728,80 +576,8 @@ class OffsetPlotsBuilder:
                     }
                 },
                 "pluginVersion": "12.0.0",
-                "targets": [
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.proto_offset_sql,
-                    "refId": "A",
-                    "sql": {
-                        "columns": [
-                        {
-                            "parameters": [],
-                            "type": "function"
-                        }
-                        ],
-                        "groupBy": [
-                        {
-                            "property": {
-                            "type": "string"
-                            },
-                            "type": "groupBy"
-                        }
-                        ],
-                        "limit": 50
-                    }
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (-75,-75),(-75,75),(75,75),(75,-75),(-75,-75)) AS t(x_offset_mu, y_offset_mu)",
-                    "refId": "B"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (-110,-110),(-110,110),(110,110),(110,-110),(-110,-110)) AS t(x_offset_mu, y_offset_mu)",
-                    "refId": "C"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (0,0)) AS t(x_offset_mu, y_offset_mu)",
-                    "refId": "D"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.proto_offset_range_sql,
-                    "refId": "E"
-                    }
-                ],
+                "targets": self.shared_targets(),
+                "transformations": self.shared_transformations("A|C|D|E", ["proto_name", "x_offset_mu", "y_offset_mu"]),
                 "title": "Proto-Module Offset",
                 "type": "xychart"
                 },
@@ -1012,22 +788,6 @@ class OffsetPlotsBuilder:
                             "value": "circle"
                         }
                         ]
-                    },
-                    {
-                        "matcher": {
-                        "id": "byFrameRefID",
-                        "options": "F"
-                        },
-                        "properties": [
-                        {
-                            "id": "custom.hideFrom",
-                            "value": {
-                            "legend": True,
-                            "tooltip": True,
-                            "viz": True
-                            }
-                        }
-                        ]
                     }
                     ]
                 },
@@ -1154,20 +914,62 @@ class OffsetPlotsBuilder:
                     "editorMode": "code",
                     "format": "table",
                     "rawQuery": True,
-                    "rawSql": self.proto_offset_range_sql,
-                    "refId": "F"
+                    "rawSql": "SELECT * FROM (VALUES (0.04, 1), (0.04, -1)) AS t(ang_offset_deg, y_zero)",
+                    "refId": "H"
+                    },
+                    {
+                    "datasource": {
+                        "type": "grafana-postgresql-datasource",
+                        "uid": self.datasource_uid
+                    },
+                    "editorMode": "code",
+                    "format": "table",
+                    "rawQuery": True,
+                    "rawSql": "SELECT * FROM (VALUES (-0.04, 1), (-0.04, -1)) AS t(ang_offset_deg, y_zero)",
+                    "refId": "I"
+                    },
+                    {
+                    "datasource": {
+                        "type": "grafana-postgresql-datasource",
+                        "uid": self.datasource_uid
+                    },
+                    "editorMode": "code",
+                    "format": "table",
+                    "rawQuery": True,
+                    "rawSql": "SELECT * FROM (VALUES (0.1, 1), (0.1, -1)) AS t(ang_offset_deg, y_zero)",
+                    "refId": "J"
+                    },
+                    {
+                    "datasource": {
+                        "type": "grafana-postgresql-datasource",
+                        "uid": self.datasource_uid
+                    },
+                    "editorMode": "code",
+                    "format": "table",
+                    "rawQuery": True,
+                    "rawSql": "SELECT * FROM (VALUES (-0.1, 1), (-0.1, -1)) AS t(ang_offset_deg, y_zero)",
+                    "refId": "K"
+                    },
+                    {
+                    "datasource": {
+                        "type": "grafana-postgresql-datasource",
+                        "uid": self.datasource_uid
+                    },
+                    "editorMode": "code",
+                    "format": "table",
+                    "rawQuery": True,
+                    "rawSql": "SELECT * FROM (VALUES (0, 0)) AS t(ang_offset_deg, y_zero)",
+                    "refId": "L"
                     }
                 ],
+                "transformations": self.shared_transformations("A|B|C|D|E", ["proto_name", "module_name", "x_offset_mu", "y_offset_mu"]),
                 "title": "X-Y offsets for modules and protomodules",
                 "type": "xychart"
                 },
 
     ### Combined Proto + Module Offset (copy)
                 {
-                "datasource": {
-                    "type": "grafana-postgresql-datasource",
-                    "uid": self.datasource_uid
-                },
+                "datasource": DASHBOARD_DATASOURCE,
                 "fieldConfig": {
                     "defaults": {
                     "color": {
@@ -1253,6 +1055,10 @@ class OffsetPlotsBuilder:
                         {
                             "id": "custom.axisLabel",
                             "value": "ang_offset_deg"
+                        },
+                        {
+                            "id": "custom.axisCenteredZero",
+                            "value": True
                         }
                         ]
                     },
@@ -1275,7 +1081,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "C"
+                        "options": "H"
                         },
                         "properties": [
                         {
@@ -1310,7 +1116,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "D"
+                        "options": "I"
                         },
                         "properties": [
                         {
@@ -1349,7 +1155,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "E2"
+                        "options": "J"
                         },
                         "properties": [
                         {
@@ -1384,7 +1190,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "F2"
+                        "options": "K"
                         },
                         "properties": [
                         {
@@ -1423,7 +1229,7 @@ class OffsetPlotsBuilder:
                     {
                         "matcher": {
                         "id": "byFrameRefID",
-                        "options": "E"
+                        "options": "L"
                         },
                         "properties": [
                         {
@@ -1450,22 +1256,6 @@ class OffsetPlotsBuilder:
                             "value": "circle"
                         }
                         ]
-                    },
-                    {
-                        "matcher": {
-                        "id": "byFrameRefID",
-                        "options": "F"
-                        },
-                        "properties": [
-                        {
-                            "id": "custom.hideFrom",
-                            "value": {
-                            "legend": True,
-                            "tooltip": True,
-                            "viz": True
-                            }
-                        }
-                        ]
                     }
                     ]
                 },
@@ -1494,130 +1284,8 @@ class OffsetPlotsBuilder:
                     }
                 },
                 "pluginVersion": "12.0.0",
-                "targets": [
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.proto_ang_vs_zero_sql,
-                    "refId": "A",
-                    "sql": {
-                        "columns": [
-                        {
-                            "parameters": [],
-                            "type": "function"
-                        }
-                        ],
-                        "groupBy": [
-                        {
-                            "property": {
-                            "type": "string"
-                            },
-                            "type": "groupBy"
-                        }
-                        ],
-                        "limit": 50
-                    }
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.module_ang_vs_zero_sql,
-                    "refId": "B",
-                    "sql": {
-                        "columns": [
-                        {
-                            "parameters": [],
-                            "type": "function"
-                        }
-                        ],
-                        "groupBy": [
-                        {
-                            "property": {
-                            "type": "string"
-                            },
-                            "type": "groupBy"
-                        }
-                        ],
-                        "limit": 50
-                    }
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (0.04, 1), (0.04, -1)) AS t(ang_offset_deg, y_zero)",
-                    "refId": "C"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (-0.04, 1), (-0.04, -1)) AS t(ang_offset_deg, y_zero)",
-                    "refId": "D"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (0.1, 1), (0.1, -1)) AS t(ang_offset_deg, y_zero)",
-                    "refId": "E2"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (-0.1, 1), (-0.1, -1)) AS t(ang_offset_deg, y_zero)",
-                    "refId": "F2"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": "SELECT * FROM (VALUES (0, 0)) AS t(ang_offset_deg, y_zero)",
-                    "refId": "E"
-                    },
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.proto_ang_range_sql,
-                    "refId": "F"
-                    }
-                ],
+                "targets": self.shared_targets(),
+                "transformations": self.shared_transformations("A|B|H|I|J|K|L", ["proto_name", "module_name", "ang_offset_deg", "y_zero"]),
                 "title": "Angular (deg) offsets for modules and protomodules",
                 "type": "xychart"
                 },
@@ -1657,10 +1325,7 @@ class OffsetPlotsBuilder:
                     "overrides": []
                 },
                 "transformations": [
-                    {
-                    "id": "filterFieldsByName",
-                    "options": {}
-                    },
+                    *self.shared_transformations("B", ["avg_thickness"]),
                     {
                     "id": "partitionByValues",
                     "options": {
@@ -1672,23 +1337,8 @@ class OffsetPlotsBuilder:
                     }
                 ],
                 "pluginVersion": "12.0.0",
-                "targets": [
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.module_avg_thickness_sql,
-                    "refId": "A",
-                    }
-                ],
-                "datasource": {
-                    "type": "grafana-postgresql-datasource",
-                    "uid": self.datasource_uid
-                },
+                "targets": self.shared_targets(),
+                "datasource": DASHBOARD_DATASOURCE,
                 "options": {
                     "tooltip": {
                     "mode": "single",
@@ -1748,10 +1398,7 @@ class OffsetPlotsBuilder:
                     "overrides": []
                 },
                 "transformations": [
-                    {
-                    "id": "filterFieldsByName",
-                    "options": {}
-                    },
+                    *self.shared_transformations("A", ["avg_thickness"]),
                     {
                     "id": "partitionByValues",
                     "options": {
@@ -1763,23 +1410,8 @@ class OffsetPlotsBuilder:
                     }
                 ],
                 "pluginVersion": "12.0.0",
-                "targets": [
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.proto_avg_thickness_sql,
-                    "refId": "A",
-                    }
-                ],
-                "datasource": {
-                    "type": "grafana-postgresql-datasource",
-                    "uid": self.datasource_uid
-                },
+                "targets": self.shared_targets(),
+                "datasource": DASHBOARD_DATASOURCE,
                 "options": {
                     "tooltip": {
                     "mode": "single",
@@ -1839,10 +1471,7 @@ class OffsetPlotsBuilder:
                     "overrides": []
                 },
                 "transformations": [
-                    {
-                    "id": "filterFieldsByName",
-                    "options": {}
-                    },
+                    *self.shared_transformations("B", ["ang_offset_deg"]),
                     {
                     "id": "partitionByValues",
                     "options": {
@@ -1854,23 +1483,8 @@ class OffsetPlotsBuilder:
                     }
                 ],
                 "pluginVersion": "12.0.0",
-                "targets": [
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.module_angular_offset_sql,
-                    "refId": "A",
-                    }
-                ],
-                "datasource": {
-                    "type": "grafana-postgresql-datasource",
-                    "uid": self.datasource_uid
-                },
+                "targets": self.shared_targets(),
+                "datasource": DASHBOARD_DATASOURCE,
                 "options": {
                     "tooltip": {
                     "mode": "single",
@@ -1930,10 +1544,7 @@ class OffsetPlotsBuilder:
                     "overrides": []
                 },
                 "transformations": [
-                    {
-                    "id": "filterFieldsByName",
-                    "options": {}
-                    },
+                    *self.shared_transformations("A", ["ang_offset_deg"]),
                     {
                     "id": "partitionByValues",
                     "options": {
@@ -1945,23 +1556,8 @@ class OffsetPlotsBuilder:
                     }
                 ],
                 "pluginVersion": "12.0.0",
-                "targets": [
-                    {
-                    "datasource": {
-                        "type": "grafana-postgresql-datasource",
-                        "uid": self.datasource_uid
-                    },
-                    "editorMode": "code",
-                    "format": "table",
-                    "rawQuery": True,
-                    "rawSql": self.proto_angular_offset_sql,
-                    "refId": "A",
-                    }
-                ],
-                "datasource": {
-                    "type": "grafana-postgresql-datasource",
-                    "uid": self.datasource_uid
-                },
+                "targets": self.shared_targets(),
+                "datasource": DASHBOARD_DATASOURCE,
                 "options": {
                     "tooltip": {
                     "mode": "single",
@@ -8,20 +8,27 @@ This file defines the class for building the panels json file in Grafana.
     - IV Curve Plot
 """
 
+# chart type -> optional panel config keys passed to its SQL generator
+CHART_OPTIONS = {
+    "timeseries": ["aggregate"],    # bucket by `$__interval`: avg / min / max / last
+    "histogram": ["bins", "bin_width"],     # bin in the database: number of bins, or a fixed bin width
+}
+
 class PanelBuilder:
     def __init__(self, datasource_uid):
         self.datasource_uid = datasource_uid
         self.IVCurveBuilder = IVCurveBuilder(datasource_uid)
     
     # -- Regular Panels --
-    def generate_sql(self, chart_type: str, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
+    def generate_sql(self, chart_type: str, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
         """Generate the SQL command from ChartSQLFactory. -> sql_builder.py
+           - options: chart specific keys of the panel config, see CHART_OPTIONS
         """
         # Get Generator
         generator = ChartSQLFactory.get_generator(chart_type)
 
         # Generate SQL command
-        panel_sql = generator.generate_sql(table, condition, groupby, filters, distinct, inputs, contains_inputs)
+        panel_sql = generator.generate_sql(table, condition, groupby, filters, distinct, inputs, contains_inputs, filter_mode, options)
 
         return panel_sql
 
@@ -174,8 +181,9 @@ class PanelBuilder:
         return panel_json
 
     # -- Genarate Panels --
-    def generate_panels_json(self, dashboard_title: str, config_panels: list) -> list:
+    def generate_panels_json(self, dashboard_title: str, config_panels: list, filter_mode: str = "legacy") -> list:
         """Build the panel jsons based on the given config file.
+           - filter_mode: rendering of the multi-value filters, "legacy" or "indexed" (-> FILTER_MODES in helper.py)
         """
         panels = []
         self.assign_gridPos(dashboard_title, config_panels)
@@ -190,9 +198,9 @@ class PanelBuilder:
                     filters, contains_inputs, temp_condition, rel_hum_condition, gridPos, iteration_ilike = self.get_info(panel, chart_type)    # get conditions for SQL
                     if dashboard_title == "MMTS IV_Curve Plot":
                         # simplified query: no N_MODULE_SHOW limit, no show_best_only dedup, page is scoped by batch_name
-                        raw_sql = self.IVCurveBuilder.MMTS_IV_curve_panel_sql(filters, temp_condition, rel_hum_condition, contains_inputs=contains_inputs, iteration_ilike=iteration_ilike)
+                        raw_sql = self.IVCurveBuilder.MMTS_IV_curve_panel_sql(filters, temp_condition, rel_hum_condition, contains_inputs=contains_inputs, iteration_ilike=iteration_ilike, filter_mode=filter_mode)
                     else:
-                        raw_sql = self.IVCurveBuilder.IV_curve_panel_sql(filters, temp_condition, rel_hum_condition, contains_inputs=contains_inputs)    # generate SQL
+                        raw_sql = self.IVCurveBuilder.IV_curve_panel_sql(filters, temp_condition, rel_hum_condition, contains_inputs=contains_inputs, filter_mode=filter_mode)    # generate SQL
                     override = self.IVCurveBuilder.IV_curve_panel_override()   # generate override for xy axises
                     panel_json = self.IVCurveBuilder.generate_IV_curve_panel_new(title, raw_sql, override, gridPos)
 
@@ -200,7 +208,8 @@ class PanelBuilder:
                     title, table, condition, groupby, filters, gridPos, distinct = self.get_info(panel, chart_type)
                     inputs = panel.get("inputs", None)
                     contains_inputs = panel.get("contains_inputs", None)
-                    raw_sql = self.generate_sql(chart_type, table, condition, groupby, filters, distinct, inputs, contains_inputs)
+                    options = {key: panel[key] for key in CHART_OPTIONS.get(chart_type, []) if key in panel}
+                    raw_sql = self.generate_sql(chart_type, table, condition, groupby, filters, distinct, inputs, contains_inputs, filter_mode, options)
                     panel_json = self.generate_general_panel(title, raw_sql, table, chart_type, gridPos)
 
                 panels.append(panel_json)
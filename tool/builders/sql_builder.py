@@ -2,6 +2,8 @@ import copy
 from abc import ABC, abstractmethod
 
 from tool.helper import *
+from tool.builders.sql_ir import SelectQuery, CTE, Join, Predicate, SelectItem, optimize, target_latest_views, DEFAULT_PASSES
+from tool.latest_views import get_latest_view
 
 """
 This file defines the abstract class ChartSQLGenerator and the factory ChartSQLFactory.
@@ -36,62 +38,71 @@ class BaseSQLGenerator(ChartSQLGenerator):
         pass
 
     # Base SQL for all chart types
-    def _build_pre_clause(self, table: str, distinct: list):
-        """Builds the pre-SELECT clause for histogram. 
-           - If distinct is True, it will select the distinct modules.
+    def _build_query(self, table: str, condition: str, filters: dict, distinct: list, inputs: dict, contains_inputs: dict = None, filter_mode: str = "legacy") -> SelectQuery:
+        """Builds the query IR shared by all chart types: CTEs, FROM, joins and WHERE. -> sql_ir.py
+           - The chart types then add their SELECT, GROUP BY and ORDER BY.
         """
-        if distinct:
-            temp_table_list = []
-            pre_clause_list = []
+        ctes, target_table = self._build_ctes(table, distinct)
+        query = SelectQuery(target_table, ctes=ctes)
+        query.where = self._build_predicates(filters, condition, distinct, inputs, contains_inputs, filter_mode)
+        query.joins = self._build_joins(table, filters or {}, distinct)
 
-            for n, table in enumerate(distinct):
-                temp_table_list.append(f"temp_table_{n}")
+        return query
 
-                distinct_column = get_distinct_column_name(table)   # first column name of the table
-                
-                if table in PREFIX:
-                    prefix = PREFIX[table]
-                else:
-                    prefix = table.split("_")[0]
+    def _relation_name(self, table: str, distinct: list) -> str:
+        """Name of the table in the query: `temp_table_X` if it is in the distinct list.
+        """
+        if distinct and table in distinct:
+            return f"temp_table_{distinct.index(table)}"
+        return table
 
-                sort_column = f"{prefix}_name"         # e.g.: hxb_no, module_no...
+    def _build_ctes(self, table: str, distinct: list):
+        """Builds the pre-SELECT CTEs. 
+           - If distinct is True, it will select the distinct modules.
+        """
+        if distinct:
+            ctes = []
 
-                arg = f"""
-                {temp_table_list[n]} AS (
-                SELECT DISTINCT ON ({sort_column}) *
-                FROM {table}
-                ORDER BY {sort_column}, {distinct_column} DESC
-                )"""
+            for n, table in enumerate(distinct):
+                # DISTINCT ON (x_name) ... ORDER BY x_name, <first column> DESC, same as its materialized view
+                view = get_latest_view(table)
+                if view is None:
+                    raise KeyError(f"[Schema] Table not found: {table}")
 
-                pre_clause_list.append(arg)
+                ctes.append(CTE(f"temp_table_{n}", table, distinct_on=view.distinct_on, order_by=view.order_by))
 
-            pre_clause = "WITH" + ",\n".join(pre_clause_list)
-            target_table = temp_table_list[0]   # default: temp_table_0
+            target_table = ctes[0].name   # default: temp_table_0
         
         else:
-            pre_clause = ""
+            ctes = []
             target_table = table
     
-        return pre_clause, target_table
+        return ctes, target_table
     
-    def _build_filter_argument(self, elem: str, filters_table: str) -> str:
+    def _build_filter_argument(self, elem: str, filters_table: str, filter_mode: str = "legacy", source_table: str = None) -> str:
         """Builds the filter argument for the WHERE clause.
+           - filter_mode: "legacy" or "indexed" (-> FILTER_MODES in helper.py)
+           - source_table: table of `filters_table` when it is an alias, used to look up the column type
         """
+        # "indexed": 'All' is the variable's custom all value, and values are quoted by `:sqlstring`
+        if filter_mode == "indexed":
+            param = f"${{{elem}:sqlstring}}"
+            all_value = f"'{FILTER_ALL_VALUE}'"
+        else:
+            param = f"${{{elem}}}"
+            all_value = "'All'"
+
         # shipped / not shipped
         if elem == "shipping_status":
-            param = "${shipping_status}"
-            arg = f"""('All' = ANY(ARRAY[{param}]) OR 
+            arg = f"""({all_value} = ANY(ARRAY[{param}]) OR 
                     (shipped_datetime IS NULL AND 'not shipped' = ANY(ARRAY[{param}])) OR
                     (shipped_datetime IS NOT NULL AND 'shipped' = ANY(ARRAY[{param}])))"""
         elif elem == "wirebond_status":
-            param = "${wirebond_status}"
-            arg = f"""('All' = ANY(ARRAY[{param}]) OR 
+            arg = f"""({all_value} = ANY(ARRAY[{param}]) OR 
                     (wb_front IS NULL AND 'not front bonded' = ANY(ARRAY[{param}])) OR
                     (wb_front IS NOT NULL AND 'front bonded' = ANY(ARRAY[{param}])))"""
 
         elif elem in DERIVED_FILTER_SQL and filters_table == "proto_assembly":
-            param = f"${{{elem}}}"
-
             # Build the SQL expression, plugging in the table alias/name
             expr = DERIVED_FILTER_SQL[elem].format(t=filters_table)
 
@@ -104,24 +115,65 @@ class BaseSQLGenerator(ChartSQLGenerator):
 
             # Same “All / NULL / value” logic, but using expr instead of column
             arg = f"""
-                ('All' = ANY(ARRAY[{param}]) OR
+                ({all_value} = ANY(ARRAY[{param}]) OR
                 ({expr} IS NULL AND 'NULL' = ANY(ARRAY[{param}])) OR
                 ({expr})::text = ANY(ARRAY[{param}]))
             """
 
-        # time: using the Grafana built-in time filter
+        # time: the dashboard time range, converted to the column's type so the column stays bare
         elif elem in TIME_COLUMNS:
-            arg = f"$__timeFilter({filters_table}.{elem} AT TIME ZONE '{TIME_ZONE}')"
-        
+            arg = self._build_time_argument(elem, filters_table, source_table or filters_table)
+
         # General Cases
+        elif filter_mode == "indexed":
+            arg = self._build_indexed_filter_argument(elem, filters_table, source_table or filters_table)
+
         else:
-            param = f"${{{elem}}}"
             arg = f"""
                 ('All' = ANY(ARRAY[{param}]) OR 
                 ({filters_table}.{elem} IS NULL AND 'NULL' = ANY(ARRAY[{param}])) OR 
                 {filters_table}.{elem}::text = ANY(ARRAY[{param}]))"""
 
         return arg
+
+    def _build_time_argument(self, elem: str, filters_table: str, source_table: str) -> str:
+        """Builds the time range argument of a time column. -> build_time_filter in helper.py
+           - A `TIME` column is only meaningful with its date: the pair is filtered as `(date + time)` (DATETIME_PAIRS).
+        """
+        from tool.schema import get_schema_catalog
+
+        col_type = get_schema_catalog().column_type(source_table, elem)
+        if col_type == "TIME":
+            date_column = next((d for d, t in DATETIME_PAIRS.items() if t == elem), None)
+            if date_column is not None:
+                return build_time_filter(build_datetime_expression(filters_table, date_column), settings.TIME_ZONE)
+
+        return build_time_filter(f"{filters_table}.{elem}", settings.TIME_ZONE, col_type)
+
+    def _build_indexed_filter_argument(self, elem: str, filters_table: str, source_table: str) -> str:
+        """Builds the "indexed" filter argument of a column.
+           - 'All' makes the first term constant TRUE, so the planner drops the whole predicate.
+           - A selection is matched with `column = ANY(...)` on the column's own type, without casting the column, so an index on it can be used.
+        """
+        from tool.schema import get_schema_catalog
+
+        column = f"{filters_table}.{elem}"
+        values = f"ARRAY[${{{elem}:sqlstring}}]"
+        col_type = get_schema_catalog().column_type(source_table, elem)
+
+        is_array = col_type is not None and "[" in col_type
+        if col_type is None or (col_type.startswith(("TEXT", "VARCHAR", "CHAR")) and not is_array):
+            match = f"{column} = ANY({values})"
+        elif is_array or col_type.startswith("BYTEA"):
+            match = f"{column}::text = ANY({values})"      # no equality on the native type
+        else:
+            # drop the non-values before the cast, `'NULL'::INT` would fail
+            match = f"{column} = ANY(array_remove(array_remove({values}, '{FILTER_ALL_VALUE}'), 'NULL')::{col_type}[])"
+
+        return f"""
+                ('{FILTER_ALL_VALUE}' = ANY({values}) OR 
+                ({column} IS NULL AND 'NULL' = ANY({values})) OR 
+                {match})"""
     
     def _build_input_argument(self, elem: str, inputs_table) -> str:
         """Builds the input argument for the WHERE clause.
@@ -137,67 +189,49 @@ class BaseSQLGenerator(ChartSQLGenerator):
 
         return arg
 
-    def _build_where_clause(self, filters: dict, condition: str, table: str, distinct: list, inputs: dict, contains_inputs: dict = None):
-        """Builds the WHERE clause from filters and condition. 
+    def _build_filter_predicate(self, elem: str, filters_table: str, filter_mode: str = "legacy", source_table: str = None) -> Predicate:
+        """Builds the filter argument for the WHERE clause, with the relation it references.
         """
-        original_filters = copy.deepcopy(filters)   # make a copy of the original filters
-
-        where_clauses = [] 
-        where_arg = ""
+        arg = self._build_filter_argument(elem, filters_table, filter_mode, source_table)
 
-        if filters:
-            filters_table_list = list(filters.keys())  
+        # status filters use unqualified columns
+        if elem in ("shipping_status", "wirebond_status"):
+            return Predicate(arg, kind="filter")
 
-            # update table name with distinct condition
-            for filters_table in filters_table_list:
-                if distinct:
-                    if filters_table in distinct:
-                        index = distinct.index(filters_table)
-                        filters[f"temp_table_{index}"] = filters.pop(f"{filters_table}")
-                        filters_table = f"temp_table_{index}"
-            
-                for elem in filters[filters_table]:
-                    arg = self._build_filter_argument(elem, filters_table)
-                    where_clauses.append(arg)
-        if condition:
-            where_clauses.append(condition) 
-        
-        where_arg = "\n          AND ".join(where_clauses)
+        if elem in TIME_COLUMNS:
+            columns = {elem} | {d for d, t in DATETIME_PAIRS.items() if t == elem}     # a `TIME` column is filtered with its date
+            return Predicate(arg, {filters_table}, columns, kind="time")
+        return Predicate(arg, {filters_table}, {elem}, kind="filter")
 
-        if inputs:
-            inputs_table_list = list(inputs.keys())
-
-            for inputs_table in inputs_table_list:
-                if distinct:
-                    if inputs_table in distinct:
-                        index = distinct.index(inputs_table)
-                        inputs[f"temp_table_{index}"] = inputs.pop(f"{inputs_table}")
-                        inputs_table = f"temp_table_{index}"
+    def _build_predicates(self, filters: dict, condition: str, distinct: list, inputs: dict, contains_inputs: dict = None, filter_mode: str = "legacy") -> list:
+        """Builds the WHERE predicates from filters, condition and inputs. 
+        """
+        predicates = []
 
-                for elem in inputs[inputs_table]:
-                    arg = self._build_input_argument(elem, inputs_table)
-                    where_clauses.append(arg)
+        for filters_table, elems in (filters or {}).items():
+            relation = self._relation_name(filters_table, distinct)
+            for elem in elems:
+                predicates.append(self._build_filter_predicate(elem, relation, filter_mode, filters_table))
 
-        if contains_inputs:
-            contains_inputs_table_list = list(contains_inputs.keys())
+        if condition:
+            predicates.append(Predicate(condition))
 
-            for inputs_table in contains_inputs_table_list:
-                if distinct:
-                    if inputs_table in distinct:
-                        index = distinct.index(inputs_table)
-                        contains_inputs[f"temp_table_{index}"] = contains_inputs.pop(f"{inputs_table}")
-                        inputs_table = f"temp_table_{index}"
+        for inputs_table, elems in (inputs or {}).items():
+            relation = self._relation_name(inputs_table, distinct)
+            for elem in elems:
+                predicates.append(Predicate(self._build_input_argument(elem, relation), {relation}, {elem}, kind="input"))
 
-                for elem in contains_inputs[inputs_table]:
-                    arg = self._build_contains_input_argument(elem, inputs_table)
-                    where_clauses.append(arg)
+        for inputs_table, elems in (contains_inputs or {}).items():
+            relation = self._relation_name(inputs_table, distinct)
+            for elem in elems:
+                predicates.append(Predicate(self._build_contains_input_argument(elem, relation), {relation}, {elem}, kind="contains_input"))
 
-        return "\n          AND ".join(where_clauses), original_filters
+        return predicates
 
-    def _build_join_clause(self, table: str, filters: dict, distinct: list) -> str:
-        """Builds the LEFT JOIN command by using the foreign key.
+    def _build_joins(self, table: str, filters: dict, distinct: list) -> list:
+        """Builds the LEFT JOINs by using the foreign key.
         """
-        join_clause = []
+        joins = []
 
         # define the main table for LEFT JOIN
         main_table = "temp_table_0" if distinct else table
@@ -208,10 +242,7 @@ class BaseSQLGenerator(ChartSQLGenerator):
         else:
             main_prefix = table.split("_")[0]
 
-        # Map table -> {main_prefix}_{postfix}
-        filters_table_list = list(filters.keys())
-
-        for filters_table in filters_table_list:
+        for filters_table in filters:
             # Skip self-join
             if filters_table == table or filters_table == main_table:
                 continue
@@ -221,19 +252,18 @@ class BaseSQLGenerator(ChartSQLGenerator):
                 postfix = "no"
             else:
                 postfix = "name"
-            
-            # Special case for dictionary groupby
-            if distinct:
-                if filters_table in distinct:
-                    index = distinct.index(filters_table)     # get the index for temp_table_X
-                    filters[f"temp_table_{index}"] = filters.pop(f"{filters_table}")    # update the filters table name in `filters`
-                    filters_table = f"temp_table_{index}"   # update the filters table name in the join clause
-
-            arg = f"LEFT JOIN {filters_table} ON {main_table}.{main_prefix}_{postfix} = {filters_table}.{main_prefix}_{postfix}"
 
-            join_clause.append(arg)
+            joins.append(Join(self._relation_name(filters_table, distinct), filters_table, main_table, f"{main_prefix}_{postfix}"))
         
-        return "\n        ".join(join_clause)
+        return joins
+
+    def _optimize(self, query: SelectQuery) -> SelectQuery:
+        """Runs the rewrite passes over the query IR. -> sql_ir.py
+           - With `latest_views: true` in db_conn.yaml, the `distinct` CTEs read the materialized views first.
+        """
+        if settings.DB_LATEST_VIEWS:
+            return optimize(query, [target_latest_views] + DEFAULT_PASSES)
+        return optimize(query)
     
     def _build_select_argument(self, table: str, elem: Any, TYPE="::text") -> str:
         """Builds the select argument for the SELECT clause.
@@ -274,27 +304,26 @@ class BaseSQLGenerator(ChartSQLGenerator):
 
 # -- Bar Chart --
 class BarChartGenerator(BaseSQLGenerator):
-    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
-        pre_clause, target_table = self._build_pre_clause(table, distinct)
-        select_clause = self._build_select_clause(table, groupby, distinct)
-        where_clause, original_filters = self._build_where_clause(filters, condition, table, distinct, inputs, contains_inputs)
-        join_clause = self._build_join_clause(table, original_filters, distinct)
+    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
+        query = self._build_query(table, condition, filters, distinct, inputs, contains_inputs, filter_mode)
+        query.select = self._build_select_items(table, groupby, distinct)
+        query = self._optimize(query)
 
         sql = f"""
-        {pre_clause}
+        {query.render_ctes()}
         SELECT
-            {select_clause} AS label,
+            {query.render_select(" || '/' || ")} AS label,
             COUNT(*) AS count
-        FROM {target_table}
-        {join_clause}
-        WHERE {where_clause}
+        FROM {query.from_table}
+        {query.render_joins()}
+        WHERE {query.render_where()}
         GROUP BY label
         ORDER BY label;
         """
         return sql.strip()
     
-    def _build_select_clause(self, table: str, groupby: list, distinct: bool) -> str:
-        """Builds the SELECT clause by joining all groupby fields.
+    def _build_select_items(self, table: str, groupby: list, distinct: bool) -> list:
+        """Builds the SELECT items of all groupby fields, joined into one label.
         """
         groupby_fields = []
 
@@ -304,31 +333,129 @@ class BarChartGenerator(BaseSQLGenerator):
         for elem in groupby:
             arg = self._build_select_argument(table, elem)
             if arg:
-                groupby_fields.append(arg)
+                groupby_fields.append(SelectItem(arg, {table}))
 
-        return " || '/' || ".join(groupby_fields)
+        return groupby_fields
 
 
 # -- Histogram --
 class HistogramGenerator(BaseSQLGenerator):
-    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
-        pre_clause, target_table = self._build_pre_clause(table, distinct)
-        select_clause = self._build_select_clause(table, groupby, distinct)
-        where_clause, original_filters = self._build_where_clause(filters, condition, table, distinct, inputs, contains_inputs)
-        join_clause = self._build_join_clause(table, original_filters, distinct)
+    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
+        options = options or {}
+        bins, bin_width = options.get("bins"), options.get("bin_width")
+
+        query = self._build_query(table, condition, filters, distinct, inputs, contains_inputs, filter_mode)
+        if bins or bin_width:
+            query.select = [self._build_value_item(table, groupby, distinct)]
+            query = self._optimize(query)
+            return self._render_binned_sql(query, self._value_name(groupby[0]), bins, bin_width)
+
+        query.select = self._build_select_items(table, groupby, distinct)
+        query = self._optimize(query)
 
         sql = f"""
-        {pre_clause}
-        SELECT {select_clause}
-        FROM {target_table}
-        {join_clause}
-        WHERE {where_clause}
+        {query.render_ctes()}
+        SELECT {query.render_select()}
+        FROM {query.from_table}
+        {query.render_joins()}
+        WHERE {query.render_where()}
         """
 
         return sql
+
+    def _build_value_item(self, table: str, groupby: list, distinct: bool) -> SelectItem:
+        """Builds the value to bin from groupby, without alias. 
+        """
+        if distinct:
+            table = "temp_table_0"
+
+        if len(groupby) > 1:
+            raise ValueError("Histogram groupby list should have only 1 element.")
+
+        elem = groupby[0]
+        if isinstance(elem, dict):
+            columns = [next(iter(elem))]
+        elif isinstance(elem, list):
+            columns = elem
+        else:
+            columns = [elem]
+
+        args = [self._build_select_argument(table, column, TYPE="") for column in columns]
+        value = args[0] if len(args) == 1 else f"COALESCE({', '.join(args)})"
+
+        return SelectItem(value, {table})
+
+    def _value_name(self, elem: Any) -> str:
+        """Name of the SELECT column built from the groupby element.
+        """
+        if isinstance(elem, dict):
+            return next(iter(elem.values()))    # {"col": "alias"}
+        if isinstance(elem, list):
+            return elem[0]                      # COALESCE(...) as first column
+        return elem
+
+    def _render_binned_sql(self, query: SelectQuery, name: str, bins: int = None, bin_width: float = None) -> str:
+        """Renders the histogram binned in the database: one row per non-empty bin, as `xMin`, `xMax` and the count.
+           - Grafana's histogram panel takes `xMin` / `xMax` fields as pre-computed buckets.
+           - bins: number of equal bins between MIN and MAX of the values, computed in the same query (`width_bucket`).
+           - bin_width: fixed bins aligned on multiples of the width.
+        """
+        if bins and bin_width:
+            raise ValueError("Histogram takes either `bins` or `bin_width`, not both.")
+        if (bins and (not isinstance(bins, int) or bins < 1)) or (bin_width and bin_width <= 0):
+            raise ValueError(f"Histogram `bins` must be a positive integer and `bin_width` positive, got bins={bins}, bin_width={bin_width}.")
+
+        ctes = f"{query.render_ctes()}," if query.ctes else "WITH"
+        values_cte = f"""
+        {ctes}
+        hist_values AS (
+            SELECT ({query.render_select()})::float8 AS value
+            FROM {query.from_table}
+            {query.render_joins()}
+            WHERE {query.render_where()}
+        )"""
+
+        if bin_width:
+            sql = f"""{values_cte}
+        SELECT
+            floor(value / {bin_width}) * {bin_width} AS "xMin",
+            (floor(value / {bin_width}) + 1) * {bin_width} AS "xMax",
+            COUNT(*) AS "{name}"
+        FROM hist_values
+        WHERE value IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1;
+        """
+        else:
+            # the maximum falls on the upper bound -> bucket bins + 1, kept in the last bin
+            sql = f"""{values_cte},
+        hist_range AS (
+            SELECT MIN(value) AS lo, MAX(value) AS hi
+            FROM hist_values
+        ),
+        hist_bins AS (
+            SELECT
+                CASE WHEN hist_range.hi > hist_range.lo
+                     THEN LEAST(width_bucket(hist_values.value, hist_range.lo, hist_range.hi, {bins}), {bins})
+                     ELSE 1 END AS bin,
+                hist_range.lo,
+                (hist_range.hi - hist_range.lo) / {bins} AS width
+            FROM hist_values, hist_range
+            WHERE hist_values.value IS NOT NULL
+        )
+        SELECT
+            lo + (bin - 1) * width AS "xMin",
+            lo + bin * width AS "xMax",
+            COUNT(*) AS "{name}"
+        FROM hist_bins
+        GROUP BY bin, lo, width
+        ORDER BY bin;
+        """
+
+        return sql.strip()
     
-    def _build_select_clause(self, table: str, groupby: list, distinct: bool) -> str:
-        """Builds the SELECT clause from groupby. 
+    def _build_select_items(self, table: str, groupby: list, distinct: bool) -> list:
+        """Builds the SELECT item from groupby. 
            - For histogram, there should only be 1 element in groupby.
         """
         if distinct:
@@ -342,31 +469,45 @@ class HistogramGenerator(BaseSQLGenerator):
         elem = groupby[0]
         groupby_fields = self._build_select_argument(table, elem, TYPE="")
 
-        return groupby_fields
+        return [SelectItem(groupby_fields, {table})]
 
 
 # -- Timeseries --
 class TimeseriesGenerator(BaseSQLGenerator):
-    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
-        pre_clause, target_table = self._build_pre_clause(table, distinct)
-        select_clause = self._build_select_clause(table, groupby, distinct)
-        where_clause, original_filters = self._build_where_clause(filters, condition, table, distinct, inputs, contains_inputs)
-        join_clause = self._build_join_clause(table, original_filters, distinct)
-        orderby_clause = self._build_orderby_clause(groupby)
+    # options["aggregate"] -> aggregate of a time bucket, `{col}` / `{time}` are the value / time column
+    AGGREGATES = {
+        "avg": "AVG({col})",
+        "min": "MIN({col})",
+        "max": "MAX({col})",
+        "last": "(ARRAY_AGG({col} ORDER BY {time} DESC))[1]",
+    }
+
+    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
+        aggregate = (options or {}).get("aggregate")
+
+        query = self._build_query(table, condition, filters, distinct, inputs, contains_inputs, filter_mode)
+        if aggregate:
+            query.select = self._build_bucketed_select_items(table, groupby, distinct, aggregate)
+            query.group_by, query.order_by = self._build_bucketed_groupby_orderby(table, groupby, distinct)
+            query.where.extend(self._build_bucket_time_predicates(table, groupby, distinct, filters, filter_mode))
+        else:
+            query.select = self._build_select_items(table, groupby, distinct)
+            query.group_by, query.order_by = self._build_groupby_orderby(groupby)
+        query = self._optimize(query)
 
         sql = f"""
-        {pre_clause}
+        {query.render_ctes()}
         SELECT 
-            {select_clause}
-        FROM {target_table}
-        {join_clause}
-        WHERE {where_clause}
-        {orderby_clause};
+            {query.render_select()}
+        FROM {query.from_table}
+        {query.render_joins()}
+        WHERE {query.render_where()}
+        {self._render_orderby_clause(query)};
         """
         return sql.strip()
 
-    def _build_select_clause(self, table: str, groupby: list, distinct: bool) -> str:
-        """Builds the SELECT clause from groupby.    
+    def _split_groupby(self, groupby: list) -> tuple:
+        """Split groupby into its (time, element, partition) columns.
         """
         # Check lenghth of groupby:
         if len(groupby) > 3:
@@ -377,7 +518,7 @@ class TimeseriesGenerator(BaseSQLGenerator):
             raise ValueError("Timeseries groupby list should contain time column.")
         
         # assign time and element
-        partition = None    # initialize
+        time, elem, partition = None, None, None
         for col in groupby:
             if col in TIME_COLUMNS:
                 time = col
@@ -386,33 +527,86 @@ class TimeseriesGenerator(BaseSQLGenerator):
             else:
                 elem = col
 
+        return time, elem, partition
+
+    def _build_select_items(self, table: str, groupby: list, distinct: bool) -> list:
+        """Builds the SELECT items from groupby.    
+        """
+        time, elem, partition = self._split_groupby(groupby)
+
         select_clause = []
 
         if distinct:
             table = "temp_table_0"
 
         # Time
-        time_arg = f"{table}.{time} AT TIME ZONE '{TIME_ZONE}' AS date"
-        select_clause.append(time_arg)
+        time_arg = f"{table}.{time} AT TIME ZONE '{settings.TIME_ZONE}' AS date"
+        select_clause.append(SelectItem(time_arg, {table}))
 
         # Element
         if elem.startswith("list"):
-            elem_arg = f"COALESCE(array_length({table}.{elem}::int[], 1), 0) AS {elem}"
+            select_clause.append(SelectItem(f"COALESCE(array_length({table}.{elem}::int[], 1), 0) AS {elem}", {table}))
         elif elem == "count":
-            elem_arg = "COUNT(*) AS count"
+            select_clause.append(SelectItem("COUNT(*) AS count", set()))
         else:
-            elem_arg = f"{table}.{elem} AS {elem}"
-        select_clause.append(elem_arg)
+            select_clause.append(SelectItem(f"{table}.{elem} AS {elem}", {table}))
 
         # Partition
         if partition:
-            elem_arg = f"{table}.{partition} AS {partition}"
-            select_clause.append(elem_arg)
+            select_clause.append(SelectItem(f"{table}.{partition} AS {partition}", {table}))
 
-        return ",\n            ".join(select_clause)
+        return select_clause
     
-    def _build_orderby_clause(self, groupby: list) -> str:
-        """Builds the ORDER BY clause from groupby.
+    # -- Bucketed: one row per `$__interval` (and partition) --
+    def _build_bucketed_select_items(self, table: str, groupby: list, distinct: bool, aggregate: str) -> list:
+        """Builds the SELECT items of a bucketed timeseries.
+           - The time is grouped by `$__timeGroupAlias` into buckets of `$__interval`, which Grafana sizes from the time range and the panel width.
+           - The element is reduced by `aggregate` (AGGREGATES) per bucket, or counted if it is `count`.
+        """
+        if aggregate not in self.AGGREGATES:
+            raise ValueError(f"Unsupported timeseries aggregate: {aggregate} (expected one of {list(self.AGGREGATES)})")
+
+        time, elem, partition = self._split_groupby(groupby)
+        if distinct:
+            table = "temp_table_0"
+
+        select_clause = [SelectItem(f"$__timeGroupAlias({table}.{time} AT TIME ZONE '{settings.TIME_ZONE}', $__interval)", {table})]
+
+        if elem == "count":
+            select_clause.append(SelectItem("COUNT(*) AS count", set()))
+        else:
+            column = f"{table}.{elem}"
+            if elem.startswith("list"):
+                column = f"COALESCE(array_length({table}.{elem}::int[], 1), 0)"
+            value = self.AGGREGATES[aggregate].format(col=column, time=f"{table}.{time}")
+            select_clause.append(SelectItem(f"{value} AS {elem}", {table}))
+
+        if partition:
+            select_clause.append(SelectItem(f"{table}.{partition} AS {partition}", {table}))
+
+        return select_clause
+
+    def _build_bucketed_groupby_orderby(self, table: str, groupby: list, distinct: bool) -> tuple:
+        """Builds the GROUP BY and ORDER BY expressions of a bucketed timeseries: the bucket (1st column) and the partition.
+        """
+        _, _, partition = self._split_groupby(groupby)
+        if distinct:
+            table = "temp_table_0"
+
+        group_by = ["1"] + ([f"{table}.{partition}"] if partition else [])
+        return group_by, ["1"]
+
+    def _build_bucket_time_predicates(self, table: str, groupby: list, distinct: bool, filters: dict, filter_mode: str = "legacy") -> list:
+        """Builds the time range predicate of the bucketed time column, unless it is already a filter.
+           - `$__interval` is sized for the dashboard time range, so the rows outside it are not read.
+        """
+        time, _, _ = self._split_groupby(groupby)
+        if time in (filters or {}).get(table, []):
+            return []
+        return [self._build_filter_predicate(time, self._relation_name(table, distinct), filter_mode, table)]
+
+    def _build_groupby_orderby(self, groupby: list) -> tuple:
+        """Builds the GROUP BY and ORDER BY expressions from groupby.
         """
         # assign time and element
         for col in groupby:
@@ -421,10 +615,18 @@ class TimeseriesGenerator(BaseSQLGenerator):
             else:
                 elem = col
 
+        group_by = [time] if elem == "count" else []
+        order_by = [time]
+
+        return group_by, order_by
+
+    def _render_orderby_clause(self, query: SelectQuery) -> str:
+        """Renders the GROUP BY and ORDER BY clause.
+        """
         clause = []
 
-        groupby_arg = f"GROUP BY {time}" if elem == "count" else ""
-        orderby_arg = f"ORDER BY {time}"
+        groupby_arg = f"GROUP BY {', '.join(query.group_by)}" if query.group_by else ""
+        orderby_arg = f"ORDER BY {', '.join(query.order_by)}"
 
         clause.append(groupby_arg)
         clause.append(orderby_arg)
@@ -434,23 +636,23 @@ class TimeseriesGenerator(BaseSQLGenerator):
 
 # -- Text Chart --
 class TextChartGenerator(BaseSQLGenerator):
-    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
+    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
         return None
 
 
 # -- Stat Chart --
 class StatChartGenerator(BaseSQLGenerator):
-    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
-        pre_clause, target_table = self._build_pre_clause(table, distinct)
-        where_clause, original_filters = self._build_where_clause(filters, condition, table, distinct, inputs, contains_inputs)
-        join_clause = self._build_join_clause(table, original_filters, distinct)
+    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
+        query = self._build_query(table, condition, filters, distinct, inputs, contains_inputs, filter_mode)
+        query.select = [SelectItem("COUNT(*) AS count", set())]
+        query = self._optimize(query)
         
         sql = f"""
-        {pre_clause}
-        SELECT COUNT(*) AS count
-        FROM {target_table}
-        {join_clause}
-        WHERE {where_clause}
+        {query.render_ctes()}
+        SELECT {query.render_select()}
+        FROM {query.from_table}
+        {query.render_joins()}
+        WHERE {query.render_where()}
         """
 
         return sql.strip()
@@ -458,24 +660,23 @@ class StatChartGenerator(BaseSQLGenerator):
 
 # -- Table Chart --
 class TableGenerator(BaseSQLGenerator):
-    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
-        pre_clause, target_table = self._build_pre_clause(table, distinct)
-        select_clause = self._build_select_clause(table, groupby, distinct)
-        where_clause, original_filters = self._build_where_clause(filters, condition, table, distinct, inputs, contains_inputs)
-        join_clause = self._build_join_clause(table, original_filters, distinct)
+    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
+        query = self._build_query(table, condition, filters, distinct, inputs, contains_inputs, filter_mode)
+        query.select = self._build_select_items(table, groupby, distinct)
+        query = self._optimize(query)
 
         sql = f"""
-        {pre_clause}
+        {query.render_ctes()}
         SELECT 
-            {select_clause}
-        FROM {target_table}
-        {join_clause}
-        WHERE {where_clause}
+            {query.render_select()}
+        FROM {query.from_table}
+        {query.render_joins()}
+        WHERE {query.render_where()}
         """
         return sql.strip()
 
-    def _build_select_clause(self, table: str, groupby: Any, distinct: bool) -> str:
-        """Builds the SELECT clause by joining all groupby fields.
+    def _build_select_items(self, table: str, groupby: Any, distinct: bool) -> list:
+        """Builds the SELECT items of all groupby fields.
         """
         groupby_fields = []
 
@@ -488,7 +689,7 @@ class TableGenerator(BaseSQLGenerator):
                 if elem == "row_count":
                     prefix = PREFIX[table.split("_")[0]]
                     arg = f"ROW_NUMBER() OVER (ORDER BY {temp_table}.{prefix}_name) AS no"
-                    groupby_fields.append(arg)
+                    groupby_fields.append(SelectItem(arg, {temp_table}))
                 else:
                     cols = [elem]
                     for col in cols:
@@ -502,7 +703,7 @@ class TableGenerator(BaseSQLGenerator):
                     if col == "row_count":
                         prefix = PREFIX[original_table.split("_")[0]]
                         arg = f"ROW_NUMBER() OVER (ORDER BY {temp_table}.{prefix}_name) AS no"
-                        groupby_fields.append(arg)
+                        groupby_fields.append(SelectItem(arg, {temp_table}))
                     else:
                         pairs.append((temp_table, col))
 
@@ -510,31 +711,31 @@ class TableGenerator(BaseSQLGenerator):
         for table_name, col in pairs:
             arg = self._build_select_argument(table_name, col)
             if arg:
-                groupby_fields.append(arg)
+                groupby_fields.append(SelectItem(arg, {table_name}))
 
-        return ",\n            ".join(groupby_fields)
+        return groupby_fields
 
 
 # -- Gauge Chart --
 class GaugeGenerator(BaseSQLGenerator):
-    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
-        pre_clause, target_table = self._build_pre_clause(table, distinct)
-        select_clause = self._build_select_clause(table, groupby, distinct)
-        where_clause, original_filters = self._build_where_clause(filters, condition, table, distinct, inputs, contains_inputs)
-        join_clause = self._build_join_clause(table, original_filters, distinct)
+    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
+        query = self._build_query(table, condition, filters, distinct, inputs, contains_inputs, filter_mode)
+        query.select = self._build_select_items(table, groupby, distinct)
+        query = self._optimize(query)
+        select_clause = query.render_select(",\n               ")
 
         sql = f"""
-        {pre_clause}
+        {query.render_ctes()}
         SELECT 
             {select_clause}
-        FROM {target_table}
-        {join_clause}
-        WHERE {where_clause}
+        FROM {query.from_table}
+        {query.render_joins()}
+        WHERE {query.render_where()}
         """
         return sql.strip()
 
-    def _build_select_clause(self, table: str, groupby: list, distinct: bool) -> str:
-        """Builds the SELECT clause by joining all groupby fields.
+    def _build_select_items(self, table: str, groupby: list, distinct: bool) -> list:
+        """Builds the SELECT items of all groupby fields.
         """
         groupby_fields = []
 
@@ -544,27 +745,29 @@ class GaugeGenerator(BaseSQLGenerator):
         for elem in groupby:
             arg = self._build_select_argument(table, elem, TYPE="")
             if arg:
-                groupby_fields.append(arg)
+                groupby_fields.append(SelectItem(arg, {table}))
         
-        return ",\n               ".join(groupby_fields)
+        return groupby_fields
 
 
 # -- Pie Chart --
 class PieChartGenerator(BaseSQLGenerator):
-    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None) -> str:
-        pre_clause, target_table = self._build_pre_clause(table, distinct)
-        where_clause, original_filters = self._build_where_clause(filters, condition, table, distinct, inputs, contains_inputs)
-        join_clause = self._build_join_clause(table, original_filters, distinct)
+    def generate_sql(self, table: str, condition: str, groupby: list, filters: list, distinct: bool, inputs: list, contains_inputs: dict = None, filter_mode: str = "legacy", options: dict = None) -> str:
+        query = self._build_query(table, condition, filters, distinct, inputs, contains_inputs, filter_mode)
+        query.select = [
+            SelectItem("COUNT(*) FILTER (WHERE shipped_datetime IS NULL) AS not_shipped"),
+            SelectItem("COUNT(*) FILTER (WHERE shipped_datetime IS NOT NULL) AS shipped"),
+            SelectItem("COUNT(*) FILTER (WHERE temp_table_1.final_grade = 'F') AS grade_f")
+        ]
+        query = self._optimize(query)
 
         sql = f"""
-        {pre_clause}
+        {query.render_ctes()}
         SELECT 
-            COUNT(*) FILTER (WHERE shipped_datetime IS NULL) AS not_shipped,
-            COUNT(*) FILTER (WHERE shipped_datetime IS NOT NULL) AS shipped,
-            COUNT(*) FILTER (WHERE temp_table_1.final_grade = 'F') AS grade_f
-        FROM {target_table}
-        {join_clause}
-        WHERE {where_clause}
+            {query.render_select()}
+        FROM {query.from_table}
+        {query.render_joins()}
+        WHERE {query.render_where()}
         """
         return sql.strip()
 
@@ -0,0 +1,301 @@
+import re
+
+"""
+This file defines the intermediate representation (IR) of the panel SQL built by `sql_builder.py`, and the passes that rewrite it.
+    - The generators in `sql_builder.py` emit a `SelectQuery`, run it through `optimize`, and then render it.
+    - The IR classes:
+        - CTE: `temp_table_N AS (SELECT DISTINCT ON (...) * FROM table ...)`
+        - Join: `LEFT JOIN target ON left.column = target.column`
+        - Predicate: one AND-ed term of a WHERE clause, and the relations it references
+        - SelectItem: one SELECT expression, and the relations it references
+        - SelectQuery: CTEs, select, FROM, joins, WHERE, GROUP BY and ORDER BY
+    - The passes (DEFAULT_PASSES, in order):
+        - merge_duplicate_ctes: identical CTEs are computed once
+        - push_down_predicates: predicates on the FROM relation move into its CTE when that cannot change the result,
+          the others restrict it with a key semijoin
+        - eliminate_unused_joins: LEFT JOINs that neither filter nor add columns or rows are dropped, with their CTEs
+    - Optional passes:
+        - target_latest_views: `DISTINCT ON` CTEs read the materialized "latest row" view instead (tool/latest_views.py)
+    - Raw SQL the IR cannot see into (the YAML `condition`, derived status filters...) is "opaque":
+      a pass never moves it, and treats it as referencing every relation or column whose name it mentions.
+"""
+
+# ============================================================
+# === IR =====================================================
+# ============================================================
+
+def _qualifier_pattern(relation: str) -> re.Pattern:
+    return re.compile(rf"\b{re.escape(relation)}\.")
+
+def _mentions(sql: str, relation: str, columns: list = ()) -> bool:
+    """Check if raw SQL mentions `relation.` or any of its column names.
+    """
+    if _qualifier_pattern(relation).search(sql):
+        return True
+    return any(re.search(rf"\b{re.escape(column)}\b", sql) for column in columns)
+
+
+class Predicate:
+    def __init__(self, sql: str, relations: set = None, columns: set = None, kind: str = "condition"):
+        self.sql = sql
+        self.relations = set(relations) if relations is not None else None     # None -> opaque
+        self.columns = set(columns or ())       # referenced columns, unqualified
+        self.kind = kind                        # filter / time / input / contains_input / condition / semijoin
+
+    @property
+    def is_opaque(self) -> bool:
+        return self.relations is None
+
+    def rename(self, old: str, new: str):
+        """Re-qualify the predicate from relation `old` to `new`.
+        """
+        self.sql = _qualifier_pattern(old).sub(f"{new}.", self.sql)
+        if self.relations is not None and old in self.relations:
+            self.relations = (self.relations - {old}) | {new}
+
+
+class SelectItem:
+    def __init__(self, sql: str, relations: set = None):
+        self.sql = sql
+        self.relations = set(relations) if relations is not None else None     # None -> opaque
+
+    def rename(self, old: str, new: str):
+        self.sql = _qualifier_pattern(old).sub(f"{new}.", self.sql)
+        if self.relations is not None and old in self.relations:
+            self.relations = (self.relations - {old}) | {new}
+
+
+class CTE:
+    def __init__(self, name: str, table: str, distinct_on: list = None, order_by: list = None, where: list = None, source: str = None, unique_on: list = None):
+        self.name = name
+        self.table = table                  # source table, for the schema lookups
+        self.distinct_on = distinct_on or []
+        self.order_by = order_by or []      # e.g. ["module_name", "mod_qc_no DESC"]
+        self.where = where or []            # predicates qualified by `source`
+        self.source = source or table       # relation read by the CTE: the table, or a view of it
+        self.unique_on = unique_on or list(self.distinct_on)    # columns with one row per value
+
+    def signature(self) -> tuple:
+        """Everything that determines the rows of the CTE, used to find duplicates.
+        """
+        return (self.source, tuple(self.distinct_on), tuple(self.order_by), tuple(p.sql for p in self.where))
+
+    def render(self) -> str:
+        distinct_arg = f"DISTINCT ON ({', '.join(self.distinct_on)}) " if self.distinct_on else ""
+        where_arg = ""
+        if self.where:
+            where_arg = "\n                WHERE " + "\n                  AND ".join(p.sql for p in self.where)
+        orderby_arg = f"\n                ORDER BY {', '.join(self.order_by)}" if self.order_by else ""
+
+        return f"""
+                {self.name} AS (
+                SELECT {distinct_arg}*
+                FROM {self.source}{where_arg}{orderby_arg}
+                )"""
+
+
+class Join:
+    def __init__(self, target: str, table: str, left: str, column: str):
+        self.target = target    # joined relation, a CTE name or a table
+        self.table = table      # source table of `target`
+        self.left = left        # relation on the left of the ON condition
+        self.column = column    # join key, same name on both sides
+
+    def render(self) -> str:
+        return f"LEFT JOIN {self.target} ON {self.left}.{self.column} = {self.target}.{self.column}"
+
+
+class SelectQuery:
+    def __init__(self, from_table: str, ctes: list = None, select: list = None, joins: list = None, where: list = None, group_by: list = None, order_by: list = None):
+        self.from_table = from_table
+        self.ctes = ctes or []
+        self.select = select or []
+        self.joins = joins or []
+        self.where = where or []
+        self.group_by = group_by or []      # raw SQL expressions
+        self.order_by = order_by or []      # raw SQL expressions
+
+    def get_cte(self, name: str) -> CTE:
+        return next((cte for cte in self.ctes if cte.name == name), None)
+
+    def rename_relation(self, old: str, new: str):
+        """Point every reference of relation `old` to `new`.
+        """
+        if self.from_table == old:
+            self.from_table = new
+        for join in self.joins:
+            if join.target == old:
+                join.target = new
+            if join.left == old:
+                join.left = new
+        for item in self.select + self.where:
+            item.rename(old, new)
+        self.group_by = [_qualifier_pattern(old).sub(f"{new}.", arg) for arg in self.group_by]
+        self.order_by = [_qualifier_pattern(old).sub(f"{new}.", arg) for arg in self.order_by]
+
+    # -- Render --
+    def render_ctes(self) -> str:
+        if not self.ctes:
+            return ""
+        return "WITH" + ",\n".join(cte.render() for cte in self.ctes)
+
+    def render_select(self, separator: str = ",\n            ") -> str:
+        return separator.join(item.sql for item in self.select)
+
+    def render_joins(self) -> str:
+        return "\n        ".join(join.render() for join in self.joins)
+
+    def render_where(self) -> str:
+        return "\n          AND ".join(p.sql for p in self.where) or "TRUE"     # every predicate may have been pushed down
+
+
+# ============================================================
+# === Passes =================================================
+# ============================================================
+
+def merge_duplicate_ctes(query: SelectQuery) -> SelectQuery:
+    """Keep one copy of CTEs with the same definition, and join it only once.
+    """
+    seen = {}   # signature -> kept CTE name
+    kept = []
+    for cte in query.ctes:
+        signature = cte.signature()
+        if signature in seen:
+            query.rename_relation(cte.name, seen[signature])
+        else:
+            seen[signature] = cte.name
+            kept.append(cte)
+    query.ctes = kept
+
+    # a merged CTE may now be joined twice, or joined to itself on its DISTINCT ON key (a no-op)
+    joined = set()
+    joins = []
+    for join in query.joins:
+        cte = query.get_cte(join.target)
+        is_identity = join.target == join.left and cte is not None and cte.unique_on == [join.column]
+        if is_identity or (join.target, join.left, join.column) in joined:
+            continue
+        joined.add((join.target, join.left, join.column))
+        joins.append(join)
+    query.joins = joins
+
+    return query
+
+def _key_semijoin(cte: CTE, predicates: list) -> Predicate:
+    """`key IN (SELECT key FROM source WHERE ...)`: keeps every row of the parts with at least one matching row.
+    """
+    key = ", ".join(cte.distinct_on)
+    conditions = "\n                    AND ".join(_qualifier_pattern(cte.name).sub(f"{cte.source}.", p.sql) for p in predicates)
+    sql = (f"{key if len(cte.distinct_on) == 1 else f'({key})'} IN (\n"
+           f"                    SELECT {key} FROM {cte.source}\n"
+           f"                    WHERE {conditions}\n"
+           f"                )")
+    columns = set(cte.distinct_on).union(*(p.columns for p in predicates))
+    return Predicate(sql, {cte.source}, columns, kind="semijoin")
+
+def push_down_predicates(query: SelectQuery, catalog=None) -> SelectQuery:
+    """Move WHERE predicates that only reference the FROM relation into its CTE, so the CTE reads fewer rows.
+       - Only the FROM relation: a LEFT JOIN keeps the unmatched rows, so filtering a joined CTE is not the same as filtering after the join.
+       - Into a DISTINCT ON CTE only if the predicate cannot change which row is the latest:
+         all its columns have one value per distinct key (`SchemaCatalog.stable_columns`).
+       - The other predicates on the FROM relation stay in the outer WHERE, and the DISTINCT ON CTE only reads
+         the parts that have a matching row (`_key_semijoin`): their latest row is still picked among all their rows.
+    """
+    cte = query.get_cte(query.from_table)
+    if cte is None:
+        return query
+
+    stable_columns = set()
+    if cte.distinct_on:
+        if catalog is None:
+            from tool.schema import get_schema_catalog
+            catalog = get_schema_catalog()
+        stable_columns = catalog.stable_columns(cte.table, cte.distinct_on)
+
+    remaining = []
+    semijoin = []
+    for predicate in query.where:
+        on_cte = not predicate.is_opaque and predicate.relations == {cte.name}
+        is_stable = not cte.distinct_on or (predicate.columns and predicate.columns <= stable_columns)
+        if on_cte and is_stable:
+            predicate.rename(cte.name, cte.source)
+            cte.where.append(predicate)
+            continue
+        remaining.append(predicate)
+        if on_cte:
+            semijoin.append(predicate)
+    query.where = remaining
+    if semijoin:
+        cte.where.append(_key_semijoin(cte, semijoin))
+
+    return query
+
+def eliminate_unused_joins(query: SelectQuery, catalog=None) -> SelectQuery:
+    """Drop LEFT JOINs whose relation is not referenced and has at most one row per join key, then drop the CTEs nobody reads.
+       - The uniqueness comes from a DISTINCT ON over the join key, or the join key being the primary key of the table.
+    """
+    if catalog is None:
+        from tool.schema import get_schema_catalog
+        catalog = get_schema_catalog()
+
+    def relation_columns(name: str) -> list:
+        cte = query.get_cte(name)
+        return catalog.columns(cte.table if cte else name)
+
+    def is_referenced(name: str, ignore_join: Join = None) -> bool:
+        if name == query.from_table:
+            return True
+        columns = relation_columns(name)
+        for item in query.select + query.where:
+            if item.relations is None:
+                if _mentions(item.sql, name, columns):
+                    return True
+            elif name in item.relations:
+                return True
+        if any(_mentions(arg, name, columns) for arg in query.group_by + query.order_by):
+            return True
+        if any(join is not ignore_join and name in (join.target, join.left) for join in query.joins):
+            return True
+        return any(_mentions(p.sql, name) for cte in query.ctes for p in cte.where)
+
+    def is_unique_on(join: Join) -> bool:
+        cte = query.get_cte(join.target)
+        if cte is not None:
+            return cte.unique_on == [join.column]
+        return catalog.has_table(join.table) and catalog.table(join.table).primary_key == [join.column]
+
+    query.joins = [
+        join for join in query.joins
+        if is_referenced(join.target, ignore_join=join) or not is_unique_on(join)
+    ]
+    query.ctes = [cte for cte in query.ctes if is_referenced(cte.name)]
+
+    return query
+
+def target_latest_views(query: SelectQuery) -> SelectQuery:
+    """Read the latest row of each part from its materialized view instead of computing `DISTINCT ON`. -> tool/latest_views.py
+       - Only CTEs with the same definition as the view; the CTE then only filters the view.
+       - Not in DEFAULT_PASSES: the views must exist in the database (`latest_views: true` in db_conn.yaml).
+    """
+    from tool.latest_views import get_latest_view
+
+    for cte in query.ctes:
+        view = get_latest_view(cte.table)
+        if view is None or not cte.distinct_on or (cte.distinct_on, cte.order_by) != (view.distinct_on, view.order_by):
+            continue
+        for predicate in cte.where:
+            predicate.rename(cte.source, view.name)
+        cte.source = view.name
+        cte.unique_on = cte.distinct_on
+        cte.distinct_on, cte.order_by = [], []
+
+    return query
+
+DEFAULT_PASSES = [merge_duplicate_ctes, push_down_predicates, eliminate_unused_joins]
+
+def optimize(query: SelectQuery, passes: list = None) -> SelectQuery:
+    """Run the query through the rewrite passes, in order.
+    """
+    for rewrite in DEFAULT_PASSES if passes is None else passes:
+        query = rewrite(query)
+    return query
@@ -0,0 +1,517 @@
+import json
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tool.helper import create_uid, get_dashboard_hash
+
+"""
+This file contains the client for the Grafana HTTP API.
+    - The included classes are:
+        - DashboardInventory: in-memory index of the remote dashboards and folders
+        - GrafanaRetry: the retry policy of the session, safe for the non-idempotent POSTs
+        - GrafanaSession: pooled keep-alive session with a default timeout
+        - GrafanaClient: all API to Grafana server
+            - Co-author: Xinyue (Joyce) Zhuang (everything below: `get_all_alert_rules`)
+    - It is kept apart from helper.py because importing `requests` dominates the import time.
+"""
+
+class DashboardInventory:
+    """In-memory index of the remote Grafana state, fetched once through the search API.
+       - dashboards: {uid: {"title", "folderUid", "tags"}}
+       - folders: {uid: title}
+    """
+    def __init__(self, dashboards: list, folders: list):
+        self.dashboards = {
+            d["uid"]: {"title": d.get("title"), "folderUid": d.get("folderUid", ""), "tags": d.get("tags", [])}
+            for d in dashboards
+        }
+        self.folders = {f["uid"]: f.get("title") for f in folders}
+
+    def exists(self, uid: str) -> bool:
+        """Check if a dashboard with the given uid exists.
+        """
+        return uid in self.dashboards
+
+    def content_hash(self, uid: str) -> str:
+        """Get the content hash recorded in the remote dashboard tags.
+        """
+        entry = self.dashboards.get(uid)
+        return get_dashboard_hash(entry["tags"]) if entry else None
+
+    def folder_exists(self, uid: str) -> bool:
+        """Check if a folder with the given uid exists.
+        """
+        return uid in self.folders
+
+    def add(self, dashboard_json: dict, folder_uid: str):
+        """Record an uploaded dashboard.
+        """
+        self.dashboards[dashboard_json["uid"]] = {
+            "title": dashboard_json.get("title"),
+            "folderUid": folder_uid,
+            "tags": dashboard_json.get("tags", [])
+        }
+
+    def add_folder(self, uid: str, title: str):
+        """Record a created folder.
+        """
+        self.folders[uid] = title
+
+
+class GrafanaRetry(Retry):
+    """urllib3 retries, plus a POST rejected with 429 and `Retry-After`.
+       - POST creates things (service accounts, tokens, folders, alert rules...): it is not in `allowed_methods`, so it is only
+         retried when it never reached Grafana (connect errors) or was rejected before being processed (429 + Retry-After).
+    """
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method and method.upper() == "POST":
+            return bool(self.total and self.respect_retry_after_header and has_retry_after and status_code == 429)
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class GrafanaSession(requests.Session):
+    """A `requests.Session` that applies a default timeout to every request.
+    """
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class GrafanaClient:
+    def __init__(self, api_token: str, gf_url: str, pool_size: int = 10, timeout: float = 30.0, max_retries: int = 5, backoff_factor: float = 0.3):
+        self.base_url = gf_url.rstrip('/')
+        self.headers = {
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        }
+        self.session = self._build_session(pool_size, timeout, max_retries, backoff_factor)
+
+    def _build_session(self, pool_size: int, timeout: float, max_retries: int, backoff_factor: float) -> requests.Session:
+        """Build a keep-alive session shared by all API calls.
+           - Connections (and TLS handshakes) are pooled per host and reused.
+           - 429/5xx responses and connection resets are retried with exponential backoff; a POST only if Grafana has not processed it (GrafanaRetry).
+        """
+        retry = GrafanaRetry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(["HEAD", "GET", "PUT", "DELETE"]),
+            respect_retry_after_header=True,
+            raise_on_status=False      # return the last response, callers check status codes
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        session = GrafanaSession(timeout)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        return session
+
+    def close(self):
+        """Close the pooled connections.
+        """
+        self.session.close()
+
+    def wait_until_ready(self, timeout: float = 30.0, interval: float = 0.2):
+        """Poll Grafana until the server is healthy and the API token is accepted.
+           - Replaces fixed sleeps between deployment stages.
+           - Polls without the session's retries, so a single request cannot back off past `timeout`.
+        """
+        deadline = time.monotonic() + timeout
+        last_error = None
+
+        while time.monotonic() < deadline:
+            try:
+                health = requests.get(f"{self.base_url}/api/health", timeout=self._poll_timeout(deadline, interval))
+                if health.status_code == 200 and health.json().get("database") == "ok":
+                    auth = requests.get(f"{self.base_url}/api/folders?limit=1", headers=self.headers, timeout=self._poll_timeout(deadline, interval))
+                    if auth.status_code == 200:
+                        return
+                    last_error = f"{auth.status_code} - {auth.text}"
+                else:
+                    last_error = f"{health.status_code} - {health.text}"
+            except requests.RequestException as e:
+                last_error = e
+            time.sleep(max(min(interval, deadline - time.monotonic()), 0))
+
+        raise TimeoutError(f"[Grafana] Server at {self.base_url} not ready after {timeout}s: {last_error}")
+
+    @staticmethod
+    def _poll_timeout(deadline: float, interval: float) -> float:
+        return max(min(interval * 10, deadline - time.monotonic()), 0.01)
+
+    def create_service_account_and_token(self, sa_name: str, token_name: str, username: str, password: str) -> str:
+        """Create a service account and return the API token string.
+        """
+        # Create service account
+        sa_payload = {
+            "name": sa_name,
+            "role": "Admin"
+        }
+
+        sa_res = self.session.post(
+            f"{self.base_url}/api/serviceaccounts",
+            headers={"Content-Type": "application/json"},
+            auth=(username, password),
+            data=json.dumps(sa_payload)
+        )
+        sa_res.raise_for_status()
+        sa_id = sa_res.json()["id"]
+
+        # Create token
+        token_payload = {
+            "name": token_name,
+            "secondsToLive": 0  # forever
+        }
+
+        token_res = self.session.post(
+            f"{self.base_url}/api/serviceaccounts/{sa_id}/tokens",
+            headers={"Content-Type": "application/json"},
+            auth=(username, password),
+            data=json.dumps(token_payload)
+        )
+        token_res.raise_for_status()
+        api_key = token_res.json()["key"]
+        print(f"[Grafana] Service account '{sa_name}' and API token created.")
+
+        return sa_id, api_key
+
+    def add_postgres_datasource(
+        self, 
+        datasource_name: str, datasource_uid: str,
+        db_host: str, db_port: str,
+        db_name: str, db_user: str, db_password: str
+    ):
+        """Add a PostgreSQL data source to Grafana using current API token.
+        """
+        payload = {
+            "name": datasource_name,
+            "type": "postgres",
+            "access": "proxy",
+            "url": f"{db_host}:{db_port}",
+            "database": db_name,
+            "user": db_user,
+            "secureJsonData": {
+                "password": db_password
+            },
+            "isDefault": True,
+            "editable": True,
+            "uid": datasource_uid,
+            "jsonData": {
+                "sslmode": "disable",
+                "alerting": True
+            }
+        }
+
+        # Add data source
+        response = self.session.post(
+            f"{self.base_url}/api/datasources",
+            headers=self.headers,
+            data=json.dumps(payload)
+        )
+
+        if response.status_code in [200, 201]:
+            print(f"[Grafana] PostgreSQL data source '{datasource_name}' added as default... (`∀´σ) \n")
+        elif response.status_code == 409:
+            print(f"[Grafana] Data source '{datasource_name}' already exists.  (´･ω･`) \n")
+        else:
+            print(f"[Grafana] Failed to add data source: {response.status_code} ヽ(`Д´)ﾉ \n")
+            print(response.text)
+            response.raise_for_status()
+    
+    def create_or_get_folder(self, folder_name: str, folder_uid: str) -> str:
+        """Create a folder if it doesn't exist, or return the existing folder's uid.
+        """
+        title, uid = folder_name, folder_uid
+
+        # Fetch folder
+        url = f"{self.base_url}/api/folders/{uid}"
+        response = self.session.get(url, headers=self.headers)
+
+        if response.status_code == 200:     # folder exist
+            return response.json()['uid']
+        elif response.status_code == 404:   # create folder
+            payload = {"title": title, "uid": uid}
+            response = self.session.post(f"{self.base_url}/api/folders", headers=self.headers, json=payload)
+            response.raise_for_status()
+            return response.json()['uid']
+        else:
+            raise Exception(f"Error checking folder: {response.status_code} - {response.text}")
+    
+    def dashboard_exists(self, uid: str) -> bool:
+        """Check if a dashboard with the given uid exists.
+        """
+        url = f"{self.base_url}/api/dashboards/uid/{uid}"
+        response = self.session.get(url, headers=self.headers)
+
+        if response.status_code == 404:
+            return False
+
+        response.raise_for_status()
+
+        result = response.json()
+        dashboard = result.get("dashboard", {})
+
+        return dashboard.get("uid") == uid
+
+    def search_dashboards(self, search_type: str = "dash-db", page_size: int = 5000) -> list:
+        """Fetch every dashboard (or folder, with `dash-folder`) through the search API.
+        """
+        results = []
+        page = 1
+
+        while True:
+            url = f"{self.base_url}/api/search"
+            params = {"type": search_type, "limit": page_size, "page": page}
+            response = self.session.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+
+            batch = response.json()
+            results.extend(batch)
+            if len(batch) < page_size:
+                return results
+            page += 1
+
+    def fetch_inventory(self) -> "DashboardInventory":
+        """Fetch all remote dashboards and folders once into an in-memory index.
+        """
+        dashboards = self.search_dashboards("dash-db")
+        folders = self.search_dashboards("dash-folder")
+        return DashboardInventory(dashboards, folders)
+
+    def upload_dashboard_json(self, dashboard_json: dict, folder_uid: str, inventory: "DashboardInventory" = None) -> int:
+        """Upload a dashboard to a folder. Return the response status code.
+           - With an `inventory`, existence is looked up in memory instead of one GET per dashboard.
+        """
+        uid = dashboard_json.get("uid")
+
+        if inventory is not None:
+            overwrite = inventory.exists(uid)
+        elif uid and self.dashboard_exists(uid):
+            # update
+            overwrite = True
+        else:
+            # create
+            overwrite = False
+
+        payload = {
+            "dashboard": dashboard_json,
+            "folderUid": folder_uid,
+            "overwrite": overwrite
+        }
+
+        # Upload dashboard
+        url = f"{self.base_url}/api/dashboards/db"
+        response = self.session.post(url, headers=self.headers, json=payload)
+        print(f"[Upload] Dashboard: {dashboard_json['title']} | Status: {response.status_code}")
+
+        # print out error message
+        if response.status_code != 200:
+            print(f"[Upload] Dashboard: {dashboard_json['title']} | Error: {response.text}")
+        elif inventory is not None:
+            inventory.add(dashboard_json, folder_uid)
+
+        return response.status_code
+    
+    def upload_alert_json(self, alert_json: dict, alert_uid: str):
+        """Upload an alert-rule to a folder. 
+           - Update if the alert rule uid exist.
+        """
+        # Upload alert rule
+        url = f"{self.base_url}/api/v1/provisioning/alert-rules"
+        response = self.session.post(url, headers=self.headers, json=alert_json)
+        print(f"[Upload] {alert_json['title']} | Status: {response.status_code}")
+
+        # print out error message
+        if response.status_code not in [200, 201]:
+            if response.status_code == 409:     # alert uid exist
+                print(f"[ERROR] {alert_json['title']} already exist. Trying update... (つД`)/")
+                update_url = f"{self.base_url}/api/v1/provisioning/alert-rules/{alert_uid}"
+                update_response = self.session.put(update_url, headers=self.headers, json=alert_json)
+                print(f"[Update] {alert_json['title']} | Status: {update_response.status_code}")
+                if update_response.status_code != 200:
+                    print(f"[Update] {alert_json['title']} failed | Error: {update_response.text}")
+            else:
+                print(f"[Upload] {alert_json['title']} failed | Error: {response.text}")
+
+    def delete_alert_rule(self, alert_uid: str):
+        """Delete the specified alert rule.
+        """
+        uid = alert_uid
+
+        # Delete alert rule
+        url = f"{self.base_url}/api/v1/provisioning/alert-rules/{uid}"
+        response = self.session.delete(url, headers=self.headers)
+        print(f"[Delete] Alert rule UID: {uid} deleted | Status: {response.status_code}")
+
+        # print out error message
+        if not (response.status_code == 200 or response.status_code == 204):
+            print(f"[Delete] Alert rule UID: {uid} failed | Error: {response.text}")
+    
+    def get_all_alert_rules(self) -> list:
+        """Get all alert rules from Grafana. Output all the uids.
+        """
+        # Get the list of all alert rules
+        url = f"{self.base_url}/api/v1/provisioning/alert-rules"
+        response = self.session.get(url, headers=self.headers)
+
+        # Convert the response
+        data_json = json.loads(response.text)
+
+        # Output result
+        alert_uids = []
+        for rule in data_json:
+            alert_uids.append(rule['uid'])
+
+        return alert_uids
+
+    def delete_all_alert_rules(self):
+        """Get all existing alert rules from Grafana and delete all of them.
+        """
+        # get the list of all alert rule uids
+        rules = self.get_all_alert_rules()
+
+        for rule in rules:
+            self.delete_alert_rule(rule)
+        
+        print("[Delete] All alert rules deleted.")
+    
+    def create_contact_point(self, name: str, addresses: list):
+        """ Create email contact points.
+            - Also, check if there exists contact point with the same name, 
+              if so, delete the existing one and upload a new one.
+        """
+        uid = create_uid(name)
+
+        existing_cps = self.list_contact_points_uid()
+        to_delete_uid = None
+
+        for cp_uid in existing_cps:
+            if cp_uid == uid:
+                to_delete_uid = cp_uid
+                print(f"Found existing contact point: {name} (UID: {cp_uid}) — will delete")
+                break
+
+        if to_delete_uid:
+            self.delete_contact_point(to_delete_uid)
+
+        payload = {
+            "name": name,
+            "type": "email",
+            "uid": uid,
+            "settings": {
+                "addresses": ",".join(addresses)
+            }
+        }
+
+        url = f"{self.base_url}/api/v1/provisioning/contact-points"
+        response = self.session.post(url, headers=self.headers, json=payload)
+        if response.status_code == 202:
+            print(f"[Create] {response.status_code} | Contact Point {name} successfully created.(=ﾟωﾟ)ﾉ")
+        else:
+            print(f"[Create] {response.status_code} | {response.text}")
+
+    def list_contact_points_uid(self):
+        """ This function asks grafana to return all the uids for contact points.
+        """
+
+        url = f"{self.base_url}/api/v1/provisioning/contact-points"
+        response = self.session.get(url, headers=self.headers)
+
+        # Convert the response
+        data_json = json.loads(response.text)
+
+        # Output result
+        contacts_uids = []
+        for rule in data_json:
+            contacts_uids.append(rule['uid'])
+
+        return contacts_uids
+
+    def delete_contact_point(self, uid, fallback_receiver: str = "grafana-default-email"):
+        """ Delete one contact point with uid.
+        """
+        tree = self.get_policy_tree()
+        routes = tree.get("routes", [])
+        if tree.get("receiver") == uid:
+            tree["receiver"] = fallback_receiver
+            print(f"[Update] Root receiver changed from {uid} → {fallback_receiver}")
+        #filter the route with the contact point that we want to delete
+        new_routes = [r for r in routes if r.get("receiver") != uid]
+
+        if len(new_routes) < len(routes):
+            tree["routes"] = new_routes
+            self.put_policy_tree(tree)
+            print(f"[Delete] removed {uid} from routes")
+        else:
+            print(f"[Delete] No policy used {uid}")
+
+        url = f"{self.base_url}/api/v1/provisioning/contact-points/{uid}"
+        response = self.session.delete(url, headers=self.headers)
+        if response.status_code in [200, 202, 204]:
+            print(f"[Delete] Deleted contact point UID: {uid}")
+        else:
+            print(f"[Delete] Failed to delete UID {uid} | {response.status_code} | {response.text}")
+
+    def delete_all_contact_points(self):
+        """Delete all contact points that are deletable via API.
+        """
+        url = f"{self.base_url}/api/v1/provisioning/contact-points"
+        response = self.session.get(url, headers=self.headers)
+        
+        if response.status_code != 200:
+            print(f"[Error] Failed to fetch contact points | {response.status_code} | {response.text}")
+            return
+
+        contact_points = response.json()
+
+        for cp in contact_points:
+            uid = cp.get("uid")
+
+            if not uid:
+                print(f"[Skip] Skipping unnamed or malformed contact point: {cp}")
+                continue
+
+            self.delete_contact_point(uid)
+
+    def get_policy_tree(self):
+        """Get current policy tree
+        """
+        url = f"{self.base_url}/api/v1/provisioning/policies"
+        r = self.session.get(url, headers=self.headers)
+        r.raise_for_status()
+        return r.json()
+
+    def put_policy_tree(self, tree: dict):
+        """Update policy tree
+        """
+        url = f"{self.base_url}/api/v1/provisioning/policies"
+        response = self.session.put(url, headers=self.headers, json=tree)
+        response.raise_for_status()
+
+        if response.status_code in [204,202]:
+            print("[Update] Notification policies successfully updated.")
+        else:
+            print(f"[Update] Failed to set up notification system|{response.status_code}|{response.text}")
+
+    def delete_notification_policy_tree(self):
+        """Delete the entire notification policy tree.
+        """
+        url = f"{self.base_url}/api/v1/provisioning/policies"
+        response = self.session.delete(url, headers=self.headers)
+
+        if response.status_code in [200, 202, 204]:
+            print("[Delete] Notification policy tree deleted successfully.")
+        else:
+            print(f"[Delete] Failed to delete policy tree | {response.status_code} | {response.text}")
+            response.raise_for_status()
@@ -0,0 +1,598 @@
+import os
+import csv
+import math
+import time
+import random
+from datetime import datetime, timedelta, time as dt_time
+
+from tool.helper import *
+
+"""
+This file fills a PostgreSQL database with synthetic HGCDB data at production scale, for the query benchmarks and the index advisor.
+    - The tables, types, serial keys and foreign keys are read from tool/postgres_tables (`SchemaCatalog`), new columns are filled by type.
+    - Each module has its proto-module, hexaboard, baseplate and sensor, with consistent names, ids and derived columns
+      (the name encodes resolution, geometry, thickness, material and ROC like the real serial numbers, see DERIVED_FILTER_SQL).
+    - The tests of a part are dated after its assembly steps; the environment and MMTS logs are time series over the last days.
+    - The rows are written as CSV and loaded with psql `\\copy` (COPY), one table at a time in dependency order.
+    - The included classes/functions are:
+        - format_value: the COPY (CSV) text of a python value for a column type
+        - SyntheticDatabase: the parts, the rows of every table, the CSV files and the load
+"""
+
+NULL = "\\N"    # NULL marker of the COPY files
+
+# -- Part Name Codes -> DERIVED_FILTER_SQL --
+RESOLUTIONS     = {"L": "LD", "H": "HD"}
+GEOMETRIES      = {"F": "Full", "T": "Top", "B": "Bottom", "L": "Left", "R": "Right", "5": "Five"}
+THICKNESSES     = {"1": 120, "2": 200, "3": 300}
+BP_MATERIALS    = {"W": "CuW", "T": "Titanium", "C": "Carbon Fiber", "P": "PCB"}
+ROC_VERSIONS    = {"C": "HGCROCV3c", "D": "HGCROCV3d", "B": "HGCROCV3b-3", "X": "preseries"}
+INSTITUTION_CODES = {"CMU": "CM", "IHEP": "IH", "NTU": "NT", "TTU": "TT", "TIFR": "TI", "UCSB": "SB"}
+
+GEOMETRY_WEIGHTS = {"F": 80, "T": 4, "B": 4, "L": 4, "R": 4, "5": 4}
+CHANNELS         = {"LD": 222, "HD": 444}     # readout channels of a full module
+CHANNELS_PER_CHIP = 74
+GRADES           = {"A": 70, "B": 18, "C": 7, "F": 5}
+POOL_SIZE        = 32       # distinct random per-channel arrays / plots of each kind
+
+# -- Module Steps: module_info date column -> days after the assembly --
+MODULE_STEPS = {
+    "assembled": 0, "inspected": 1, "wb_front": 2, "encap_front": 3, "wb_back": 5, "encap_back": 6, "thermal_cycle_date": 8,
+}
+MODULES_PER_BATCH = 20      # modules tested together in one MMTS batch
+
+# the step dating the rows of a table, default: the step of its parent table (PARENT_STEPS)
+TABLE_STEPS = {
+    "module_assembly": "assembled", "module_inspect": "inspected", "front_wirebond": "wb_front", "bond_pull_test": "wb_front",
+    "front_encap": "encap_front", "back_wirebond": "wb_back", "back_encap": "encap_back",
+    "module_iv_test": "test_iv", "module_pedestal_test": "test_ped", "module_pedestal_plots": "test_ped",
+    "module_ileak_estimate": "test_ped", "mod_hxb_other_test": "test_ped", "module_qc_summary": "test_ped",
+    "proto_inspect": "proto_inspected", "hxb_pedestal_test": "hxb_tested", "sen_iv_data": "sen_received",
+}
+PARENT_STEPS = {
+    "module_info": "assembled", "proto_assembly": "proto", "hexaboard": "hxb_received", "baseplate": "bp_received", "sensor": "sen_received",
+}
+# the tables with one row per part and step; the other tables of parts are tests, with `tests` rows per part on average
+SINGLE_ROW_TABLES = {"module_assembly", "front_wirebond", "back_wirebond", "front_encap", "back_encap", "bond_pull_test"}
+
+# -- Logs: table -> (location, device, metric) --
+LOG_DEVICES = {
+    "temp_humidity": [("main_clean_room", "TH-01", None), ("inner_clean_room", "TH-02", None), ("storage", "TH-03", None)],
+    "particulate_counts": [("main_clean_room", "PC-01", None), ("inner_clean_room", "PC-02", None)],
+    "mmts_sensors_logging": (
+        [("MMTS", f"RTD-{k:02d}", "temperature_C") for k in range(1, 9)]
+        + [("MMTS", "Chiller-01", "temperature_C"), ("MMTS", "Chiller-T", "temperature_C")]
+        + [("MMTS", "DMT-01", "dewpoint_C"), ("MMTS", "DMT-02", "dewpoint_C"), ("MMTS", "System Status", "system_C")]
+    ),
+}
+STATIONS    = ["MMTS-A", "MMTS-B", "MMTS-C", "MMTS-D"]
+PEOPLE      = ["acheng", "bpatel", "cmorales", "dkim", "eweber", "fsato", "grossi", "hnguyen"]
+COMMENTS    = ["OK", "re-inspected", "glue on edge", "scratch on corner", "rebonded", "see logbook"]
+
+def _weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _base_type(col_type: str) -> str:
+    return col_type.upper().split(" DEFAULT")[0].strip()
+
+
+# ============================================================
+# === COPY Format ============================================
+# ============================================================
+
+def _element_literal(base: str, value) -> str:
+    """One element of an array literal, e.g. `{1,2}`, `{"a","b"}`, `{{1,2},{3,4}}`.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join(_element_literal(base, v) for v in value) + "}"
+    text = _scalar_literal(base, value)
+    if base in ("TEXT", "BYTEA") or base.startswith(("CHAR", "VARCHAR")):
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return text
+
+def _scalar_literal(base: str, value) -> str:
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, bytes):
+        return "\\x" + value.hex()
+    if isinstance(value, datetime) and base in ("DATE", "TIME"):
+        value = value.date() if base == "DATE" else value.time()
+    if isinstance(value, datetime):
+        text = value.isoformat(sep=" ", timespec="seconds")
+        return f"{text}+00" if base == "TIMESTAMPTZ" else text
+    if isinstance(value, float):
+        if base.startswith("NUMERIC("):
+            scale = int(base.rstrip(")").split(",")[-1]) if "," in base else 0
+            return f"{value:.{scale}f}"
+        if base.startswith(("INT", "SMALLINT", "BIGINT", "SERIAL")):
+            return str(int(round(value)))
+        return f"{value:.6g}"
+    if isinstance(value, dt_time):
+        return value.isoformat(timespec="seconds")
+    if hasattr(value, "isoformat"):     # date
+        return value.isoformat()
+    return str(value)
+
+def format_value(col_type: str, value) -> str:
+    """Format a python value as the COPY (CSV) text of a column type, `NULL` for None.
+       - Arrays are python lists (nested for `REAL[][]`); a str is taken as an already formatted array literal.
+    """
+    if value is None:
+        return NULL
+    base = _base_type(col_type)
+    if base.endswith("[]"):
+        if isinstance(value, str):
+            return value
+        return _element_literal(base.split("[")[0].strip(), value)
+    return _scalar_literal(base, value)
+
+
+# ============================================================
+# === Synthetic Database =====================================
+# ============================================================
+
+class SyntheticDatabase:
+    """Synthetic rows of every table of the schema catalog.
+       - modules: number of modules, each with its parts; they are assembled over the last `history_days`, in serial number order
+       - tests: average rows per part of the test tables (inspections, IV, pedestal, QC summary, ...)
+       - log_days / log_interval: the environment and MMTS sensor logs, one row per device every `log_interval` seconds
+       - channels: the length of the per-channel arrays (pedestals), 0 for the real count of the module (222 LD / 444 HD full)
+       - blob_bytes: the size of the plots (BYTEA)
+       - other_rows: rows of the tables without parts or time series, e.g. mmts_inventory
+       - Same seed, same data. The random per-channel arrays and plots are drawn from a small pool, the formatting is the slow part.
+    """
+    def __init__(self, modules: int = 1000, tests: int = 2, history_days: int = 365, log_days: int = 30, log_interval: int = 60,
+                 channels: int = 0, blob_bytes: int = 1024, other_rows: int = 100, seed: int = 0, end: datetime = None, catalog=None):
+        from tool.schema import get_schema_catalog
+
+        self.catalog = catalog or get_schema_catalog()
+        self.modules = modules
+        self.tests = max(tests, 1)
+        self.history_days = history_days
+        self.log_days = log_days
+        self.log_interval = log_interval
+        self.channels = channels
+        self.blob_bytes = blob_bytes
+        self.other_rows = other_rows
+        self.seed = seed
+        self.end = (end or datetime.now()).replace(microsecond=0)
+        self._parts = None
+        self._pools = {}
+
+    # -- Parts --
+    @property
+    def parts(self) -> list:
+        """The modules and their parts, built once: names, ids, derived columns, grade, MMTS batch and the dates of each step.
+        """
+        if self._parts is None:
+            self._parts = self._build_parts()
+        return self._parts
+
+    def _build_parts(self) -> list:
+        rng = random.Random(f"{self.seed}:parts")
+        start = self.end - timedelta(days=self.history_days)
+        span = (self.history_days - 10) * 86400      # the last modules still have a few days of tests ahead
+        counters, parts = {}, []
+
+        for i in range(1, self.modules + 1):
+            res = "H" if rng.random() < 0.3 else "L"
+            geo = _weighted(rng, GEOMETRY_WEIGHTS)
+            thk = "1" if res == "H" else rng.choice("23")
+            mat = _weighted(rng, {"W": 30, "T": 20, "C": 40, "P": 10})
+            roc = _weighted(rng, {"C": 50, "D": 30, "B": 15, "X": 5})
+            institution = rng.choice(list(INSTITUTION_CODES))
+            inst = INSTITUTION_CODES[institution]
+            counters[inst] = counters.get(inst, 0) + 1
+            serial = f"{inst}{counters[inst]:04d}"
+
+            assembled = start + timedelta(seconds=span * i / max(self.modules, 1) + rng.uniform(-6, 6) * 3600)
+            steps = {name: assembled + timedelta(days=days, hours=rng.uniform(0, 8)) for name, days in MODULE_STEPS.items()}
+            steps["proto"] = assembled - timedelta(days=rng.uniform(2, 6))
+            steps["proto_inspected"] = steps["proto"] + timedelta(days=1)
+            for part in ("hxb", "bp", "sen"):
+                steps[f"{part}_received"] = steps["proto"] - timedelta(days=rng.uniform(20, 60))
+            steps["hxb_tested"] = steps["hxb_received"] + timedelta(days=3)
+
+            resolution = RESOLUTIONS[res]
+            parts.append({
+                "module_no": i, "proto_no": i, "hxb_no": i, "bp_no": i, "sen_no": i,
+                "module_name": f"320M{res}{geo}{thk}{mat}{roc}{serial}",
+                "proto_name": f"320P{res}{geo}{thk}{mat}{roc}{serial}",
+                "hxb_name": f"320X{res}{geo}{roc}{serial}",
+                "bp_name": f"320B{res}{geo}{mat}{serial}",
+                "sen_name": f"320S{res}{geo}{thk}{serial}",
+                "geometry": GEOMETRIES[geo], "resolution": resolution, "roc_version": ROC_VERSIONS[roc],
+                "bp_material": BP_MATERIALS[mat], "sen_thickness": float(THICKNESSES[thk]), "thickness": THICKNESSES[thk],
+                "institution": institution,
+                "grade": _weighted(rng, GRADES),
+                "channels": self.channels or int(CHANNELS[resolution] * (1 if geo == "F" else 0.5)),
+                "station_name": STATIONS[i % len(STATIONS)],
+                "steps": steps,
+                "abandoned_after": rng.choice(list(MODULE_STEPS)) if rng.random() < 0.03 else None,
+            })
+
+        # MMTS batches: the modules of a batch are IV tested one after the other, each pedestal test a day after its IV test
+        for k in range(0, len(parts), MODULES_PER_BATCH):
+            batch = parts[k:k + MODULES_PER_BATCH]
+            tested = max(p["steps"]["thermal_cycle_date"] for p in batch) + timedelta(days=1, hours=rng.uniform(0, 12))
+            for slot, part in enumerate(batch):
+                part["batch_name"], part["batch_time"] = tested.strftime("%Y%m%d-%H%M%S"), tested
+                part["steps"]["test_iv"] = tested + timedelta(minutes=20 * slot + rng.uniform(0, 10))
+                part["steps"]["test_ped"] = part["steps"]["test_iv"] + timedelta(days=1, hours=rng.uniform(0, 6))
+                part["steps"]["packed"] = part["steps"]["test_ped"] + timedelta(days=rng.uniform(3, 30))
+                part["steps"]["shipped"] = part["steps"]["packed"] + timedelta(days=rng.uniform(1, 10))
+
+        # the steps not reached yet (in the future) or after the abandoned step
+        order = list(MODULE_STEPS) + ["test_iv", "test_ped", "packed", "shipped"]
+        for part in parts:
+            stop = order.index(part["abandoned_after"]) + 1 if part["abandoned_after"] else len(order)
+            for name in order:
+                if order.index(name) >= stop or part["steps"][name] > self.end:
+                    part["steps"][name] = None
+        return parts
+
+    def batches(self) -> list:
+        """The MMTS batches: (batch name, test time, modules), in time order.
+        """
+        batches = {}
+        for part in self.parts:
+            if part["steps"]["test_iv"] is not None:
+                batches.setdefault(part["batch_name"], (part["batch_time"], []))[1].append(part)
+        return [(name, tested, modules) for name, (tested, modules) in sorted(batches.items(), key=lambda b: b[1][0])]
+
+    # -- Rows --
+    def table_kind(self, table_name: str) -> str:
+        """How the rows of a table are made:
+           - part: one row per module (module_info and the tables other tables reference: proto_assembly, hexaboard, ...)
+           - test: rows per part, dated by TABLE_STEPS (tables with a foreign key to a part table)
+           - batch / log: mmts_batch_logging, and the time series with a `log_timestamp`
+           - other: `other_rows` rows
+        """
+        table = self.catalog.table(table_name)
+        if table_name == "module_info" or self.catalog.is_component_table(table_name):
+            return "part"
+        if set(table.foreign_keys.values()) & set(PARENT_STEPS):
+            return "test"
+        if table_name == "mmts_batch_logging":
+            return "batch"
+        if table.has_column("log_timestamp"):
+            return "log"
+        return "other"
+
+    def iter_rows(self, table_name: str):
+        """Yield the rows of a table as {column: python value}, with explicit serial keys.
+        """
+        kind = self.table_kind(table_name)
+        rng = random.Random(f"{self.seed}:{table_name}")
+        key = self.catalog.table(table_name).primary_key
+        key = key[0] if len(key) == 1 else None
+
+        if kind == "part":
+            contexts = self._part_contexts(table_name)
+        elif kind == "test":
+            contexts = self._test_contexts(table_name, rng)
+        elif kind == "batch":
+            contexts = self._batch_contexts(rng)
+        elif kind == "log":
+            contexts = self._log_contexts(table_name, rng)
+        else:
+            contexts = ({"time": self.end - timedelta(days=rng.uniform(0, self.history_days))} for _ in range(self.other_rows))
+
+        for number, ctx in enumerate(contexts, start=1):
+            if key is not None:
+                ctx[key] = number
+            yield {column: self._value(table_name, column, ctx, rng) for column in self.catalog.columns(table_name)}
+
+    def _part_contexts(self, table_name: str):
+        step = PARENT_STEPS.get(table_name, "assembled")
+        for part in self.parts:
+            ctx = {**part, "time": part["steps"][step] or part["steps"]["proto"], "iteration": 1}
+            if table_name == "module_info":
+                ctx.update({name: part["steps"][name] for name in MODULE_STEPS})
+                ctx["test_iv"], ctx["test_ped"] = part["steps"]["test_iv"], part["steps"]["test_ped"]
+                ctx["thermal_cycle_count"] = 10 if part["steps"]["thermal_cycle_date"] else None
+                ctx["packed_datetime"], ctx["shipped_datetime"] = part["steps"]["packed"], part["steps"]["shipped"]
+            elif table_name == "hexaboard":
+                ctx["hxb_inspected"], ctx["hxb_tested"] = part["steps"]["hxb_received"], part["steps"]["hxb_tested"]
+            elif table_name == "baseplate":
+                ctx["bp_inspected"] = part["steps"]["bp_received"]
+            elif table_name == "proto_assembly":
+                ctx["inspected"] = part["steps"]["proto_inspected"]
+            yield ctx
+
+    def _test_contexts(self, table_name: str, rng: random.Random):
+        table = self.catalog.table(table_name)
+        parent = next(ref for ref in table.foreign_keys.values() if ref in PARENT_STEPS)
+        step = TABLE_STEPS.get(table_name, PARENT_STEPS[parent])
+        single = table_name in SINGLE_ROW_TABLES
+
+        for part in self.parts:
+            tested = part["steps"][step]
+            if tested is None:
+                continue
+            count = 1 if single else rng.randint(1, 2 * self.tests - 1)
+            for iteration in range(1, count + 1):
+                ctx = {**part, "time": tested + timedelta(hours=3 * (iteration - 1)), "iteration": iteration,
+                       "cold": iteration % 2 == 0 and table.has_column("station_name")}
+                ctx["status"], ctx["status_desc"] = self._status(table_name, part, ctx["time"])
+                if table_name == "module_iv_test":
+                    ctx.update(self._iv_curve(part, ctx["cold"], rng))
+                yield ctx
+
+    def _batch_contexts(self, rng: random.Random):
+        for name, tested, modules in self.batches():
+            yield {"time": tested, "batch_name": name, "module_names": [p["module_name"] for p in modules],
+                   "station_names": [p["station_name"] for p in modules], "cycle_count": rng.randint(1, 10)}
+
+    def _log_contexts(self, table_name: str, rng: random.Random):
+        devices = LOG_DEVICES.get(table_name, [("main_clean_room", "LOG-01", None)])
+        start = self.end - timedelta(days=self.log_days)
+        steps = int(self.log_days * 86400 / max(self.log_interval, 1))
+
+        for n in range(steps):
+            logged = start + timedelta(seconds=n * self.log_interval)
+            day = math.sin(2 * math.pi * (logged.hour * 60 + logged.minute) / 1440)
+            for location, device, metric in devices:
+                yield {"time": logged, "log_location": location, "device_name": device, "metric": metric,
+                       **self._log_measures(table_name, device, metric, day, rng)}
+
+    def _log_measures(self, table_name: str, device: str, metric: str, day: float, rng: random.Random) -> dict:
+        if table_name == "particulate_counts":
+            base = rng.lognormvariate(6, 0.6)
+            return {"prtcls_per_cubic_m_500nm": int(base * 10), "prtcls_per_cubic_m_1um": int(base * 3), "prtcls_per_cubic_m_5um": int(base / 5)}
+        if metric == "dewpoint_C":
+            value = -45 + 3 * day + rng.gauss(0, 0.5)
+        elif metric == "system_C":
+            value = float(rng.random() < 0.995)
+        elif device.startswith("Chiller"):
+            value = -35 + rng.gauss(0, 0.3)
+        else:
+            value = -30 + 2 * day + rng.gauss(0, 0.4)
+        return {"value": value, "temp_c": 21 + day + rng.gauss(0, 0.2), "rel_hum": 40 + 3 * day + rng.gauss(0, 0.8)}
+
+    def _status(self, table_name: str, part: dict, tested: datetime) -> tuple:
+        """The status of a module test: the encapsulation reached at the test time, as the IV dashboards filter on.
+        """
+        steps = part["steps"]
+        if table_name.startswith("hxb_"):
+            return 0, "Completed"
+        for name, desc in (("encap_back", "Completely Encapsulated"), ("encap_front", "Frontside Encapsulated"), ("wb_back", "Bolted")):
+            if steps[name] is not None and steps[name] <= tested:
+                return 2, desc
+        return 1, "Assembled"
+
+    def _iv_curve(self, part: dict, cold: bool, rng: random.Random) -> dict:
+        """An IV curve from 0 to 800 V: leakage current growing with the bias, breaking down for the F grades, lower when cold.
+        """
+        program_v = [float(v) for v in range(0, 820, 20)]
+        base = 10 ** rng.uniform(-8, -7) / (20 if cold else 1)
+        meas_v = [v + rng.gauss(0, 0.05) if v else 0.0 for v in program_v]
+        meas_i = []
+        for v in meas_v:
+            current = base * (math.sqrt(max(v, 0) / 100) + 0.05) * rng.uniform(0.97, 1.03)
+            if part["grade"] == "F" and v > 600:
+                current *= math.exp((v - 600) / 50)
+            meas_i.append(current)
+        ratio = meas_i[-1] / meas_i[30]      # 800 V / 600 V
+        return {
+            "program_v": program_v, "meas_v": meas_v, "meas_i": meas_i,
+            "meas_r": [v / i if v else None for v, i in zip(meas_v, meas_i)],
+            "ratio_i_at_vs": ratio, "ratio_at_vs": [ratio],
+            "temp_c": f"{rng.gauss(-30, 0.3) if cold else rng.gauss(21, 1):.1f}",
+            "rel_hum": f"{rng.uniform(0.5, 2) if cold else rng.gauss(40, 5):.1f}",
+        }
+
+    # -- Values --
+    def _value(self, table_name: str, column: str, ctx: dict, rng: random.Random):
+        """The value of a column: from the row context (ids, names, derived columns, dates, ...), by column name, then by type.
+        """
+        if column in ctx:
+            return ctx[column]
+
+        col_type = self.catalog.column_type(table_name, column) or "TEXT"
+        base = col_type.split("[")[0].strip()
+        array = col_type.count("[]")
+        moment = ctx["time"]
+
+        # -- arrays --
+        if array:
+            if column.startswith(("list_", "dead_pad", "noisy_pad", "pad_to", "mac_")):
+                return sorted(rng.sample(range(1, 200), rng.choice((0, 0, 0, 1, 2, 3))))
+            if self.catalog.table(table_name).has_column("channel") and array == 1 and base not in ("TEXT", "BYTEA"):
+                return self._channel_array(column, base, ctx.get("channels") or CHANNELS["LD"], rng)
+            if base == "BYTEA":
+                return self._pooled((column, base), lambda: format_value(col_type, [self._blob(rng) for _ in range(3)]), rng)
+            if column.endswith("colorgrades"):
+                return [rng.choice(("green", "green", "yellow", "red")) for _ in range(6)]
+            if column == "module_geoms":
+                return sorted(rng.sample(sorted(set(GEOMETRIES.values())), 2))
+            if column.endswith("_xy"):
+                return [round(rng.uniform(-100, 100), 3) for _ in range(2)]
+            if array == 2 and column.endswith("volts"):
+                return [[float(v) for v in range(0, 900, 100)] for _ in range(3)]
+            if array == 2:
+                return self._pooled((column, base), lambda: format_value(
+                    col_type, [[self._number(column, base, rng) for _ in range(9)] for _ in range(3)]), rng)
+            if base == "TEXT":
+                return [str(k) if column.endswith("_index") else f"{ctx.get('hxb_name', column)}-{k}" for k in range(3)]
+            if base.startswith("CHAR"):
+                return [rng.choice("NG") for _ in range(4)]
+            size = 25 if column.endswith("_points") else 8
+            return self._pooled((column, base), lambda: format_value(col_type, [self._number(column, base, rng) for _ in range(size)]), rng)
+
+        # -- by name --
+        if column in ("xml_upload_success", "wb_fr_marked_done", "wb_bk_marked_done", "vacuum_holddown"):
+            return rng.random() < 0.95
+        if column == "obsolete":
+            return rng.random() < 0.02
+        if column.endswith("_def"):
+            return f"{column[:-4]} definition v1"
+        if "grade" in column and base == "TEXT":
+            return ctx.get("grade", "A") if column in ("grade", "final_grade", "iv_grade") or rng.random() < 0.8 else _weighted(rng, GRADES)
+        if column in ("technician", "operator", "inspector"):
+            return rng.choice(PEOPLE)
+        if column.startswith("comment") or column == "description":
+            return rng.choice(COMMENTS) if rng.random() < 0.2 else None
+        if column.endswith("_json"):
+            return "{}"
+        if column in ("temp_c", "rel_hum") and base == "TEXT":
+            return f"{rng.gauss(21, 1):.1f}" if column == "temp_c" else f"{rng.gauss(40, 5):.1f}"
+        if column == "status" and base == "TEXT":
+            return rng.choice(("active", "active", "spare", "retired"))
+        if column.startswith("status_"):
+            return "OK" if rng.random() < 0.98 else "ALARM"
+        if column == "station_name":
+            return rng.choice(STATIONS)
+        if column == "institution":
+            return rng.choice(list(INSTITUTION_CODES))
+        if base == "TEXT" and column.startswith(("tot_curnt", "curnt_", "num_", "temp_deg", "humidity")):
+            return f"{rng.uniform(0, 100):.2f}"
+        if column.endswith(("_name", "_id")) and base == "TEXT":
+            return f"{column.split('_')[0].upper()}-{rng.randint(1, 50):03d}"
+        if column.startswith("count_"):
+            return min(int(rng.expovariate(1)), 20)
+
+        # -- by type --
+        if base in ("DATE", "TIME") or base.startswith("TIMESTAMP"):
+            if column == "xml_gen_datetime":
+                moment = moment + timedelta(days=1)
+            elif column.endswith(("_end", "_verify_received")):
+                moment = moment + timedelta(hours=rng.uniform(1, 24)) if column.endswith("_end") else moment - timedelta(days=10)
+            if moment > self.end:
+                return None
+            return moment.date() if base == "DATE" else moment.time() if base == "TIME" else moment
+        if base == "BOOLEAN":
+            return rng.random() < 0.5
+        if base == "BYTEA":
+            return self._blob(rng)
+        if base == "TEXT" or base.startswith(("CHAR", "VARCHAR")):
+            return f"{column}_{rng.randint(1, 20):02d}"
+        return self._number(column, base, rng)
+
+    def _number(self, column: str, base: str, rng: random.Random):
+        """A number of a plausible scale for the column name.
+        """
+        if base in ("INT", "INTEGER", "SMALLINT", "BIGINT"):
+            return rng.randint(1, 100) if column.endswith("_no") or "version" in column else rng.randint(0, 50)
+        if "thickness" in column:
+            value = rng.gauss(3.0, 0.05)
+        elif "flatness" in column:
+            value = abs(rng.gauss(0.05, 0.03))
+        elif "offset" in column:
+            value = rng.gauss(0, 0.02) if "ang" in column else rng.gauss(0, 15)
+        elif "weight" in column:
+            value = rng.gauss(80, 2)
+        elif "vol" in column or column.startswith("ref_volt"):
+            value = rng.choice((300.0, 600.0, 800.0))
+        elif "current" in column or column.startswith(("i_at", "curnt")):
+            value = 10 ** rng.uniform(-8, -6)
+        elif "pull" in column:
+            value = rng.gauss(8, 1)
+        else:
+            value = rng.gauss(1, 0.2)
+        return round(value, 2) if base.startswith("NUMERIC") else value
+
+    def _pooled(self, key: tuple, make, rng: random.Random):
+        """A value from the pool `key`, filled with `make()` up to POOL_SIZE values first.
+        """
+        pool = self._pools.setdefault(key, [])
+        if len(pool) < POOL_SIZE:
+            pool.append(make())
+            return pool[-1]
+        return rng.choice(pool)
+
+    def _channel_array(self, column: str, base: str, channels: int, rng: random.Random) -> str:
+        """A per-channel array (pedestals), formatted: the channel map is fixed, the measures come from a pool.
+        """
+        fixed = {"chip": lambda c: c // CHANNELS_PER_CHIP, "channel": lambda c: c % CHANNELS_PER_CHIP, "cell": lambda c: c,
+                 "channeltype": lambda c: int(c % 37 == 36), "x": lambda c: round(math.cos(c) * c / 20, 3),
+                 "y": lambda c: round(math.sin(c) * c / 20, 3)}
+        if column in fixed:
+            key = ("fixed", column, base, channels)
+            if key not in self._pools:
+                self._pools[key] = format_value(f"{base}[]", [fixed[column](c) for c in range(channels)])
+            return self._pools[key]
+
+        def make() -> str:
+            if base == "BOOLEAN":
+                values = [rng.random() < 0.001 for _ in range(channels)]
+            elif "efficiency" in column:
+                values = [min(rng.gauss(0.98, 0.02), 1.0) for _ in range(channels)]
+            elif column.endswith(("stdd", "iqr")) or column.startswith("noise"):
+                values = [abs(rng.gauss(2.5, 0.4)) for _ in range(channels)]
+            elif column.startswith(("adc", "pedestal")):
+                values = [rng.gauss(150, 15) for _ in range(channels)]
+            else:
+                values = [self._number(column, base, rng) for _ in range(channels)]
+            return format_value(f"{base}[]", values)
+
+        return self._pooled((column, base, channels), make, rng)
+
+    def _blob(self, rng: random.Random) -> bytes:
+        return self._pooled(("blob",), lambda: b"\x89PNG\r\n\x1a\n" + rng.randbytes(max(self.blob_bytes - 8, 0)), rng)
+
+    # -- Files and Load --
+    def write_csv(self, table_name: str, path: str) -> int:
+        """Write the rows of a table as a COPY CSV file, without header. Return the number of rows.
+        """
+        columns = self.catalog.columns(table_name)
+        types = [self.catalog.table(table_name).types[column] for column in columns]
+        count = 0
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            for row in self.iter_rows(table_name):
+                writer.writerow([format_value(col_type, row[column]) for column, col_type in zip(columns, types)])
+                count += 1
+        return count
+
+    def copy_sql(self, table_name: str, path: str) -> str:
+        columns = ", ".join(self.catalog.columns(table_name))
+        path = os.path.abspath(path).replace("'", "''")
+        return f"\\copy {table_name} ({columns}) FROM '{path}' WITH (FORMAT csv, NULL '{NULL}')"
+
+    def reset_sequences_sql(self, table_names: list) -> str:
+        """Move the serial sequences past the explicit keys of the loaded rows.
+        """
+        sql = []
+        for name in table_names:
+            table = self.catalog.table(name)
+            for column in table.primary_key:
+                if table.types[column].lower() == "serial":
+                    sql.append(f"SELECT setval(pg_get_serial_sequence('{name}', '{column}'), COALESCE(MAX({column}), 0) + 1, false) FROM {name};")
+        return "\n".join(sql)
+
+    def load(self, dsn: str = None, tables: list = None, csv_dir: str = None, load: bool = True, truncate: bool = False) -> dict:
+        """Write every table (or `tables`) as CSV in `csv_dir` (a temporary folder if None) and COPY it into the database, in dependency order.
+           - truncate: empty the tables first (`TRUNCATE ... RESTART IDENTITY CASCADE`, so the tables referencing them too)
+           - load=False only writes the CSV files.
+           - Return {table: rows}. Raise RuntimeError with psql's message if a step fails.
+        """
+        import tempfile
+        from tool.latest_views import run_psql
+
+        def psql(sql: str):
+            result = run_psql(sql, dsn=dsn)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "psql failed")
+
+        names = [name for name in self.catalog.dependency_order() if tables is None or name in tables]
+        if load and truncate:
+            psql(f"TRUNCATE {', '.join(names)} RESTART IDENTITY CASCADE;")
+
+        counts = {}
+        with tempfile.TemporaryDirectory(prefix="hgcdb_") as tmp_dir:
+            folder = csv_dir or tmp_dir
+            os.makedirs(folder, exist_ok=True)
+            for name in names:
+                began = time.time()
+                path = os.path.join(folder, f"{name}.csv")
+                counts[name] = self.write_csv(name, path)
+                if load:
+                    psql(self.copy_sql(name, path))
+                print(f"[Data] {name}: {counts[name]} rows ({time.time() - began:.1f}s)")
+
+        if load:
+            psql(self.reset_sequences_sql(names) + f"\nANALYZE {', '.join(names)};")
+        return counts
@@ -0,0 +1,191 @@
+import importlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import yaml
+
+from tool.helper import *
+from tool.builders.dashboard_builder import DashboardBuilder
+from tool.builders.filter_builder import FilterBuilder, InputBuilder
+from tool.builders.panel_builder import PanelBuilder
+
+"""
+This file defines the generation engine that turns `config_folders/*.yaml` into dashboard json.
+    - SPECIAL_BUILDERS: registry of the dashboards with their own builder
+    - DashboardGenerator: build one dashboard json from its yaml config
+    - load_dashboard_jobs: list every (folder, dashboard_config) in a deterministic order
+    - generate_dashboards: fan the jobs out over a process/thread pool and yield the results in job order
+"""
+
+# -- Special Builders --
+# registry key (dashboard title, or the `builder` key in the yaml) -> (module, class, takes timezone)
+#   - a builder is only imported and constructed when a config actually uses it
+SPECIAL_BUILDERS = {
+    "Components Look-up Form":  ("tool.builders.components_lookup_builder", "ComponentsLookUpFormBuilder", False),
+    "Hexmap Plots":             ("tool.builders.hexmap_builder", "HexmapPlotsBuilder", False),
+    "Offset Plots":             ("tool.builders.offset_plots_builder", "OffsetPlotsBuilder", True),
+    "General Info":             ("tool.builders.general_info_builder", "GeneralInfoBuilder", True),
+    "Module Assembly":          ("tool.builders.module_assembly_builder", "ModuleAssemblyBuilder", True),
+    "XML Upload Status":        ("tool.builders.xml_success_builder", "XMLSuccessBuilder", True),
+    "Module Grades":            ("tool.builders.module_grades_builder", "ModuleGradesBuilder", True),
+    "MMTS Environment Logging": ("tool.builders.mmts_logging_builder", "MMTSLoggingBuilder", True),
+    "MMTS Batch Logging":       ("tool.builders.mmts_batch_logging_builder", "MMTSBatchLoggingBuilder", True),
+    "All Data":                 ("tool.builders.all_data_builder", "AllDataBuilder", False),
+}
+
+
+class DashboardGenerator:
+    def __init__(self):
+        self.panel_builder = PanelBuilder(settings.GF_DS_UID)
+        self.filter_builder = FilterBuilder(settings.GF_DS_UID)
+        self.dashboard_builder = DashboardBuilder()
+        self.special_builders = {}      # constructed special builders, by registry key
+
+    def get_special_builder(self, name: str):
+        """Import and construct the special builder registered as `name` on first use.
+        """
+        if name not in self.special_builders:
+            if name not in SPECIAL_BUILDERS:
+                raise ValueError(f"Unknown dashboard builder: {name}")
+
+            module_name, class_name, takes_timezone = SPECIAL_BUILDERS[name]
+            builder_class = getattr(importlib.import_module(module_name), class_name)
+            self.special_builders[name] = builder_class(settings.GF_DS_UID, settings.TIME_ZONE) if takes_timezone else builder_class(settings.GF_DS_UID)
+
+        return self.special_builders[name]
+
+    def generate(self, dashboard: dict) -> dict:
+        """Build the dashboard json for one dashboard config.
+        """
+        config_panels = dashboard["panels"]
+        dashboard_title = dashboard["title"]
+
+        # special dashboards with their own builder
+        builder_name = dashboard.get("builder", dashboard_title)
+        if builder_name in SPECIAL_BUILDERS or "builder" in dashboard:
+            return self._use_latest_views(self.get_special_builder(builder_name).generate_dashboard_json())
+
+        # multi-value filter rendering, switchable per dashboard to compare the query plans
+        filter_mode = dashboard.get("filter_mode", "legacy")
+        if filter_mode not in FILTER_MODES:
+            raise ValueError(f"Unknown filter_mode: {filter_mode} (expected one of {FILTER_MODES})")
+
+        # Initialize setting
+        template_list = []
+        exist_filter = set()    # avoid adding same filters
+
+        # Loop for every panel in a dashboard
+        for panel in config_panels:
+            special_chart_type = ["text", "xychart"]    # skip `text` and `xychart` panels
+            chart_type = panel["chart_type"]
+
+            # Generate the template json
+            if chart_type not in special_chart_type:
+                filters = panel["filters"]
+                inputs = panel.get("inputs", None)
+                contains_inputs = panel.get("contains_inputs", None)
+                if filters:
+                    filter_json = self.filter_builder.build_template_list(filters, exist_filter, filter_mode)
+                    template_list.extend(filter_json)
+                if inputs:
+                    input_builder = InputBuilder()
+                    input_json = input_builder.build_template_list(inputs, exist_filter)
+                    template_list.extend(input_json)
+                if contains_inputs:
+                    input_builder = InputBuilder()
+                    input_json = input_builder.build_template_list(contains_inputs, exist_filter)
+                    template_list.extend(input_json)
+
+            elif chart_type == "xychart":
+                filters = panel["filters"]
+                contains_inputs = panel.get("contains_inputs", None)
+                # special case for IV curve
+                is_mmts_iv_page = dashboard_title == "MMTS IV_Curve Plot"
+                module_num_input = self.filter_builder.build_iv_curve_filters(
+                    exist_filter,
+                    include_best_only=not is_mmts_iv_page,
+                    include_module_show=not is_mmts_iv_page,
+                )
+                template_list.extend(module_num_input)
+                # regular filters
+                filter_json = self.filter_builder.build_template_list(filters, exist_filter, filter_mode)
+                template_list.extend(filter_json)
+                # textbox contains-inputs (e.g. batch_name, iteration, station_name)
+                if contains_inputs:
+                    input_builder = InputBuilder()
+                    input_json = input_builder.build_template_list(contains_inputs, exist_filter)
+                    template_list.extend(input_json)
+
+        panels_array = self.panel_builder.generate_panels_json(dashboard_title, config_panels, filter_mode)
+
+        # Generate the dashboard json
+        return self._use_latest_views(self.dashboard_builder.build_dashboard(dashboard_title, panels_array, template_list))
+
+    def _use_latest_views(self, dashboard_json: dict) -> dict:
+        """Point the raw `DISTINCT ON` SQL (special builders, IV curves) at the materialized views, if enabled. -> tool/latest_views.py
+        """
+        if settings.DB_LATEST_VIEWS:
+            from tool.latest_views import rewrite_dashboard_latest_views
+            rewrite_dashboard_latest_views(dashboard_json)
+        return dashboard_json
+
+
+# ============================================================
+# === Parallel Generation ====================================
+# ============================================================
+
+_local = threading.local()     # one DashboardGenerator per worker process / thread
+
+def _get_generator() -> DashboardGenerator:
+    """Get the DashboardGenerator of the current worker, creating it on first use.
+    """
+    if not hasattr(_local, "generator"):
+        _local.generator = DashboardGenerator()
+    return _local.generator
+
+def _generate_job(job: tuple) -> tuple:
+    """Build one dashboard. Failures are returned instead of raised, so one bad dashboard does not stop the others.
+    """
+    folder, dashboard = job
+    try:
+        return folder, dashboard, _get_generator().generate(dashboard), None
+    except Exception as e:
+        return folder, dashboard, None, f"{type(e).__name__}: {e}"
+
+def load_dashboard_jobs(config_folder_path: str = CONFIG_FOLDER_PATH) -> list:
+    """List every `(folder, dashboard_config)` from the yaml files, sorted by file name then config order.
+    """
+    jobs = []
+
+    for config in sorted(os.listdir(config_folder_path)):
+        # skip non-yaml files
+        if not config.endswith(".yaml"):
+            continue
+
+        with open(os.path.join(config_folder_path, config), mode = 'r') as file:
+            dashboards = yaml.safe_load(file)["dashboards"]
+
+        folder = config.split(".")[0]
+        jobs.extend((folder, dashboard) for dashboard in dashboards)
+
+    return jobs
+
+def generate_dashboards(jobs: list, max_workers: int = None, mode: str = "process"):
+    """Build the dashboards of `jobs` in parallel, yielding `(folder, dashboard_config, dashboard_json, error)` in job order.
+       - mode: "process" (scales with cores), "thread", or anything else to build inline.
+       - `max_workers` defaults to the number of cores; with 1 worker the jobs are built inline.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers <= 1 or len(jobs) <= 1 or mode not in ("process", "thread"):
+        for job in jobs:
+            yield _generate_job(job)
+        return
+
+    executor_class = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+
+    with executor_class(max_workers=max_workers) as executor:
+        # `map` keeps the job order, so the merged output is deterministic
+        yield from executor.map(_generate_job, jobs)
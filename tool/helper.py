@@ -1,23 +1,24 @@
 import os
 import re
 import shutil
+from functools import cached_property
 
-import csv
+import hashlib
 import json
 from typing import Any
 
-import requests
-import yaml
 
 """
 This file contains all the helpers used in the dashboard.
     - The included helper classes/functions are:
         - ConfigLoader: load and modify the config file
-        - GrafanaClient: all API to Grafana server
-            - Co-author: Xinyue (Joyce) Zhuang (everything below: `get_all_alert_rules`)
+        - GrafanaClient: all API to Grafana server -> tool/client.py
         - create_uid: create a unique uid based on its title
         - remove_folder: remove the folder that contains all json files
+        - build_time_filter / build_datetime_expression: index-friendly time range filters
+        - get_distinct_column_name: first column of a table, from the SchemaCatalog -> tool/schema.py
         - information: global variables
+        - settings: connection settings and `client`, loaded lazily on first access
 """
 
 # ============================================================
@@ -33,6 +34,8 @@ class ConfigLoader:
     def _load(self) -> dict:
         """Load the config file.
         """
+        import yaml     # imported on use to keep `import tool.helper` cheap
+
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(f"[Config] File not found: {self.config_path}")
         with open(self.config_path, 'r') as file:
@@ -64,6 +67,8 @@ class ConfigLoader:
     def save(self):
         """Save the changes to the config file.
         """
+        import yaml
+
         with open(self.config_path, 'w') as f:
             yaml.dump(self._data, f, default_flow_style=False, sort_keys=False)
         print(f"[Config] Saved changes to {self.config_path}")
@@ -74,349 +79,6 @@ class ConfigLoader:
         self._data = self._load()
 
 
-class GrafanaClient:
-    def __init__(self, api_token: str, gf_url: str):
-        self.base_url = gf_url.rstrip('/')
-        self.headers = {
-            "Authorization": f"Bearer {api_token}",
-            "Content-Type": "application/json"
-        }
-    
-    def create_service_account_and_token(self, sa_name: str, token_name: str, username: str, password: str) -> str:
-        """Create a service account and return the API token string.
-        """
-        # Create service account
-        sa_payload = {
-            "name": sa_name,
-            "role": "Admin"
-        }
-
-        sa_res = requests.post(
-            f"{self.base_url}/api/serviceaccounts",
-            headers={"Content-Type": "application/json"},
-            auth=(username, password),
-            data=json.dumps(sa_payload)
-        )
-        sa_res.raise_for_status()
-        sa_id = sa_res.json()["id"]
-
-        # Create token
-        token_payload = {
-            "name": token_name,
-            "secondsToLive": 0  # forever
-        }
-
-        token_res = requests.post(
-            f"{self.base_url}/api/serviceaccounts/{sa_id}/tokens",
-            headers={"Content-Type": "application/json"},
-            auth=(username, password),
-            data=json.dumps(token_payload)
-        )
-        token_res.raise_for_status()
-        api_key = token_res.json()["key"]
-        print(f"[Grafana] Service account '{sa_name}' and API token created.")
-
-        return sa_id, api_key
-
-    def add_postgres_datasource(
-        self, 
-        datasource_name: str, datasource_uid: str,
-        db_host: str, db_port: str,
-        db_name: str, db_user: str, db_password: str
-    ):
-        """Add a PostgreSQL data source to Grafana using current API token.
-        """
-        payload = {
-            "name": datasource_name,
-            "type": "postgres",
-            "access": "proxy",
-            "url": f"{db_host}:{db_port}",
-            "database": db_name,
-            "user": db_user,
-            "secureJsonData": {
-                "password": db_password
-            },
-            "isDefault": True,
-            "editable": True,
-            "uid": datasource_uid,
-            "jsonData": {
-                "sslmode": "disable",
-                "alerting": True
-            }
-        }
-
-        # Add data source
-        response = requests.post(
-            f"{self.base_url}/api/datasources",
-            headers=self.headers,
-            data=json.dumps(payload)
-        )
-
-        if response.status_code in [200, 201]:
-            print(f"[Grafana] PostgreSQL data source '{datasource_name}' added as default... (`∀´σ) \n")
-        elif response.status_code == 409:
-            print(f"[Grafana] Data source '{datasource_name}' already exists.  (´･ω･`) \n")
-        else:
-            print(f"[Grafana] Failed to add data source: {response.status_code} ヽ(`Д´)ﾉ \n")
-            print(response.text)
-            response.raise_for_status()
-    
-    def create_or_get_folder(self, folder_name: str, folder_uid: str) -> str:
-        """Create a folder if it doesn't exist, or return the existing folder's uid.
-        """
-        title, uid = folder_name, folder_uid
-
-        # Fetch folder
-        url = f"{self.base_url}/api/folders/{uid}"
-        response = requests.get(url, headers=self.headers)
-
-        if response.status_code == 200:     # folder exist
-            return response.json()['uid']
-        elif response.status_code == 404:   # create folder
-            payload = {"title": title, "uid": uid}
-            response = requests.post(f"{self.base_url}/api/folders", headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()['uid']
-        else:
-            raise Exception(f"Error checking folder: {response.status_code} - {response.text}")
-    
-    def dashboard_exists(self, uid: str) -> bool:
-        """Check if a dashboard with the given uid exists.
-        """
-        url = f"{self.base_url}/api/dashboards/uid/{uid}"
-        response = requests.get(url, headers=self.headers)
-
-        if response.status_code == 404:
-            return False
-
-        response.raise_for_status()
-
-        result = response.json()
-        dashboard = result.get("dashboard", {})
-
-        return dashboard.get("uid") == uid
-
-    def upload_dashboard_json(self, dashboard_json: dict, folder_uid: str):
-        """Upload a dashboard to a folder.
-        """
-        uid = dashboard_json.get("uid")
-
-        if uid and self.dashboard_exists(uid):
-            # update
-            overwrite = True
-        else:
-            # create
-            overwrite = False
-
-        payload = {
-            "dashboard": dashboard_json,
-            "folderUid": folder_uid,
-            "overwrite": overwrite
-        }
-
-        # Upload dashboard
-        url = f"{self.base_url}/api/dashboards/db"
-        response = requests.post(url, headers=self.headers, json=payload)
-        print(f"[Upload] Dashboard: {dashboard_json['title']} | Status: {response.status_code}")
-
-        # print out error message
-        if response.status_code != 200:
-            print(f"[Upload] Dashboard: {dashboard_json['title']} | Error: {response.text}")
-    
-    def upload_alert_json(self, alert_json: dict, alert_uid: str):
-        """Upload an alert-rule to a folder. 
-           - Update if the alert rule uid exist.
-        """
-        # Upload alert rule
-        url = f"{self.base_url}/api/v1/provisioning/alert-rules"
-        response = requests.post(url, headers=self.headers, json=alert_json)
-        print(f"[Upload] {alert_json['title']} | Status: {response.status_code}")
-
-        # print out error message
-        if response.status_code not in [200, 201]:
-            if response.status_code == 409:     # alert uid exist
-                print(f"[ERROR] {alert_json['title']} already exist. Trying update... (つД`)/")
-                update_url = f"{self.base_url}/api/v1/provisioning/alert-rules/{alert_uid}"
-                update_response = requests.put(update_url, headers=self.headers, json=alert_json)
-                print(f"[Update] {alert_json['title']} | Status: {update_response.status_code}")
-                if update_response.status_code != 200:
-                    print(f"[Update] {alert_json['title']} failed | Error: {update_response.text}")
-            else:
-                print(f"[Upload] {alert_json['title']} failed | Error: {response.text}")
-
-    def delete_alert_rule(self, alert_uid: str):
-        """Delete the specified alert rule.
-        """
-        uid = alert_uid
-
-        # Delete alert rule
-        url = f"{self.base_url}/api/v1/provisioning/alert-rules/{uid}"
-        response = requests.delete(url, headers=self.headers)
-        print(f"[Delete] Alert rule UID: {uid} deleted | Status: {response.status_code}")
-
-        # print out error message
-        if not (response.status_code == 200 or response.status_code == 204):
-            print(f"[Delete] Alert rule UID: {uid} failed | Error: {response.text}")
-    
-    def get_all_alert_rules(self) -> list:
-        """Get all alert rules from Grafana. Output all the uids.
-        """
-        # Get the list of all alert rules
-        url = f"{self.base_url}/api/v1/provisioning/alert-rules"
-        response = requests.get(url, headers=self.headers)
-
-        # Convert the response
-        data_json = json.loads(response.text)
-
-        # Output result
-        alert_uids = []
-        for rule in data_json:
-            alert_uids.append(rule['uid'])
-
-        return alert_uids
-
-    def delete_all_alert_rules(self):
-        """Get all existing alert rules from Grafana and delete all of them.
-        """
-        # get the list of all alert rule uids
-        rules = self.get_all_alert_rules()
-
-        for rule in rules:
-            self.delete_alert_rule(rule)
-        
-        print("[Delete] All alert rules deleted.")
-    
-    def create_contact_point(self, name: str, addresses: list):
-        """ Create email contact points.
-            - Also, check if there exists contact point with the same name, 
-              if so, delete the existing one and upload a new one.
-        """
-        uid = create_uid(name)
-
-        existing_cps = self.list_contact_points_uid()
-        to_delete_uid = None
-
-        for cp_uid in existing_cps:
-            if cp_uid == uid:
-                to_delete_uid = cp_uid
-                print(f"Found existing contact point: {name} (UID: {cp_uid}) — will delete")
-                break
-
-        if to_delete_uid:
-            self.delete_contact_point(to_delete_uid)
-
-        payload = {
-            "name": name,
-            "type": "email",
-            "uid": uid,
-            "settings": {
-                "addresses": ",".join(addresses)
-            }
-        }
-
-        url = f"{self.base_url}/api/v1/provisioning/contact-points"
-        response = requests.post(url, headers=self.headers, json=payload)
-        if response.status_code == 202:
-            print(f"[Create] {response.status_code} | Contact Point {name} successfully created.(=ﾟωﾟ)ﾉ")
-        else:
-            print(f"[Create] {response.status_code} | {response.text}")
-
-    def list_contact_points_uid(self):
-        """ This function asks grafana to return all the uids for contact points.
-        """
-
-        url = f"{self.base_url}/api/v1/provisioning/contact-points"
-        response = requests.get(url, headers=self.headers)
-
-        # Convert the response
-        data_json = json.loads(response.text)
-
-        # Output result
-        contacts_uids = []
-        for rule in data_json:
-            contacts_uids.append(rule['uid'])
-
-        return contacts_uids
-
-    def delete_contact_point(self, uid, fallback_receiver: str = "grafana-default-email"):
-        """ Delete one contact point with uid.
-        """
-        tree = self.get_policy_tree()
-        routes = tree.get("routes", [])
-        if tree.get("receiver") == uid:
-            tree["receiver"] = fallback_receiver
-            print(f"[Update] Root receiver changed from {uid} → {fallback_receiver}")
-        #filter the route with the contact point that we want to delete
-        new_routes = [r for r in routes if r.get("receiver") != uid]
-
-        if len(new_routes) < len(routes):
-            tree["routes"] = new_routes
-            self.put_policy_tree(tree)
-            print(f"[Delete] removed {uid} from routes")
-        else:
-            print(f"[Delete] No policy used {uid}")
-
-        url = f"{self.base_url}/api/v1/provisioning/contact-points/{uid}"
-        response = requests.delete(url, headers=self.headers)
-        if response.status_code in [200, 202, 204]:
-            print(f"[Delete] Deleted contact point UID: {uid}")
-        else:
-            print(f"[Delete] Failed to delete UID {uid} | {response.status_code} | {response.text}")
-
-    def delete_all_contact_points(self):
-        """Delete all contact points that are deletable via API.
-        """
-        url = f"{self.base_url}/api/v1/provisioning/contact-points"
-        response = requests.get(url, headers=self.headers)
-        
-        if response.status_code != 200:
-            print(f"[Error] Failed to fetch contact points | {response.status_code} | {response.text}")
-            return
-
-        contact_points = response.json()
-
-        for cp in contact_points:
-            uid = cp.get("uid")
-
-            if not uid:
-                print(f"[Skip] Skipping unnamed or malformed contact point: {cp}")
-                continue
-
-            self.delete_contact_point(uid)
-
-    def get_policy_tree(self):
-        """Get current policy tree
-        """
-        url = f"{self.base_url}/api/v1/provisioning/policies"
-        r = requests.get(url, headers=self.headers)
-        r.raise_for_status()
-        return r.json()
-
-    def put_policy_tree(self, tree: dict):
-        """Update policy tree
-        """
-        url = f"{self.base_url}/api/v1/provisioning/policies"
-        response = requests.put(url, headers=self.headers, json=tree)
-        response.raise_for_status()
-
-        if response.status_code in [204,202]:
-            print("[Update] Notification policies successfully updated.")
-        else:
-            print(f"[Update] Failed to set up notification system|{response.status_code}|{response.text}")
-
-    def delete_notification_policy_tree(self):
-        """Delete the entire notification policy tree.
-        """
-        url = f"{self.base_url}/api/v1/provisioning/policies"
-        response = requests.delete(url, headers=self.headers)
-
-        if response.status_code in [200, 202, 204]:
-            print("[Delete] Notification policy tree deleted successfully.")
-        else:
-            print(f"[Delete] Failed to delete policy tree | {response.status_code} | {response.text}")
-            response.raise_for_status()
-
-
 # ============================================================
 # === Helper Functions =======================================
 # ============================================================
@@ -438,13 +100,66 @@ def remove_folder(folder_name: str, folder_path: str):
     else:
         print(f"[Folder] Folder not found: {folder_name}")
 
+def create_client(api_token: str) -> "GrafanaClient":
+    """Create a GrafanaClient with the connection pool settings from gf_conn.yaml.
+    """
+    from tool.client import GrafanaClient
+
+    gf_conn = settings.gf_conn
+    return GrafanaClient(
+        api_token, settings.GF_URL,
+        pool_size   = int(gf_conn.get('GF_POOL_SIZE', 10)),
+        timeout     = float(gf_conn.get('GF_TIMEOUT', 30)),
+        max_retries = int(gf_conn.get('GF_MAX_RETRIES', 5))
+    )
+
+def compute_dashboard_hash(dashboard_json: dict, folder_uid: str) -> str:
+    """Compute a stable content hash of a dashboard and its target folder.
+       - `id`, `version` and an existing hash tag are ignored, so the hash only changes with the content.
+    """
+    content = {k: v for k, v in dashboard_json.items() if k not in ("id", "version")}
+    content["tags"] = [tag for tag in content.get("tags", []) if not tag.startswith(HASH_TAG_PREFIX)]
+
+    canonical = json.dumps({"folderUid": folder_uid, "dashboard": content}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def stamp_dashboard_hash(dashboard_json: dict, content_hash: str):
+    """Record the content hash in the dashboard tags as `hgcdb-hash:<hash>`.
+    """
+    tags = [tag for tag in dashboard_json.get("tags", []) if not tag.startswith(HASH_TAG_PREFIX)]
+    dashboard_json["tags"] = tags + [f"{HASH_TAG_PREFIX}{content_hash}"]
+
+def get_dashboard_hash(tags: list) -> str:
+    """Read the content hash from a list of dashboard tags. Return None if missing.
+    """
+    for tag in tags or []:
+        if tag.startswith(HASH_TAG_PREFIX):
+            return tag[len(HASH_TAG_PREFIX):]
+    return None
+
+def build_time_filter(column: str, timezone: str, col_type: str = "TIMESTAMP") -> str:
+    """Build a sargable filter of `column` on the dashboard time range.
+       - The range bounds are converted to the column's local time in `timezone`, and the column is left bare, so a btree index on it can be used.
+       - Same rows as `$__timeFilter(column AT TIME ZONE 'timezone')`. A `DATE` column is compared as midnight of that day.
+       - A `TIMESTAMPTZ` column is already absolute and is compared with the bounds directly.
+    """
+    if col_type == "TIMESTAMPTZ":
+        return f"{column} BETWEEN $__timeFrom() AND $__timeTo()"
+    return (f"{column} BETWEEN ($__timeFrom()::timestamptz AT TIME ZONE '{timezone}') "
+            f"AND ($__timeTo()::timestamptz AT TIME ZONE '{timezone}')")
+
+def build_datetime_expression(table: str, date_column: str) -> str:
+    """Build the `timestamp` of a date + time column pair, e.g. `(module_inspect.date_inspect + module_inspect.time_inspect)`.
+       - Written exactly like the expression index in DATETIME_PAIRS, so the planner can match it.
+    """
+    return f"({table}.{date_column} + {table}.{DATETIME_PAIRS[date_column]})"
+
 def get_distinct_column_name(table_name: str) -> str:
     """Get the name of the distinct column in the given table.
     """
-    with open(f"{DB_INFO_PATH}/{table_name}.csv", 'r') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            return list(row.keys())[0]
+    from tool.schema import get_schema_catalog
+
+    return get_schema_catalog().table(table_name).distinct_column
 
 
 # ============================================================
@@ -456,6 +171,11 @@ SETTING_FOLDER_PATH     = "./a_EverythingNeedToChange"
 CONFIG_FOLDER_PATH      = "./config_folders"
 # DB_INFO_PATH            = "../HGC_DB_postgres/dbase_info/postgres_tables"
 DB_INFO_PATH            = "./tool/postgres_tables"
+SCHEMA_CACHE_PATH       = "./.cache/schema_catalog.json"
+LATEST_VIEWS_SQL_PATH   = "./views/latest_views.sql"
+INDEXES_SQL_PATH        = "./views/indexes.sql"
+BENCHMARK_RESULTS_PATH  = "./benchmark/results"
+EXPLAIN_BASELINE_PATH   = "./benchmark/explain_baseline.json"
 DASHBOARDS_FOLDER_PATH  = "./Dashboards"
 IV_PLOTS_FOLDER_PATH    = "./IV_curves_plot"
 ALERTS_FOLDER_PATH      = "./Alerts"
@@ -464,28 +184,8 @@ CONTACT_FOLDER_PATH     = f"{CONFIG_FOLDER_PATH}/contact_configs"
 DB_CONN_PATH            = f"{SETTING_FOLDER_PATH}/db_conn.yaml"
 GF_CONN_PATH            = f"{SETTING_FOLDER_PATH}/gf_conn.yaml"
 
-# -- load YAML Configuration --
-db_conn = ConfigLoader(DB_CONN_PATH)
-gf_conn = ConfigLoader(GF_CONN_PATH)
-
-# -- PostgreSQL Connection Info --
-DB_HOST         = db_conn.get("db_hostname")
-DB_NAME         = db_conn.get("dbname")
-DB_USER         = db_conn.get("user")
-DB_PASSWORD     = db_conn.get("password")
-DB_PORT         = db_conn.get("port")
-INSTITUTION     = db_conn.get("institution_abbr").upper()
-
-# -- Grafana Connection Info --
-GF_PORT         = gf_conn.get('GF_PORT')
-GF_PROTOCAL     = gf_conn.get('GF_PROTOCAL')
-GF_URL          = f"{GF_PROTOCAL}://{DB_HOST}:{GF_PORT}"
-# GF_URL          = f"{GF_PROTOCAL}://127.0.0.1:{GF_PORT}"
-GF_API_KEY      = gf_conn.get('GF_API_KEY')
-GF_USER         = gf_conn.get('GF_USER')
-GF_PASS         = gf_conn.get('GF_PASS')
-GF_DS_NAME      = gf_conn.get('GF_DATA_SOURCE_NAME')
-GF_DS_UID       = gf_conn.get('GF_DATA_SOURCE_UID')
+# -- Incremental Deploy --
+HASH_TAG_PREFIX = "hgcdb-hash:"    # dashboard tag that stores the content hash
 
 # -- HGCDB Info --
 TIME_COLUMNS = [
@@ -520,6 +220,28 @@ POSTFIX = [
 
 PARTITION_GROUP = ["log_location"]
 
+# date column -> time column, stored as a pair instead of one timestamp
+#   - filtered as `(date + time)`, see build_datetime_expression; index it with
+#     `CREATE INDEX ON <table> ((<date> + <time>));`
+DATETIME_PAIRS = {
+    "date_encap": "time_encap",
+    "date_bond": "time_bond",
+    "date_inspect": "time_inspect",
+    "date_test": "time_test",
+    "ass_run_date": "ass_time_begin",
+    "cure_date_end": "cure_time_end",
+}
+
+# -- Materialized Views --
+LATEST_VIEW_PREFIX = "latest_"      # `latest_<table>`: the latest row of each part, see tool/latest_views.py
+
+# -- Multi-value Filter Rendering --
+# `filter_mode` of a dashboard yaml
+#   - legacy: 'All' expands to every value, compared as `column::text`
+#   - indexed: 'All' is FILTER_ALL_VALUE (quoted: Grafana inserts a custom all value as-is), a selection is compared on the column's own type
+FILTER_MODES = ["legacy", "indexed"]
+FILTER_ALL_VALUE = "__all"
+
 # -- Set time_zone --
 INSTITUTION_TIMEZONES = {
     "CMU": "America/New_York",
@@ -529,7 +251,6 @@ INSTITUTION_TIMEZONES = {
     "TIFR": "Asia/Kolkata",
     "UCSB": "America/Los_Angeles"
 }
-TIME_ZONE = INSTITUTION_TIMEZONES[INSTITUTION]
 
 # -- Set QC Coulumns --
 QC_COLUMNS = [
@@ -602,5 +323,118 @@ DERIVED_FILTER_SQL = {
     """
 }
 
-# -- Set GrafanaClient --
-client = GrafanaClient(GF_API_KEY, GF_URL)
+# ============================================================
+# === Lazy Settings ==========================================
+# ============================================================
+
+class Settings:
+    """Connection settings loaded from db_conn.yaml / gf_conn.yaml on first access.
+       - Importing `tool.helper` does not need the connection files.
+       - The values are read live from the loaded config, so updates (e.g. a new API key) are picked up.
+    """
+    # -- load YAML Configuration --
+    @cached_property
+    def db_conn(self) -> ConfigLoader:
+        return ConfigLoader(DB_CONN_PATH)
+
+    @cached_property
+    def gf_conn(self) -> ConfigLoader:
+        return ConfigLoader(GF_CONN_PATH)
+
+    # -- PostgreSQL Connection Info --
+    @property
+    def DB_HOST(self) -> str:
+        return self.db_conn.get("db_hostname")
+
+    @property
+    def DB_NAME(self) -> str:
+        return self.db_conn.get("dbname")
+
+    @property
+    def DB_USER(self) -> str:
+        return self.db_conn.get("user")
+
+    @property
+    def DB_PASSWORD(self) -> str:
+        return self.db_conn.get("password")
+
+    @property
+    def DB_PORT(self) -> str:
+        return self.db_conn.get("port")
+
+    @property
+    def INSTITUTION(self) -> str:
+        return self.db_conn.get("institution_abbr").upper()
+
+    @property
+    def DB_LATEST_VIEWS(self) -> bool:
+        """Read the latest rows from the materialized views, see tool/latest_views.py.
+        """
+        return bool(self.db_conn.get("latest_views", False))
+
+    # -- Grafana Connection Info --
+    @property
+    def GF_PORT(self) -> str:
+        return self.gf_conn.get('GF_PORT')
+
+    @property
+    def GF_PROTOCAL(self) -> str:
+        return self.gf_conn.get('GF_PROTOCAL')
+
+    @property
+    def GF_URL(self) -> str:
+        return f"{self.GF_PROTOCAL}://{self.DB_HOST}:{self.GF_PORT}"
+
+    @property
+    def GF_API_KEY(self) -> str:
+        return self.gf_conn.get('GF_API_KEY')
+
+    @property
+    def GF_USER(self) -> str:
+        return self.gf_conn.get('GF_USER')
+
+    @property
+    def GF_PASS(self) -> str:
+        return self.gf_conn.get('GF_PASS')
+
+    @property
+    def GF_DS_NAME(self) -> str:
+        return self.gf_conn.get('GF_DATA_SOURCE_NAME')
+
+    @property
+    def GF_DS_UID(self) -> str:
+        return self.gf_conn.get('GF_DATA_SOURCE_UID')
+
+    # -- Set time_zone --
+    @property
+    def TIME_ZONE(self) -> str:
+        return INSTITUTION_TIMEZONES[self.INSTITUTION]
+
+    # -- Set GrafanaClient --
+    @cached_property
+    def client(self) -> "GrafanaClient":
+        return create_client(self.GF_API_KEY)
+
+
+settings = Settings()
+
+# names that used to be module globals, still importable as `from tool.helper import gf_conn`
+_SETTINGS_NAMES = {
+    "db_conn", "gf_conn",
+    "DB_HOST", "DB_NAME", "DB_USER", "DB_PASSWORD", "DB_PORT", "INSTITUTION",
+    "GF_PORT", "GF_PROTOCAL", "GF_URL", "GF_API_KEY", "GF_USER", "GF_PASS", "GF_DS_NAME", "GF_DS_UID",
+    "TIME_ZONE", "client"
+}
+
+# classes living in tool/client.py (imports `requests`, which dominates import time)
+_CLIENT_NAMES = {"GrafanaSession", "GrafanaClient", "DashboardInventory"}
+
+def __getattr__(name: str):
+    """Resolve the settings and client classes on first access (PEP 562).
+    """
+    if name in _SETTINGS_NAMES:
+        return getattr(settings, name)
+    if name in _CLIENT_NAMES:
+        from tool import client as client_module
+        return getattr(client_module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
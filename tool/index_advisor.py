@@ -0,0 +1,387 @@
+import hashlib
+import os
+import re
+
+from tool.helper import *
+
+"""
+This file recommends the indexes the generated SQL can use, from the SQL text and the schema catalog (tool/postgres_tables).
+    - Every query is scanned for the columns a plan can look up by index:
+        - join keys: `a.x = b.x`
+        - filters: `x = ...`, `x = ANY(...)`, `x IN (...)`
+        - `DISTINCT ON (x) ... ORDER BY x, y DESC`: one composite index returns the latest row of each part in order
+        - time ranges: `x BETWEEN ...`, `$__timeFilter(x)`, `(date + time) BETWEEN ...`
+        - textbox inputs: `x ILIKE '%' || '${input}' || '%'`, only a pg_trgm GIN index serves a leading `%`
+        - `ORDER BY x DESC LIMIT n` and the `SELECT DISTINCT x` of the template variables
+    - The included classes/functions are:
+        - IndexCandidate: one index, its DDL and the queries it serves
+        - IndexAdvisor: analyze the queries, then rank the indexes by the number of queries they serve
+        - collect_queries: the SQL of every panel, template variable and alert of the configs
+    - Only base tables of the catalog are indexed; CTEs, subqueries and the `latest_` views are skipped.
+    - Not recommended: single-column indexes on enum-like columns only used as filters (see `IndexAdvisor._is_low_selectivity`).
+"""
+
+LOG_TIME_COLUMN = "log_timestamp"   # tables with it are append-only logs, in time order -> BRIN
+MAX_NAME_LENGTH = 63                # Postgres identifier limit
+TEXT_TYPES = ("TEXT", "VARCHAR", "CHAR")    # `::text` on them keeps the index usable
+
+_KEYWORDS = {
+    "AND", "AS", "CROSS", "EXCEPT", "FULL", "GROUP", "HAVING", "INNER", "INTERSECT", "JOIN", "LATERAL", "LEFT",
+    "LIMIT", "NATURAL", "OFFSET", "ON", "OR", "ORDER", "OUTER", "RIGHT", "SELECT", "UNION", "USING", "WHERE", "WINDOW",
+}
+
+# `relation.column` or `column`, with an optional cast
+_REF = r"(?:(?P<{0}q>\w+)\.)?(?P<{0}c>[A-Za-z_]\w*)(?P<{0}cast>::\w+)?"
+
+def _ref(tag: str = "") -> str:
+    return _REF.format(tag)
+
+_TABLE_PATTERN = re.compile(   # a keyword is not an alias: `FROM a JOIN b` must leave `JOIN b` to the next match
+    rf"\b(?:FROM|JOIN)\s+(\w+)(?![\w.(])(?:\s+(?:AS\s+)?(?!(?:{'|'.join(sorted(_KEYWORDS))})\b)(\w+)(?![\w.(]))?", re.IGNORECASE)
+_DISTINCT_ON_PATTERN = re.compile(r"\bDISTINCT\s+ON\s*\(([^)]*)\)", re.IGNORECASE)
+_ORDER_BY_PATTERN = re.compile(r"\bORDER\s+BY\s+", re.IGNORECASE)
+
+_USAGE_PATTERNS = [
+    # kind, pattern
+    ("join",    re.compile(rf"(?<![\w.'$]){_ref('a')}\s*=\s*{_ref('b')}(?!\w|\s*\()")),
+    ("filter",  re.compile(rf"(?<![\w.'$]){_ref()}\s*(?:=\s*(?:ANY\s*\(|'|\$|-?\d|(?:UPPER|LOWER|TRIM)\s*\()|\s+IN\s*\()", re.IGNORECASE)),
+    ("time",    re.compile(rf"(?<![\w.'$]){_ref()}\s+BETWEEN\b", re.IGNORECASE)),
+    ("time",    re.compile(rf"\$__time(?:Filter|Group|GroupAlias)\(\s*{_ref()}", re.IGNORECASE)),
+    ("time",    re.compile(rf"(?<![\w.'$]){_ref()}\s*[<>]=?\s*(?:\$__time|now\(\)|CURRENT_)", re.IGNORECASE)),
+    ("input",   re.compile(rf"(?<![\w.'$]){_ref()}\s+I?LIKE\s+'%(?:'\s*\|\||\$)", re.IGNORECASE)),
+    ("order",   re.compile(rf"\bORDER\s+BY\s+{_ref()}(?:\s+(?:ASC|DESC))?\s+LIMIT\b", re.IGNORECASE)),
+    ("values",  re.compile(rf"\bSELECT\s+DISTINCT\s+{_ref()}\s+FROM\b", re.IGNORECASE)),
+]
+_PAIR_PATTERN = re.compile(rf"\(\s*{_ref('d')}\s*\+\s*{_ref('t')}\s*\)\s*(?:BETWEEN\b|[<>]=?)", re.IGNORECASE)
+
+
+class IndexCandidate:
+    def __init__(self, table: str, keys: tuple, method: str = "btree"):
+        self.table = table
+        self.keys = tuple(keys)         # e.g. ("module_name", "mod_qc_no DESC"), or ("(date_inspect + time_inspect)",)
+        self.method = method            # btree / brin / gin (pg_trgm)
+        self.usages = {}                # query source -> set of kinds
+
+    @property
+    def sources(self) -> list:
+        return sorted(self.usages)
+
+    @property
+    def kinds(self) -> list:
+        return sorted({kind for kinds in self.usages.values() for kind in kinds})
+
+    @property
+    def name(self) -> str:
+        suffix = {"btree": "idx", "brin": "brin", "gin": "trgm"}[self.method]
+        words = "_".join(w for key in self.keys for w in re.findall(r"\w+", key) if w.upper() not in ("DESC", "ASC"))
+        name = f"{self.table}_{words}_{suffix}"
+        if len(name) > MAX_NAME_LENGTH:
+            name = f"{name[:MAX_NAME_LENGTH - 9]}_{hashlib.md5(name.encode()).hexdigest()[:8]}"
+        return name
+
+    def add(self, source: str, kind: str):
+        self.usages.setdefault(source, set()).add(kind)
+
+    def merge(self, other: "IndexCandidate"):
+        for source, kinds in other.usages.items():
+            self.usages.setdefault(source, set()).update(kinds)
+
+    def create_sql(self, concurrently: bool = True) -> str:
+        """Build the DDL of the index. `CONCURRENTLY` does not block the writes to the table while it is built.
+        """
+        if self.method == "gin":
+            keys = ", ".join(f"{key} gin_trgm_ops" for key in self.keys)
+        else:
+            keys = ", ".join(self.keys)
+        using = "" if self.method == "btree" else f" USING {self.method}"
+        return f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {self.name} ON {self.table}{using} ({keys});"
+
+
+class IndexAdvisor:
+    def __init__(self, catalog=None):
+        if catalog is None:
+            from tool.schema import get_schema_catalog
+            catalog = get_schema_catalog()
+        self.catalog = catalog
+        self.candidates = {}    # (table, keys, method) -> IndexCandidate
+        self.queries = 0
+        self.derived_columns = {column for name in catalog.table_names for column in catalog.table(name).derived}
+
+    # -- Analyze --
+    def analyze(self, sql: str, source: str):
+        """Record the index lookups of one query.
+        """
+        self.queries += 1
+        scope = _Scope(sql, self.catalog)
+
+        for kind, pattern in _USAGE_PATTERNS:
+            for match in pattern.finditer(sql):
+                tags = ("a", "b") if kind == "join" else ("",)
+                tables = [scope.resolve(match.group(f"{tag}q"), match.group(f"{tag}c"), match.start()) for tag in tags]
+                if None in tables:
+                    continue    # a join needs both sides
+                for tag, table in zip(tags, tables):
+                    self._add_column(table, match.group(f"{tag}c"), kind, source, match.group(f"{tag}cast"))
+
+        for match in _PAIR_PATTERN.finditer(sql):
+            table = scope.resolve(match.group("dq"), match.group("dc"), match.start())
+            if table is not None and DATETIME_PAIRS.get(match.group("dc")) == match.group("tc"):
+                self._add(table, (f"({match.group('dc')} + {match.group('tc')})",), "btree", "time", source)
+
+        for match in _DISTINCT_ON_PATTERN.finditer(sql):
+            self._add_distinct_on(scope, match, source)
+
+    def _add(self, table: str, keys: tuple, method: str, kind: str, source: str):
+        key = (table, tuple(keys), method)
+        if key not in self.candidates:
+            self.candidates[key] = IndexCandidate(table, keys, method)
+        self.candidates[key].add(source, kind)
+
+    def _add_column(self, table: str, column: str, kind: str, source: str, cast: str = None):
+        col_type = self.catalog.column_type(table, column) or ""
+        if col_type.endswith("[]") or col_type in ("BYTEA", "JSON", "JSONB"):
+            return      # compared as `::text`, or not orderable
+        if cast and not col_type.startswith(TEXT_TYPES):
+            return      # `column::text = ...` cannot use an index on the column, e.g. the `legacy` filter_mode
+
+        if kind == "input":
+            self._add(table, (column,), "gin", kind, source)
+        elif kind == "time" and column == LOG_TIME_COLUMN:
+            self._add(table, (column,), "brin", kind, source)
+        else:
+            self._add(table, (column,), "btree", kind, source)
+
+    def _add_distinct_on(self, scope: "_Scope", match: re.Match, source: str):
+        """`SELECT DISTINCT ON (keys) * FROM table ... ORDER BY keys, ...` -> btree (keys, order).
+        """
+        sql = scope.sql
+        from_match = _TABLE_PATTERN.search(sql, match.end())
+        order_match = _ORDER_BY_PATTERN.search(sql, match.end())
+        if from_match is None or order_match is None:
+            return
+        table = from_match.group(1)
+        if not self.catalog.has_table(table) or scope.block_of(order_match.start()) != scope.block_of(match.start()):
+            return
+
+        distinct_on = [_unqualify(key) for key in match.group(1).split(",")]
+        order_by = [_unqualify(item) for item in _split_list(sql, order_match.end())]
+        if [item.split()[0] for item in order_by[:len(distinct_on)]] != distinct_on:
+            return      # an ORDER BY not led by the DISTINCT ON keys needs a sort anyway
+        if not all(self._is_index_key(table, item) for item in order_by):
+            return
+
+        self._add(table, tuple(order_by), "btree", "distinct on", source)
+
+    def _is_index_key(self, table: str, item: str) -> bool:
+        expression = re.sub(r"\s+(ASC|DESC)$", "", item, flags=re.IGNORECASE)
+        pair = re.fullmatch(r"\(\s*(\w+)\s*\+\s*(\w+)\s*\)", expression)
+        if pair:
+            return DATETIME_PAIRS.get(pair.group(1)) == pair.group(2) and self.catalog.table(table).has_column(pair.group(1))
+        return self.catalog.table(table).has_column(expression)
+
+    # -- Recommend --
+    def recommend(self, min_queries: int = 2) -> list:
+        """List the indexes worth creating, most used first.
+           - Only the ones serving at least `min_queries` queries: an index slows down every write to its table.
+           - Dropped: the ones covered by the primary key, or by a longer btree on the same leading column (their queries move to it).
+           - A btree with extra middle columns is folded into the shorter one it extends, e.g. (module_name, xml_upload_success, module_no DESC)
+             into (module_name, module_no DESC): it seeks the same part in the same order, and checks the extra columns on the index rows.
+           - A BRIN on a log table is replaced by the btree when one is needed anyway (e.g. `ORDER BY ... DESC LIMIT`).
+           - Low-selectivity filters are dropped (`_is_low_selectivity`).
+        """
+        candidates = list(self.candidates.values())
+        folded = []
+        for candidate in candidates:
+            targets = [other for other in candidates if _extends(candidate, other)]
+            if targets:
+                min(targets, key=lambda other: len(other.keys)).merge(candidate)
+                folded.append(candidate)
+
+        candidates = sorted((c for c in candidates if c not in folded), key=lambda c: (-len(c.keys), c.method != "btree"))
+        kept = []
+
+        for candidate in candidates:
+            schema = self.catalog.table(candidate.table)
+            if candidate.method == "btree" and list(candidate.keys) == schema.primary_key[:len(candidate.keys)]:
+                continue
+            if self._is_low_selectivity(candidate):
+                continue
+
+            covering = next((
+                other for other in kept
+                if other.table == candidate.table and other.method == "btree"
+                and candidate.method in ("btree", "brin") and len(candidate.keys) == 1
+                and other.keys[0].split()[0] == candidate.keys[0]
+            ), None)
+            if covering is not None:
+                covering.merge(candidate)
+            else:
+                kept.append(candidate)
+
+        kept = [candidate for candidate in kept if len(candidate.usages) >= min_queries]
+        return sorted(kept, key=lambda c: (-len(c.usages), c.table, c.keys))
+
+    def _is_low_selectivity(self, candidate: IndexCandidate) -> bool:
+        """Check if a single-column index would only serve filters on an enum-like column.
+           - Each value matches a large share of the table (e.g. `geometry = 'Full'`), so Postgres scans the table anyway.
+           - Enum-like: a dropdown lists all its values (`SELECT DISTINCT`), it is derived from the serial number, or it is a BOOLEAN.
+           - Kept when it also serves a join, a time range, an `ORDER BY` or a `DISTINCT ON`.
+        """
+        if candidate.method != "btree" or len(candidate.keys) != 1 or not set(candidate.kinds) <= {"filter", "values"}:
+            return False
+        column = candidate.keys[0]
+        return ("values" in candidate.kinds
+                or column in self.derived_columns
+                or self.catalog.column_type(candidate.table, column) == "BOOLEAN")
+
+    def render_sql(self, candidates: list, concurrently: bool = True) -> str:
+        """Build the ranked index script, with the queries each index serves.
+        """
+        sql = [f"-- Indexes for the generated dashboard SQL, generated by views/create_indexes.py ({self.queries} queries)"]
+        if any(candidate.method == "gin" for candidate in candidates):
+            sql.append("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+        for rank, candidate in enumerate(candidates, 1):
+            sources = candidate.sources
+            sql.append(f"\n-- {rank}. {candidate.table} ({', '.join(candidate.keys)}) {candidate.method}: "
+                       f"{', '.join(candidate.kinds)} | {len(sources)} queries")
+            sql.extend(f"--    {source}" for source in sources)
+            sql.append(candidate.create_sql(concurrently))
+
+        return "\n".join(sql) + "\n"
+
+
+# ============================================================
+# === SQL Scopes =============================================
+# ============================================================
+
+class _Scope:
+    """The relations each parenthesized block of a query reads, to resolve `alias.column` and unqualified columns.
+       - A name is looked up in the block of the reference, then in the enclosing blocks.
+    """
+    def __init__(self, sql: str, catalog):
+        self.sql = sql
+        self.catalog = catalog
+
+        masked = re.sub(r"'[^']*'", lambda m: " " * len(m.group(0)), sql)     # parentheses in literals
+        self._block = []            # position -> block id
+        self.parents = [None]       # block id -> parent block id
+        stack = [0]
+        for char in masked:
+            if char == "(":
+                self.parents.append(stack[-1])
+                stack.append(len(self.parents) - 1)
+            self._block.append(stack[-1])
+            if char == ")" and len(stack) > 1:
+                stack.pop()
+
+        self.relations = {}         # block id -> {alias or table: table}
+        for match in _TABLE_PATTERN.finditer(masked):
+            table, alias = match.group(1), match.group(2)
+            if not catalog.has_table(table):
+                continue
+            names = self.relations.setdefault(self.block_of(match.start()), {})
+            names[table] = table
+            if alias:
+                names[alias] = table
+
+    def block_of(self, position: int) -> int:
+        return self._block[position] if position < len(self._block) else 0
+
+    def resolve(self, qualifier: str, column: str, position: int) -> str:
+        """Get the base table of a column reference, or None (CTE, subquery, unknown or ambiguous).
+        """
+        block = self.block_of(position)
+        while block is not None:
+            names = self.relations.get(block, {})
+            if qualifier is not None:
+                if qualifier in names:
+                    table = names[qualifier]
+                    return table if self.catalog.table(table).has_column(column) else None
+            else:
+                tables = {table for table in names.values() if self.catalog.table(table).has_column(column)}
+                if len(tables) == 1:
+                    return tables.pop()
+                if len(tables) > 1:
+                    return None
+            block = self.parents[block]
+        return None
+
+
+def _extends(candidate: IndexCandidate, other: IndexCandidate) -> bool:
+    """Check if `candidate` is the btree `other` with extra columns between the same first and last keys.
+    """
+    if (candidate.table, candidate.method, other.method) != (other.table, "btree", "btree"):
+        return False
+    if len(other.keys) < 2 or len(candidate.keys) <= len(other.keys):
+        return False
+    if (candidate.keys[0], candidate.keys[-1]) != (other.keys[0], other.keys[-1]):
+        return False
+    keys = iter(candidate.keys)
+    return all(key in keys for key in other.keys)
+
+def _unqualify(item: str) -> str:
+    return re.sub(r"\b\w+\.(?=\w)", "", " ".join(item.split()))
+
+def _split_list(sql: str, start: int) -> list:
+    """Split the comma separated list at `start` (e.g. an ORDER BY), up to the end of its block, LIMIT or `;`.
+    """
+    items, depth, current = [], 0, ""
+    for position in range(start, len(sql)):
+        char = sql[position]
+        if depth == 0 and (char in ");" or re.match(r"\s(LIMIT|OFFSET)\b", sql[position:position + 8], re.IGNORECASE)):
+            break
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            items.append(current)
+            current = ""
+        else:
+            current += char
+    items.append(current)
+    return [item.strip() for item in items if item.strip()]
+
+
+# ============================================================
+# === Queries ================================================
+# ============================================================
+
+def _iter_dashboard_sql(node, title: str):
+    """Yield `(label, sql)` for every panel `rawSql` and template variable `query` of a dashboard json.
+    """
+    if isinstance(node, dict):
+        if node.get("type") == "query" and isinstance(node.get("query"), str):
+            yield f"{title} / ${node.get('name')}", node["query"]
+            return
+        label = f"{title} / {node['title']}" if isinstance(node.get("title"), str) and "targets" in node else title
+        for key, value in node.items():
+            if key == "rawSql" and isinstance(value, str):
+                yield label, value
+            else:
+                yield from _iter_dashboard_sql(value, label)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _iter_dashboard_sql(item, title)
+
+def collect_queries(jobs: list, config_folder_path: str = CONFIG_FOLDER_PATH) -> list:
+    """List `(label, sql)` for the panels, template variables and alerts of the configs.
+    """
+    import yaml
+    from tool.generator import generate_dashboards
+    from tool.builders.alert_builder import AlertBuilder
+
+    queries = []
+    for folder, dashboard, dashboard_json, error in generate_dashboards(jobs):
+        if error is not None:
+            print(f"[Index] Skip {dashboard['title']}: {error}")
+            continue
+        queries.extend(_iter_dashboard_sql(dashboard_json.get("dashboard", dashboard_json), dashboard["title"]))
+
+    alert_builder = AlertBuilder(None)
+    for config in sorted(os.listdir(config_folder_path)):
+        if not config.endswith(".yaml"):
+            continue
+        with open(os.path.join(config_folder_path, config), 'r') as file:
+            alerts = yaml.safe_load(file).get("alert") or []
+        queries.extend((f"ALERT: {alert['title']}", alert_builder.get_alert_sql(alert)) for alert in alerts)
+
+    return queries
@@ -0,0 +1,211 @@
+import os
+import re
+import shutil
+
+from tool.helper import *
+
+"""
+This file manages the materialized "latest row" views of the HGCDB tables.
+    - Most panels read the latest row of each part: `SELECT DISTINCT ON (x_name) * FROM table ORDER BY x_name, <first column> DESC`.
+      As a materialized view it is computed once per refresh instead of on every panel refresh.
+    - The included classes/functions are:
+        - LatestView: one view, its DDL (with the unique index `REFRESH ... CONCURRENTLY` needs) and its refresh SQL
+        - get_latest_view: the view of a table, with the same definition as the SQL builder's `distinct` CTEs
+        - collect_latest_views: the views used by the yaml `distinct` lists, the IV curves and the special builders
+        - rewrite_latest_views: point raw SQL (special builders, IV curves) at the views
+        - run_psql: run SQL through `psql` with the db_conn.yaml connection
+    - The dashboards only read the views when `latest_views: true` is set in db_conn.yaml:
+        - the SQL builder with the `target_latest_views` pass -> tool/builders/sql_ir.py
+        - the raw SQL of the other builders with `rewrite_latest_views` -> tool/generator.py
+"""
+
+# the latest row definitions written in raw SQL, e.g. `SELECT DISTINCT ON (module_name) * FROM module_qc_summary ORDER BY module_name, mod_qc_no DESC`
+LATEST_ROW_PATTERN = re.compile(
+    r"SELECT\s+DISTINCT\s+ON\s*\(\s*(?P<key>\w+)\s*\)\s+\*\s+"
+    r"FROM\s+(?P<table>\w+)\s+"
+    r"ORDER\s+BY\s+(?P=key)\s*,\s*(?P<order>\w+)\s+DESC\b",
+    re.IGNORECASE
+)
+
+class LatestView:
+    def __init__(self, table: str, distinct_on: list, order_by: list):
+        self.table = table
+        self.distinct_on = distinct_on      # e.g. ["module_name"]
+        self.order_by = order_by            # e.g. ["module_name", "mod_qc_no DESC"]
+        self.uses = 0                       # number of queries reading it, see collect_latest_views
+
+    @property
+    def name(self) -> str:
+        return f"{LATEST_VIEW_PREFIX}{self.table}"
+
+    def signature(self) -> tuple:
+        return (self.table, tuple(self.distinct_on), tuple(self.order_by))
+
+    # -- SQL --
+    def select_sql(self) -> str:
+        return f"SELECT DISTINCT ON ({', '.join(self.distinct_on)}) * FROM {self.table} ORDER BY {', '.join(self.order_by)}"
+
+    def create_sql(self, grant_to: str = None) -> str:
+        """Build the DDL of the view and its unique index.
+           - The unique index on the `DISTINCT ON` key is required by `REFRESH MATERIALIZED VIEW CONCURRENTLY`.
+        """
+        sql = [
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS {self.name} AS\n    {self.select_sql()};",
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {self.name}_key ON {self.name} ({', '.join(self.distinct_on)});",
+        ]
+        if grant_to:
+            sql.append(f"GRANT SELECT ON {self.name} TO {grant_to};")
+        return "\n".join(sql)
+
+    def drop_sql(self) -> str:
+        return f"DROP MATERIALIZED VIEW IF EXISTS {self.name};"
+
+    def refresh_sql(self, concurrently: bool = True) -> str:
+        """Build the refresh SQL. `CONCURRENTLY` keeps the view readable by the dashboards during the refresh.
+        """
+        return f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{self.name};"
+
+
+# ============================================================
+# === Definitions ============================================
+# ============================================================
+
+def get_latest_view(table: str) -> LatestView:
+    """Get the latest row view of a table, defined like the `distinct` CTEs of the SQL builder. Return None if the table is unknown.
+       - `DISTINCT ON` the part name (`{prefix}_name`, see PREFIX), latest first by the first column of the table.
+    """
+    from tool.schema import get_schema_catalog
+
+    catalog = get_schema_catalog()
+    if not catalog.has_table(table):
+        return None
+
+    prefix = PREFIX.get(table, table.split("_")[0])
+    sort_column = f"{prefix}_name"
+    distinct_column = catalog.table(table).distinct_column
+
+    return LatestView(table, [sort_column], [sort_column, f"{distinct_column} DESC"])
+
+def _iter_raw_sql(node):
+    """Yield every `rawSql` of a dashboard json.
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "rawSql" and isinstance(value, str):
+                yield value
+            else:
+                yield from _iter_raw_sql(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _iter_raw_sql(item)
+
+def collect_latest_views(jobs: list) -> list:
+    """List the latest row views used by the dashboards of `jobs`, sorted by name.
+       - yaml panels: every table of their `distinct` list.
+       - IV curves and special builders: the `DISTINCT ON` definitions in their raw SQL, if they match the view of the table.
+         A `DISTINCT ON` over a CTE (e.g. `ranked` in Module Grades) is not a table and is skipped silently.
+       - `module_iv_test` has no view: the IV curves pick the latest test among the ones matching the temperature
+         and humidity of the panel (filtered before `DISTINCT ON`), not the latest test of the module.
+    """
+    from tool.generator import DashboardGenerator, SPECIAL_BUILDERS
+    from tool.schema import get_schema_catalog
+
+    views = {}
+    generator = DashboardGenerator()
+    catalog = get_schema_catalog()
+
+    def add(table: str, definition: tuple = None, source: str = ""):
+        view = get_latest_view(table)
+        if view is None:
+            print(f"[Views] Skip {table} ({source}): table not found")
+            return
+        if definition is not None and definition != (view.distinct_on, view.order_by):
+            print(f"[Views] Skip {table} ({source}): {definition} differs from the view {view.signature()}")
+            return
+        views.setdefault(view.name, view).uses += 1
+
+    def add_raw_sql(dashboard_json: dict, source: str):
+        for sql in _iter_raw_sql(dashboard_json):
+            for match in LATEST_ROW_PATTERN.finditer(sql):
+                if not catalog.has_table(match.group("table")):
+                    continue    # a CTE
+                key = match.group("key")
+                add(match.group("table"), ([key], [key, f"{match.group('order')} DESC"]), source)
+
+    for folder, dashboard in jobs:
+        title = dashboard["title"]
+        builder_name = dashboard.get("builder", title)
+
+        # special builders: raw SQL only
+        if builder_name in SPECIAL_BUILDERS or "builder" in dashboard:
+            add_raw_sql(generator.get_special_builder(builder_name).generate_dashboard_json(), title)
+            continue
+
+        for panel in dashboard["panels"]:
+            for table in panel.get("distinct") or []:
+                add(table, source=title)
+
+        # IV curves: raw SQL built by the panel builder
+        xy_panels = [panel for panel in dashboard["panels"] if panel["chart_type"] == "xychart"]
+        if xy_panels:
+            add_raw_sql(generator.panel_builder.generate_panels_json(title, xy_panels), title)
+
+    return [views[name] for name in sorted(views)]
+
+def rewrite_latest_views(sql: str) -> str:
+    """Replace the latest row definitions in raw SQL that match a view by a read of the view.
+    """
+    def replace(match: re.Match) -> str:
+        view = get_latest_view(match.group("table"))
+        key = match.group("key")
+        if view is None or (view.distinct_on, view.order_by) != ([key], [key, f"{match.group('order')} DESC"]):
+            return match.group(0)
+        return f"SELECT * FROM {view.name}"
+
+    return LATEST_ROW_PATTERN.sub(replace, sql)
+
+def rewrite_dashboard_latest_views(node):
+    """Rewrite every `rawSql` of a dashboard json in place. -> rewrite_latest_views
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "rawSql" and isinstance(value, str):
+                node[key] = rewrite_latest_views(value)
+            else:
+                rewrite_dashboard_latest_views(value)
+    elif isinstance(node, list):
+        for item in node:
+            rewrite_dashboard_latest_views(item)
+
+
+# ============================================================
+# === Database ===============================================
+# ============================================================
+
+def run_psql(sql: str, options: list = (), dsn: str = None) -> "subprocess.CompletedProcess":
+    """Run SQL with `psql`, connected with db_conn.yaml.
+       - The views must be created and refreshed by their owner: `views_user` / `views_password` if set, otherwise `user` / `password`.
+       - options: extra psql options, e.g. `["-A", "-t"]` for unaligned rows without headers.
+       - dsn: connect to another database instead, e.g. `postgresql://postgres@localhost/hgcdb_bench` for the benchmarks.
+    """
+    import subprocess
+
+    psql = shutil.which("psql")
+    if psql is None:
+        raise FileNotFoundError("[Views] `psql` not found, install the PostgreSQL client or run the SQL file by hand")
+
+    command = [psql, "-X", "-q", "-v", "ON_ERROR_STOP=1"]
+    if dsn is not None:
+        command += ["-d", dsn, *options]
+        env = dict(os.environ)
+    else:
+        user = settings.db_conn.get("views_user") or settings.DB_USER
+        password = settings.db_conn.get("views_password") or settings.DB_PASSWORD
+        command += [
+            "-h", str(settings.DB_HOST), "-p", str(settings.DB_PORT),
+            "-U", str(user), "-d", str(settings.DB_NAME),
+            *options,
+        ]
+        env = dict(os.environ, PGPASSWORD=str(password or ""))
+
+    return subprocess.run(command, input=sql, text=True, capture_output=True, env=env)
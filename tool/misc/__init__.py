@@ -1 +1,15 @@
-from .validator import *
\ No newline at end of file
+import importlib
+
+# validator class -> submodule, imported on first access
+_LAZY_CLASSES = {
+    "DashboardValidator":   "validator",
+    "AlertRuleValidator":   "validator",
+}
+
+__all__ = list(_LAZY_CLASSES)
+
+def __getattr__(name: str):
+    if name in _LAZY_CLASSES:
+        module = importlib.import_module(f".{_LAZY_CLASSES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
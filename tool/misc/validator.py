@@ -1,6 +1,5 @@
-import csv
-
 from tool.helper import *
+from tool.schema import get_schema_catalog
 
 """
 This file defines the validator and auto_match classes for the input for the config files used to generate Grafana dashboards/panels and alert-rules.
@@ -52,17 +51,12 @@ class DashboardValidator:
                 yield dash_title, panel_title, panel
     
     def get_valid_columns(self, table_name: str) -> list:
-        """Return the list of valid column names from a given table CSV.
+        """Return the list of valid column names of a given table from the SchemaCatalog.
         """
-        table_path = os.path.join(DB_INFO_PATH, f"{table_name}.csv")
-
-        try:
-            with open(table_path, newline='') as f:
-                reader = csv.reader(f)
-                return [row[0].strip() for row in reader if row and row[0].strip()]
-        except FileNotFoundError:
-            print(f"[Error] Table not found: {table_path}")
-            return []
+        columns = get_schema_catalog().columns(table_name)
+        if not columns:
+            print(f"[Error] Table not found: {os.path.join(DB_INFO_PATH, f'{table_name}.csv')}")
+        return columns
 
     def should_skip_panel(self, panel: dict) -> bool:
         """Check the panel chart_type to determine if it should be skipped.
@@ -297,17 +291,12 @@ class AlertRuleValidator:
         return self._cfg.get("alert", [])
     
     def get_valid_columns(self, table_name: str) -> list:
-        """Return the list of valid column names from a given table CSV.
+        """Return the list of valid column names of a given table from the SchemaCatalog.
         """
-        table_path = os.path.join(DB_INFO_PATH, f"{table_name}.csv")
-
-        try:
-            with open(table_path, newline='') as f:
-                reader = csv.reader(f)
-                return [row[0].strip() for row in reader if row and row[0].strip()]
-        except FileNotFoundError:
-            print(f"[Error] Table not found: {table_path}")
-            return []
+        columns = get_schema_catalog().columns(table_name)
+        if not columns:
+            print(f"[Error] Table not found: {os.path.join(DB_INFO_PATH, f'{table_name}.csv')}")
+        return columns
         
     def convert_panelID_to_title(self, panelID: int, dash_title: str) -> str:
         """Convert the panelID to panel title.
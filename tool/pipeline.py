@@ -0,0 +1,329 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import yaml
+
+from tool.helper import *
+from tool.client import GrafanaClient
+from tool import AlertBuilder
+from tool import DashboardBuilder
+from tool.generator import load_dashboard_jobs, generate_dashboards
+
+"""
+This file defines the in-process deployment pipeline used by `main.py`.
+    - Every stage shares one parsed `gf_conn` / `db_conn` and one `GrafanaClient`.
+    - Stages (in order):
+        - prepare: create the service account token and add the datasource (first run only)
+        - create_folders: create the Grafana folders from `config_folders`
+        - build_dashboards: generate every dashboard json in memory (optionally exported to disk)
+        - upload: upload the generated dashboards, streaming them from the builders if not built yet
+        - create_alerts: generate and upload the alert rules and notification system
+    - The scripts in `preSteps` and `create` are thin wrappers around the same stages.
+"""
+
+class Pipeline:
+    def __init__(self, gf_client: GrafanaClient = None, export_path: str = None):
+        self.client = gf_client if gf_client else settings.client
+        self.export_path = export_path     # optional: also save every dashboard json to disk
+        self.inventory = None
+        self.dashboards = []
+        self.build_failures = []
+        self.dashboard_builder = DashboardBuilder()
+
+    # -- Stage: prepare --
+    def prepare(self):
+        """Create the API token and add the PostgreSQL datasource.
+           - The client is rebuilt with the new token and polled until Grafana accepts it.
+        """
+        self.create_api_key()
+        self.client.wait_until_ready()
+        self.add_datasource()
+
+    def create_api_key(self):
+        """Create a service account, store its API key in gf_conn.yaml and rebuild the client.
+        """
+        sa_name = f"{settings.INSTITUTION}-service-account"
+        token_name = f"{settings.INSTITUTION}-sa-token"
+
+        # Create service account
+        sa_id, api_key = self.client.create_service_account_and_token(sa_name, token_name, settings.GF_USER, settings.GF_PASS)
+
+        # Update gf_conn
+        settings.gf_conn.set('GF_SA_ID', sa_id)
+        settings.gf_conn.set('GF_SA_NAME', sa_name)
+        settings.gf_conn.set('GF_API_KEY', api_key)
+        settings.gf_conn.set('GF_DATA_SOURCE_NAME', str(f"{settings.INSTITUTION}-{settings.DB_NAME}".upper()))
+        settings.gf_conn.set('GF_DATA_SOURCE_UID', "mac-postgres-db")
+        settings.gf_conn.save()
+
+        # rebuild GrafanaClient with new token
+        self.client = create_client(api_key)
+
+        print(f" >> Auto update for gf_conn.yaml successfully! ヾ(´ωﾟ｀) \n")
+
+    def add_datasource(self):
+        """Add the PostgreSQL data source to Grafana as default.
+        """
+        datasource_name = settings.gf_conn.get('GF_DATA_SOURCE_NAME')
+        datasource_uid  = settings.gf_conn.get('GF_DATA_SOURCE_UID')
+
+        self.client.add_postgres_datasource(datasource_name, datasource_uid, settings.DB_HOST, settings.DB_PORT, settings.DB_NAME, settings.DB_USER, settings.DB_PASSWORD)
+
+    # -- Stage: create_folders --
+    def create_folders(self):
+        """Create a Grafana folder for every yaml file in `config_folders`.
+           - Each folder would be named by replacing '_' to ' ' of the yaml_filename.
+        """
+        if self.inventory is None:
+            self.refresh_inventory()
+
+        for config in sorted(os.listdir(CONFIG_FOLDER_PATH)):
+            # skip non-yaml files
+            if not config.endswith(".yaml"):
+                continue
+
+            folder_name = config.split(".")[0].replace("_", " ")
+            self.generate_folder(folder_name)
+
+        # save all folder uids at once
+        settings.gf_conn.save()
+        print("\n >>>> Dashboard Folders are in Grafana!")
+
+    def generate_folder(self, folder_name: str):
+        """Create Grafana folder or fetch if it already exists. Update UID map.
+        """
+        if folder_name == "General":  # default folder: no UID
+            print("[Folder] Skipping folder creation: 'General' is default folder with no UID.")
+            return ""
+        else:
+            folder_uid = create_uid(folder_name)
+
+        # folder already known from the inventory
+        if self.inventory is not None and self.inventory.folder_exists(folder_uid):
+            settings.gf_conn.set(f"GF_FOLDER_UIDS.{folder_name}", folder_uid)
+            print(f"[Folder] Verified [DASHBOARD] folder '{folder_name}'")
+            return folder_uid
+
+        # create or fetch folder
+        try:
+            uid = self.client.create_or_get_folder(folder_name, folder_uid)
+            if self.inventory is not None:
+                self.inventory.add_folder(uid, folder_name)
+            settings.gf_conn.set(f"GF_FOLDER_UIDS.{folder_name}", uid)
+            print(f"[Folder] Created or verified [DASHBOARD] folder '{folder_name}'")
+            return uid
+
+        except requests.RequestException as e:
+            print(f"[ERROR] Failed to create or fetch [DASHBOARD] folder '{folder_name}': {e}")
+            raise
+
+    # -- Stage: build_dashboards --
+    def build_dashboards(self) -> list:
+        """Generate all the dashboards json in memory and keep them for the `upload` stage.
+        """
+        self.dashboards = list(self.iter_dashboards())
+
+        if self.build_failures:
+            print(f"\n >>>> {len(self.build_failures)} Dashboards json failed to generate. \n")
+        else:
+            print(f"\n >>>> All Dashboards json generated successfully! ({len(self.dashboards)} dashboards)\n")
+
+        return self.dashboards
+
+    def iter_dashboards(self):
+        """Generate every dashboard json in memory, yielding `(folder, dashboard_json)` as soon as each is built.
+           - `folder` is the config file name, e.g. `Modules_QC_Summary`.
+           - Dashboards are built in parallel (GF_BUILD_WORKERS, GF_BUILD_MODE) and yielded in config order.
+           - A dashboard that fails to build is reported and skipped; the others are still yielded.
+           - If `export_path` is set, each dashboard is also saved to `<export_path>/<folder>/<title>.json`.
+        """
+        jobs = load_dashboard_jobs()
+        max_workers = settings.gf_conn.get('GF_BUILD_WORKERS')
+        mode = settings.gf_conn.get('GF_BUILD_MODE', "process")
+
+        self.build_failures = []
+        for folder, dashboard, dashboard_json, error in generate_dashboards(jobs, int(max_workers) if max_workers else None, mode):
+            if error:
+                print(f"[ERROR] Failed to generate dashboard '{dashboard['title']}' | Reason: {error}")
+                self.build_failures.append((folder, dashboard["title"], error))
+                continue
+
+            yield self._emit_dashboard(dashboard, dashboard_json, folder)
+
+    def _emit_dashboard(self, dashboard: dict, dashboard_json: dict, folder: str) -> tuple:
+        """Hand one built dashboard to the uploader, exporting it to disk if requested.
+        """
+        if self.export_path:
+            self.dashboard_builder.save_dashboard_json(dashboard, dashboard_json, folder, self.export_path)
+
+        return folder, dashboard_json
+
+    # -- Stage: upload --
+    def upload(self, dashboards = None, max_workers: int = None, force: bool = False) -> list:
+        """Upload the dashboards concurrently.
+           - `dashboards` is an iterable of `(folder, dashboard_json)`. By default the dashboards from
+             `build_dashboards` are used; if nothing was built, `iter_dashboards` is streamed so uploads
+             start while later dashboards are still being built.
+           - At most `max_workers` uploads are in flight (default: GF_UPLOAD_WORKERS or the pool size).
+           - Folders must exist before this stage, so `create_folders` always runs first.
+           - Dashboards whose content hash matches the remote copy are skipped unless `force` is set.
+        """
+        if max_workers is None:
+            max_workers = int(settings.gf_conn.get('GF_UPLOAD_WORKERS', settings.gf_conn.get('GF_POOL_SIZE', 10)))
+
+        if dashboards is None:
+            dashboards = self.dashboards if self.dashboards else self.iter_dashboards()
+
+        # fetch the remote state in one bulk call
+        if self.inventory is None:
+            self.refresh_inventory()
+
+        # upload with a bounded worker pool, submitting each dashboard as soon as it is available
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [executor.submit(self._upload_one, folder, dashboard_json, force) for folder, dashboard_json in dashboards]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+        self.print_upload_summary(results, elapsed)
+
+        return results
+
+    def _upload_one(self, folder: str, dashboard_json: dict, force: bool = False) -> dict:
+        """Upload one dashboard and record its status and latency.
+        """
+        title = dashboard_json.get("title")
+
+        start = time.perf_counter()
+        try:
+            status = self.dashboard_builder.upload_dashboard(dashboard_json, folder, self.client, self.inventory, skip_unchanged=not force)
+            error = None
+        except Exception as e:
+            print(f"[SKIPPED] Error uploading dashboard: {title} | Status: {e}")
+            status, error = None, str(e)
+        latency = time.perf_counter() - start
+
+        return {"folder": folder, "dashboard": title, "status": status, "latency": latency, "error": error}
+
+    def refresh_inventory(self):
+        """Fetch all remote dashboards and folders into `self.inventory` with one search per type.
+           - Falls back to per-dashboard lookups (inventory = None) if the search API fails.
+        """
+        try:
+            self.inventory = self.client.fetch_inventory()
+        except requests.RequestException as e:
+            print(f"[WARNING] Failed to fetch remote dashboards, uploading everything: {e}")
+            self.inventory = None
+
+    def print_upload_summary(self, results: list, elapsed: float):
+        """Print the per-dashboard upload status and latency.
+        """
+        skipped = [r for r in results if r["status"] == 304]
+        failed = [r for r in results if r["status"] not in (200, 304)]
+        uploaded = len(results) - len(skipped) - len(failed)
+
+        print("\n[Upload] Summary:")
+        for r in results:
+            status = "Unchanged" if r["status"] == 304 else r["status"]
+            print(f"    {r['folder']}/{r['dashboard']} | Status: {status} | {r['latency'] * 1000:.0f} ms")
+
+        if failed:
+            print(f"\n >>>> {uploaded} Dashboards uploaded, {len(skipped)} unchanged, {len(failed)} failed in {elapsed:.2f}s.\n")
+        else:
+            print(f"\n >>>> Dashboards uploaded! ({uploaded} uploaded, {len(skipped)} unchanged, in {elapsed:.2f}s)\n")
+
+    # -- Stage: create_alerts --
+    def create_alerts(self):
+        """Generate and upload all the alert rules, then rebuild the notification system.
+        """
+        alert_builder = AlertBuilder(settings.GF_DS_UID)
+
+        # Delete all the alerts generated previously
+        self.client.delete_all_alert_rules()
+
+        # Loop for every config files
+        for config in os.listdir(CONFIG_FOLDER_PATH):
+            if config == "Other_Alerts_Config":
+                # all table alerts are not generated for now
+                continue
+            elif not config.endswith(".yaml"):
+                continue
+
+            config_path = os.path.join(CONFIG_FOLDER_PATH, config)
+
+            # Load the alerts
+            with open(config_path, mode = 'r') as file:
+                tot_config = yaml.safe_load(file)
+            if "alert" not in tot_config:
+                continue
+
+            folder_name = config.split(".")[0].replace("_", " ")
+            file_name = config.split(".")[0]
+
+            # Generate the alert json and export it to a file
+            for alert in tot_config["alert"]:
+                alert_json = alert_builder.generate_alerts(alert, folder_name)
+                alert_builder.save_alerts_json(alert, alert_json, file_name)
+
+        print(" >>>> All Alerts json generated successfully!\n")
+
+        # Upload alerts
+        if os.path.exists(ALERTS_FOLDER_PATH):
+            for folder in os.listdir(ALERTS_FOLDER_PATH):
+                for file_name in os.listdir(os.path.join(ALERTS_FOLDER_PATH, folder)):
+                    if file_name.endswith(".json"):
+                        file_path = os.path.join(ALERTS_FOLDER_PATH, folder, file_name)
+                        try:
+                            alert_builder.upload_alerts(file_path, self.client)
+                        except Exception as e:
+                            print(f"[SKIPPED] Error uploading alert rule: {file_name} | Status: {e}")
+
+            print("\n >>>> Alerts json files uploaded!\n")
+        else:
+            print("\n >>>> Alerts json files not found...\n")
+
+        # clear all the notification rules and contact points
+        self.client.delete_notification_policy_tree()
+        self.client.delete_all_contact_points()
+
+        if os.path.exists(CONTACT_FOLDER_PATH):
+            for config in os.listdir(CONTACT_FOLDER_PATH):
+                with open(os.path.join(CONTACT_FOLDER_PATH, config), 'r') as f:
+                    contact_config = yaml.safe_load(f)
+
+                for cp in contact_config.get("contactPoints", []):
+                    self.client.create_contact_point(cp["name"], cp["addresses"])
+
+                # upload notification policy (contact points)
+                self.client.put_policy_tree(contact_config.get('policies')[0])
+
+            print("\n >>>> Notification system uploaded!\n")
+        else:
+            print(f"Contact config folder not found: {CONTACT_FOLDER_PATH}")
+
+        # Clear GF_FOLDER_UIDS and GF_ALERT_UIDS map:
+        settings.gf_conn.set("GF_FOLDER_UIDS", {})
+        settings.gf_conn.set("GF_ALERT_UIDS", {})
+        settings.gf_conn.save()
+        print(" >>>> GF_FOLDER_UIDS and GF_ALERT_UIDS map cleared!\n")
+
+        # Delete the alert files
+        remove_folder("Alerts", ALERTS_FOLDER_PATH)
+        print("\n >>>> Alerts json files removed!\n")
+
+    # -- Full Run --
+    def run(self, first_run: bool = False, alerts: bool = False):
+        """Run every stage in order in the current process.
+        """
+        if first_run:
+            self.prepare()
+        else:
+            self.client.wait_until_ready()
+
+        self.create_folders()
+        self.upload(self.iter_dashboards())
+
+        if alerts:
+            self.create_alerts()
@@ -0,0 +1,190 @@
+import os
+import csv
+import json
+import statistics
+from datetime import datetime
+
+from tool.helper import *
+
+"""
+This file measures the cost of every generated query with `EXPLAIN (ANALYZE, BUFFERS)` on a PostgreSQL database.
+    - The queries are expanded offline (tool/sql_expander.py); the options of the dropdowns are read from the database, so 'All' is realistic.
+    - Meant for a local database with the schema of tool/postgres_tables (`SchemaCatalog.create_schema_sql`) and representative data.
+    - The included classes/functions are:
+        - QueryResult: planning / execution time, rows and buffers of one query
+        - explain: run one query with `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)` through psql
+        - run_benchmark: every panel and template variable query of the dashboards
+        - save_report / load_report: the JSON and CSV report
+        - compare_reports: the regressions and improvements against a baseline report
+"""
+
+REPORT_COLUMNS = ["label", "dashboard", "query", "kind", "key", "planning_ms", "execution_ms", "rows", "shared_hit", "shared_read", "temp_blocks", "error"]
+
+class QueryResult:
+    def __init__(self, dashboard: str, query: str, kind: str, key: str = None, planning_ms: float = None, execution_ms: float = None,
+                 rows: int = None, shared_hit: int = None, shared_read: int = None, temp_blocks: int = None, error: str = None):
+        self.dashboard = dashboard
+        self.query = query              # panel title, or `$variable`
+        self.kind = kind                # panel / variable
+        self.key = key                  # cache key of the expanded SQL, changes with the SQL
+        self.planning_ms = planning_ms
+        self.execution_ms = execution_ms
+        self.rows = rows
+        self.shared_hit = shared_hit    # buffers found in shared memory
+        self.shared_read = shared_read  # buffers read from disk / OS cache
+        self.temp_blocks = temp_blocks  # sorts and hashes spilled to disk
+        self.error = error
+
+    @property
+    def label(self) -> str:
+        return f"{self.dashboard} / {self.query}"
+
+    def to_dict(self) -> dict:
+        return {column: getattr(self, column) for column in REPORT_COLUMNS}
+
+    @classmethod
+    def from_dict(cls, row: dict) -> "QueryResult":
+        return cls(**{column: row.get(column) for column in REPORT_COLUMNS if column != "label"})
+
+
+# ============================================================
+# === EXPLAIN ================================================
+# ============================================================
+
+def explain(sql: str, dsn: str = None, runs: int = 1, timeout: int = 60) -> dict:
+    """Run a query with `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)` and return its measures, the median of `runs` for the times.
+       - Raise RuntimeError with psql's message if the query fails or times out (`timeout` seconds).
+    """
+    from tool.latest_views import run_psql
+
+    statement = f"SET statement_timeout = '{int(timeout)}s';\nEXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)\n{sql.strip().rstrip(';')};"
+    planning, execution, plan = [], [], None
+
+    for _ in range(max(runs, 1)):
+        result = run_psql(statement, ["-A", "-t"], dsn)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "psql failed")
+        output = json.loads(result.stdout)[0]
+        planning.append(output["Planning Time"])
+        execution.append(output["Execution Time"])
+        plan = output["Plan"]
+
+    return {
+        "planning_ms": round(statistics.median(planning), 3),
+        "execution_ms": round(statistics.median(execution), 3),
+        "rows": plan.get("Actual Rows"),
+        "shared_hit": plan.get("Shared Hit Blocks"),
+        "shared_read": plan.get("Shared Read Blocks"),
+        "temp_blocks": plan.get("Temp Read Blocks", 0) + plan.get("Temp Written Blocks", 0),
+    }
+
+def run_benchmark(jobs: list, dsn: str = None, variables: dict = None, time_from: str = "now-90d", time_to: str = "now",
+                  runs: int = 3, timeout: int = 60) -> list:
+    """Expand and EXPLAIN every panel and template variable query of the dashboards of `jobs`, in config order.
+       - The dropdowns are 'All' (every option, read from the database); `variables` sets other values, e.g. a module name for the textboxes.
+    """
+    from tool.generator import generate_dashboards
+    from tool.sql_expander import GrafanaSQLExpander, iter_panel_sql, iter_variable_sql, fetch_variable_options
+
+    results = []
+    for folder, dashboard, dashboard_json, error in generate_dashboards(jobs):
+        title = dashboard["title"]
+        if error is not None:
+            print(f"[Benchmark] Skip {title}: {error}")
+            continue
+
+        expander = GrafanaSQLExpander.for_dashboard(dashboard_json, time_from=time_from, time_to=time_to, variables=variables)
+        expander.options = fetch_variable_options(dashboard_json, expander, dsn)
+
+        queries = [(panel, sql, "panel") for panel, sql in iter_panel_sql(dashboard_json)]
+        queries += [(f"${name}", sql, "variable") for name, sql in iter_variable_sql(dashboard_json)]
+
+        seen = {}
+        for query, sql, kind in queries:
+            seen[query] = seen.get(query, 0) + 1
+            if seen[query] > 1:
+                query = f"{query} #{seen[query]}"   # panels with the same title
+
+            result = QueryResult(title, query, kind)
+            try:
+                expanded = expander.expand(sql)
+                result.key = expander.cache_key(sql)
+                for name, value in explain(expanded, dsn, runs, timeout).items():
+                    setattr(result, name, value)
+            except (KeyError, ValueError, RuntimeError) as e:
+                result.error = str(e)
+
+            status = f"[ERROR] {result.error}" if result.error else f"{result.execution_ms:.1f} ms, {result.rows} rows"
+            print(f"[Benchmark] {result.label} | {status}")
+            results.append(result)
+
+    return results
+
+
+# ============================================================
+# === Report =================================================
+# ============================================================
+
+def save_report(results: list, path: str, meta: dict = None):
+    """Save the results as `<path>.json` (with `meta`, e.g. the time range) and `<path>.csv`.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    base = os.path.splitext(path)[0]
+
+    report = {"created": datetime.now().isoformat(timespec="seconds"), **(meta or {}), "queries": [r.to_dict() for r in results]}
+    with open(f"{base}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    with open(f"{base}.csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(r.to_dict() for r in results)
+
+    print(f"[Benchmark] Saved {len(results)} queries to {base}.json / .csv")
+
+def load_report(path: str) -> list:
+    with open(path, 'r') as f:
+        return [QueryResult.from_dict(row) for row in json.load(f)["queries"]]
+
+def compare_reports(results: list, baseline: list, threshold: float = 1.5, min_ms: float = 5) -> dict:
+    """Compare the execution times with a baseline report, by label.
+       - regressions / improvements: at least `threshold` times slower / faster, and `min_ms` apart (timing noise)
+       - changed: the SQL is not the same as in the baseline (different cache key)
+       - added / removed / failing: the queries only in one report, and the ones that fail now
+    """
+    old = {r.label: r for r in baseline}
+    new = {r.label: r for r in results}
+    diff = {"regressions": [], "improvements": [], "changed": [], "added": [], "removed": sorted(set(old) - set(new)), "failing": []}
+
+    for label, result in new.items():
+        if result.error:
+            diff["failing"].append(label)
+            continue
+        before = old.get(label)
+        if before is None:
+            diff["added"].append(label)
+            continue
+        if before.key != result.key:
+            diff["changed"].append(label)
+        if before.execution_ms is None:
+            continue
+
+        entry = (label, before.execution_ms, result.execution_ms)
+        if abs(result.execution_ms - before.execution_ms) < min_ms:
+            continue
+        if result.execution_ms >= before.execution_ms * threshold:
+            diff["regressions"].append(entry)
+        elif result.execution_ms * threshold <= before.execution_ms:
+            diff["improvements"].append(entry)
+
+    return diff
+
+def print_comparison(diff: dict):
+    for name in ("regressions", "improvements"):
+        for label, before, after in sorted(diff[name], key=lambda e: e[1] - e[2]):
+            print(f"[Benchmark] {name[:-1].capitalize()}: {label} | {before:.1f} ms -> {after:.1f} ms")
+    for name in ("changed", "added", "removed", "failing"):
+        for label in diff[name]:
+            print(f"[Benchmark] {name.capitalize()}: {label}")
+    print(f"[Benchmark] {len(diff['regressions'])} regressions, {len(diff['improvements'])} improvements, "
+          f"{len(diff['changed'])} changed, {len(diff['failing'])} failing")
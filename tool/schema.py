@@ -0,0 +1,240 @@
+import os
+import csv
+import json
+
+from tool.helper import DB_INFO_PATH, SCHEMA_CACHE_PATH
+
+"""
+This file contains the schema catalog of the HGCDB tables, built from the `tool/postgres_tables` CSVs.
+    - Each CSV row is: column name, type, description, constraint name, referenced table.
+    - The included classes/functions are:
+        - TableSchema: the columns, types, primary key, foreign keys and derived columns of one table
+        - SchemaCatalog: all tables, parsed once and cached on disk (invalidated by the CSVs' mtime), and their DDL
+        - get_schema_catalog: the shared catalog of this process
+"""
+
+CACHE_VERSION = 2   # bump when the cached layout changes
+
+class TableSchema:
+    def __init__(self, name: str, columns: list, types: dict, primary_key: list, foreign_keys: dict, identifiers: list, derived: list = None):
+        self.name = name
+        self.columns = columns              # ordered column names
+        self.types = types                  # column -> type, e.g. `TEXT`, `serial`, `REAL[]`
+        self.primary_key = primary_key      # primary key columns
+        self.foreign_keys = foreign_keys    # column -> referenced table
+        self.identifiers = identifiers      # `fk_identifier` columns, e.g. `module_name`
+        self.derived = derived or []        # columns derived from the part serial number, e.g. `geometry`
+        self._column_set = set(columns)
+
+    @classmethod
+    def from_csv(cls, name: str, path: str) -> "TableSchema":
+        """Parse one table definition CSV.
+        """
+        columns, types, primary_key, foreign_keys, identifiers, derived = [], {}, [], {}, [], []
+
+        with open(path, newline='') as f:
+            for row in csv.reader(f):
+                if not row or not row[0].strip():
+                    continue
+                row = [cell.strip() for cell in row] + [""] * (5 - len(row))
+                column, col_type, description, constraint, ref_table = row[:5]
+
+                columns.append(column)
+                if "PRIMARY KEY" in col_type.upper():
+                    primary_key.append(column)
+                    col_type = col_type[:col_type.upper().index("PRIMARY KEY")].strip()
+                types[column] = col_type
+                if ref_table:
+                    foreign_keys[column] = ref_table
+                elif constraint == "fk_identifier":
+                    identifiers.append(column)
+                if description.lower().startswith("derived from"):
+                    derived.append(column)
+
+        return cls(name, columns, types, primary_key, foreign_keys, identifiers, derived)
+
+    @property
+    def distinct_column(self) -> str:
+        """The first column of the table, used for `DISTINCT ON`.
+        """
+        return self.columns[0] if self.columns else None
+
+    def has_column(self, column: str) -> bool:
+        return column in self._column_set
+
+    def to_dict(self) -> dict:
+        return {
+            "columns": self.columns,
+            "types": self.types,
+            "primary_key": self.primary_key,
+            "foreign_keys": self.foreign_keys,
+            "identifiers": self.identifiers,
+            "derived": self.derived,
+        }
+
+
+class SchemaCatalog:
+    """Index of every table definition in `schema_path`.
+       - The parsed tables are cached as json in `cache_path`, and re-parsed when a CSV is added, removed or modified.
+    """
+    def __init__(self, schema_path: str = DB_INFO_PATH, cache_path: str = SCHEMA_CACHE_PATH):
+        self.schema_path = schema_path
+        self.cache_path = cache_path
+        self.tables = self._load()      # table name -> TableSchema
+
+    # -- Lookup --
+    @property
+    def table_names(self) -> list:
+        return sorted(self.tables)
+
+    def has_table(self, table_name: str) -> bool:
+        return table_name in self.tables
+
+    def table(self, table_name: str) -> TableSchema:
+        """Get the schema of a table. Raise KeyError if the table is unknown.
+        """
+        if table_name not in self.tables:
+            raise KeyError(f"[Schema] Table not found: {table_name}")
+        return self.tables[table_name]
+
+    def columns(self, table_name: str) -> list:
+        """Get the ordered column names of a table. Return [] if the table is unknown.
+        """
+        table = self.tables.get(table_name)
+        return list(table.columns) if table else []
+
+    def column_type(self, table_name: str, column: str) -> str:
+        """Get the SQL type of a column, without its DEFAULT, e.g. `TEXT`, `INT`, `REAL[]`. Return None if unknown.
+        """
+        table = self.tables.get(table_name)
+        if table is None or column not in table.types:
+            return None
+        col_type = table.types[column].upper().split(" DEFAULT")[0].strip()
+        return "INT" if col_type == "SERIAL" else col_type
+
+    def referencing_tables(self, table_name: str) -> list:
+        """List the tables with a foreign key to `table_name`.
+        """
+        return sorted(name for name, table in self.tables.items() if table_name in table.foreign_keys.values())
+
+    def is_component_table(self, table_name: str) -> bool:
+        """Check if the table is a component table (one row per part), i.e. other tables have a foreign key to it.
+        """
+        return bool(self.referencing_tables(table_name))
+
+    def dependency_order(self) -> list:
+        """List the table names with every referenced table before the tables referencing it, e.g. to create or fill them.
+        """
+        ordered, visiting = [], set()
+
+        def visit(name: str):
+            if name in ordered or name in visiting or name not in self.tables:
+                return
+            visiting.add(name)
+            for ref_table in sorted(set(self.tables[name].foreign_keys.values())):
+                visit(ref_table)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in self.table_names:
+            visit(name)
+        return ordered
+
+    # -- DDL --
+    def create_table_sql(self, table_name: str) -> str:
+        """Build the `CREATE TABLE` of a table, with its primary key and foreign keys (to the primary key of the referenced table).
+        """
+        table = self.table(table_name)
+        lines = []
+        for column in table.columns:
+            line = f"{column} {table.types[column]}"
+            if table.primary_key == [column]:
+                line += " PRIMARY KEY"
+            ref_table = self.tables.get(table.foreign_keys.get(column))
+            if ref_table is not None and len(ref_table.primary_key) == 1:
+                line += f" REFERENCES {ref_table.name} ({ref_table.primary_key[0]})"
+            lines.append(line)
+        if len(table.primary_key) > 1:
+            lines.append(f"PRIMARY KEY ({', '.join(table.primary_key)})")
+
+        columns = ",\n    ".join(lines)
+        return f"CREATE TABLE IF NOT EXISTS {table_name} (\n    {columns}\n);"
+
+    def create_schema_sql(self) -> str:
+        """Build the `CREATE TABLE` of every table, in dependency order.
+        """
+        return "\n\n".join(self.create_table_sql(name) for name in self.dependency_order()) + "\n"
+
+    def stable_columns(self, table_name: str, distinct_on: list) -> set:
+        """Columns with a single value per `DISTINCT ON (distinct_on)` group.
+           - Filtering on them before `DISTINCT ON` keeps or drops whole groups, so the latest row of each kept group is unchanged.
+           - Only the distinct key itself, and the columns derived from the part serial number (whitelisted per table in its CSV: `derived from ...`).
+           - Any other column can change when a part is re-inserted, even in a component table: filtering on it first could pick a stale row.
+        """
+        table = self.tables.get(table_name)
+        if table is None:
+            return set(distinct_on)
+        return set(distinct_on) | set(table.derived)
+
+    # -- Load and Cache --
+    def _get_mtimes(self) -> dict:
+        """Get the modified time of every table CSV, keyed by table name.
+        """
+        return {
+            os.path.splitext(f)[0]: os.stat(os.path.join(self.schema_path, f)).st_mtime_ns
+            for f in os.listdir(self.schema_path)
+            if f.endswith(".csv")
+        }
+
+    def _load(self) -> dict:
+        """Load the tables from the cache if it is still valid, otherwise parse the CSVs and rewrite the cache.
+        """
+        mtimes = self._get_mtimes()
+
+        cached = self._read_cache()
+        if cached and cached.get("version") == CACHE_VERSION and cached.get("mtimes") == mtimes:
+            return {name: TableSchema(name, **table) for name, table in cached["tables"].items()}
+
+        tables = {
+            name: TableSchema.from_csv(name, os.path.join(self.schema_path, f"{name}.csv"))
+            for name in sorted(mtimes)
+        }
+        self._write_cache(mtimes, tables)
+        return tables
+
+    def _read_cache(self) -> dict:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, mtimes: dict, tables: dict):
+        if not self.cache_path:
+            return
+        cache = {
+            "version": CACHE_VERSION,
+            "mtimes": mtimes,
+            "tables": {name: table.to_dict() for name, table in tables.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)   # atomic, parallel builders never read a partial file
+        except OSError as e:
+            print(f"[Schema] Could not write cache {self.cache_path}: {e}")
+
+
+_catalog = None
+
+def get_schema_catalog() -> SchemaCatalog:
+    """Get the schema catalog of this process, loading it on first use.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = SchemaCatalog()
+    return _catalog
@@ -0,0 +1,339 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+from tool.helper import *
+
+"""
+This file expands the Grafana macros and template variables of the generated SQL into plain SQL, without Grafana.
+    - The expanded SQL can be run or `EXPLAIN`ed with psql, and hashed as a cache key.
+    - Grafana's order is kept: the template variables first, then the macros of the Postgres datasource.
+    - The included classes/functions are:
+        - GrafanaSQLExpander: a time range and variable values -> `expand(sql)`
+        - parse_time / format_interval / round_interval: Grafana's time range and `$__interval`
+        - iter_panel_sql / iter_variable_sql: the panel and template variable queries of a dashboard json
+        - fetch_variable_options: run the variable queries of a dashboard with psql, for 'All'
+    - Variable syntax: `$var`, `${var}`, `${var:format}`, `[[var]]`, `[[var:format]]`.
+    - Variable values: one value, a list (multi), or ALL_VALUE ('All'):
+        - 'All' is the variable's custom `allValue` inserted as-is, or else every option, formatted like a multi value
+        - the options of a query variable come from the database: pass them as `options`, Grafana would run the variable query
+    - Formats: the SQL default (multi / include-all values quoted, others only escaped), `sqlstring`, `raw`, `csv`, `pipe`, `singlequote`, `doublequote`.
+    - Macros: `$__time`, `$__timeEpoch`, `$__timeFilter`, `$__timeFrom`, `$__timeTo`, `$__timeGroup`, `$__timeGroupAlias`,
+      `$__unixEpochFilter`, `$__unixEpochFrom`, `$__unixEpochTo`, `$__unixEpochGroup`, `$__unixEpochGroupAlias`,
+      and the global variables `$__from`, `$__to`, `$__interval`, `$__interval_ms`, `$__range`, `$__range_s`, `$__range_ms`.
+"""
+
+ALL_VALUE = "$__all"            # the value of the 'All' option
+DEFAULT_TIME_FROM = "now-6h"    # Grafana's default time range
+DEFAULT_TIME_TO = "now"
+DEFAULT_MAX_DATA_POINTS = 1000  # ~ the width of a panel in pixels, for `$__interval`
+
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000, "y": 31536000}
+
+# `$var`, `[[var:format]]`, `${var:format}`
+_VARIABLE_PATTERN = re.compile(r"\$([A-Za-z_]\w*)|\[\[(\w+?)(?::(\w+))?\]\]|\$\{(\w+)(?::([^}]+))?\}")
+_MACRO_PATTERN = re.compile(r"\$__(\w+)\(")
+
+# Grafana's `rangeutil.roundInterval`: (upper bound in ms, interval in ms)
+_ROUNDED_INTERVALS = [
+    (15, 10), (35, 20), (75, 50), (150, 100), (350, 200), (750, 500),
+    (1500, 1000), (3500, 2000), (7500, 5000), (12500, 10000), (17500, 15000), (25000, 20000), (45000, 30000),
+    (90000, 60000), (210000, 120000), (450000, 300000), (750000, 600000), (1050000, 900000), (1500000, 1200000),
+    (2700000, 1800000), (5400000, 3600000), (9000000, 7200000), (16200000, 10800000), (24300000, 21600000),
+    (64800000, 43200000), (604800000, 86400000), (1814400000, 604800000), (3628800000, 2592000000),
+]
+
+# ============================================================
+# === Time ===================================================
+# ============================================================
+
+def parse_time(value, now: datetime = None) -> datetime:
+    """Parse a time of the range: a datetime, an ISO string, epoch milliseconds, or Grafana's `now`, `now-6h`, `now+1d`.
+    """
+    now = now or datetime.now(timezone.utc)
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, timezone.utc)
+
+    match = re.fullmatch(r"now(?:([+-])(\d+)(ms|[smhdwMy]))?", value.strip())
+    if match:
+        if not match.group(1):
+            return now
+        delta = timedelta(seconds=int(match.group(2)) * _UNITS[match.group(3)])
+        return now - delta if match.group(1) == "-" else now + delta
+    return parse_time(datetime.fromisoformat(value.strip().replace("Z", "+00:00")))
+
+def parse_interval(value: str) -> float:
+    """Parse a Grafana interval (`500ms`, `5m`, `'1h'`) to seconds.
+    """
+    match = re.fullmatch(r"'?\s*(\d+(?:\.\d+)?)\s*(ms|[smhdwMy])?\s*'?", str(value).strip())
+    if match is None:
+        raise ValueError(f"[Expand] Invalid interval: {value}")
+    return float(match.group(1)) * _UNITS[match.group(2) or "s"]
+
+def round_interval(seconds: float) -> float:
+    """Round an interval to one of Grafana's, e.g. 250 s -> 5m.
+    """
+    milliseconds = seconds * 1000
+    for upper, interval in _ROUNDED_INTERVALS:
+        if milliseconds < upper:
+            return interval / 1000
+    return _UNITS["y"]
+
+def format_interval(seconds: float) -> str:
+    """Format seconds like Grafana, e.g. 300 -> `5m`, 0.5 -> `500ms`.
+    """
+    if seconds < 1:
+        return f"{int(round(seconds * 1000))}ms"
+    for unit in ("y", "w", "d", "h", "m"):
+        if seconds % _UNITS[unit] == 0:
+            return f"{int(seconds // _UNITS[unit])}{unit}"
+    return f"{int(seconds)}s"
+
+def _rfc3339(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+# ============================================================
+# === Expander ===============================================
+# ============================================================
+
+class GrafanaSQLExpander:
+    def __init__(self, time_from=DEFAULT_TIME_FROM, time_to=DEFAULT_TIME_TO, variables: dict = None, templating: list = None, options: dict = None,
+                 interval: str = None, max_data_points: int = DEFAULT_MAX_DATA_POINTS, now: datetime = None):
+        self.time_from = parse_time(time_from, now)
+        self.time_to = parse_time(time_to, now)
+        self.variables = dict(variables or {})      # name -> value / list / ALL_VALUE, overrides the dashboard's current values
+        self.templating = {var["name"]: var for var in templating or []}   # the dashboard's `templating.list`
+        self.options = dict(options or {})          # name -> every value of the variable, for 'All'
+
+        range_seconds = (self.time_to - self.time_from).total_seconds()
+        if interval is not None:
+            self.interval = parse_interval(interval)
+        else:
+            self.interval = round_interval(max(range_seconds / max_data_points, 0.001))
+
+    @classmethod
+    def for_dashboard(cls, dashboard_json: dict, **kwargs) -> "GrafanaSQLExpander":
+        """Build an expander with the variables of a dashboard json, their current values as defaults.
+        """
+        return cls(templating=dashboard_json.get("templating", {}).get("list", []), **kwargs)
+
+    def expand(self, sql: str) -> str:
+        """Expand the variables, then the macros, of one query.
+        """
+        return self._expand_macros(self._expand_variables(sql))
+
+    def cache_key(self, sql: str) -> str:
+        """Hash of the expanded query, with the whitespace normalized.
+        """
+        canonical = " ".join(self.expand(sql).split())
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    # -- Variables --
+    def _global_variables(self) -> dict:
+        range_seconds = (self.time_to - self.time_from).total_seconds()
+        return {
+            "__from": str(int(self.time_from.timestamp() * 1000)),
+            "__to": str(int(self.time_to.timestamp() * 1000)),
+            "__interval": format_interval(self.interval),
+            "__interval_ms": str(int(self.interval * 1000)),
+            "__range": format_interval(range_seconds),
+            "__range_s": str(int(range_seconds)),
+            "__range_ms": str(int(range_seconds * 1000)),
+        }
+
+    def _expand_variables(self, sql: str) -> str:
+        global_variables = self._global_variables()
+
+        def replace(match: re.Match) -> str:
+            name = match.group(1) or match.group(2) or match.group(4)
+            fmt = match.group(3) or match.group(5)
+            if name in global_variables:
+                return global_variables[name]
+            if name.startswith("__"):
+                return match.group(0)       # a macro, expanded after the variables
+            return self.format_variable(name, fmt)
+
+        return _VARIABLE_PATTERN.sub(replace, sql)
+
+    def _get_value(self, name: str):
+        """Get the value of a variable: a string, or a list for several values. 'All' is resolved to the options.
+        """
+        variable = self.templating.get(name, {})
+        if name in self.variables:
+            value = self.variables[name]
+        elif variable:
+            value = (variable.get("current") or {}).get("value", "")
+        else:
+            raise KeyError(f"[Expand] Unknown variable: {name}, pass its value in `variables`")
+
+        if value == ALL_VALUE or value == [ALL_VALUE]:
+            if variable.get("allValue"):
+                return None     # custom all value, inserted as-is
+            options = self.options.get(name)
+            if options is None:
+                options = [option["value"] for option in variable.get("options") or [] if option.get("value") != ALL_VALUE]
+            if not options:
+                raise KeyError(f"[Expand] No options for 'All' of {name}, pass them in `options` (the result of its variable query)")
+            return list(options)
+
+        return value
+
+    def format_variable(self, name: str, fmt: str = None) -> str:
+        """Render a variable in a format, like Grafana's SQL datasources.
+        """
+        value = self._get_value(name)
+        if value is None:
+            return str(self.templating[name]["allValue"])
+
+        variable = self.templating.get(name, {})
+        is_list = isinstance(value, (list, tuple))
+        values = [str(v) for v in value] if is_list else [str(value)]
+
+        def quote(v: str) -> str:
+            return "'" + v.replace("'", "''") + "'"
+
+        if fmt is None:
+            # the SQL datasource default: quote multi / include-all values, only escape the others
+            if is_list or variable.get("multi") or variable.get("includeAll"):
+                return ",".join(quote(v) for v in values)
+            return values[0] if isinstance(value, (int, float)) else values[0].replace("'", "''")
+        if fmt == "sqlstring":
+            return ",".join(quote(v) for v in values)
+        if fmt in ("raw", "csv", "text"):
+            return ",".join(values)
+        if fmt == "pipe":
+            return "|".join(values)
+        if fmt == "singlequote":
+            return ",".join("'" + v.replace("'", "\\'") + "'" for v in values)
+        if fmt == "doublequote":
+            return ",".join('"' + v.replace('"', '\\"') + '"' for v in values)
+        raise ValueError(f"[Expand] Unsupported format `{fmt}` of {name}")
+
+    # -- Macros --
+    def _expand_macros(self, sql: str) -> str:
+        """Expand the Postgres macros, innermost first so their arguments are plain SQL.
+        """
+        while True:
+            matches = list(_MACRO_PATTERN.finditer(sql))
+            if not matches:
+                return sql
+            match = matches[-1]
+            end = _find_closing(sql, match.end())
+            args = _split_args(sql[match.end():end])
+            sql = sql[:match.start()] + self.render_macro(match.group(1), args) + sql[end + 1:]
+
+    def render_macro(self, name: str, args: list) -> str:
+        time_from, time_to = _rfc3339(self.time_from), _rfc3339(self.time_to)
+        epoch_from, epoch_to = int(self.time_from.timestamp()), int(self.time_to.timestamp())
+
+        def bucket(expression: str) -> str:
+            if len(args) < 2:
+                raise ValueError(f"[Expand] $__{name} needs a column and an interval")
+            seconds = parse_interval(args[1])
+            seconds = int(seconds) if seconds == int(seconds) else seconds
+            return f"floor({expression}/{seconds})*{seconds}"
+
+        if name == "time":
+            return f'{args[0]} AS "time"'
+        if name == "timeEpoch":
+            return f'extract(epoch from {args[0]}) AS "time"'
+        if name == "timeFilter":
+            return f"{args[0]} BETWEEN '{time_from}' AND '{time_to}'"
+        if name == "timeFrom":
+            return f"'{time_from}'"
+        if name == "timeTo":
+            return f"'{time_to}'"
+        if name in ("timeGroup", "timeGroupAlias"):
+            sql = bucket(f"extract(epoch from {args[0]})")
+            return f'{sql} AS "time"' if name == "timeGroupAlias" else sql
+        if name == "unixEpochFilter":
+            return f"{args[0]} >= {epoch_from} AND {args[0]} <= {epoch_to}"
+        if name == "unixEpochFrom":
+            return str(epoch_from)
+        if name == "unixEpochTo":
+            return str(epoch_to)
+        if name in ("unixEpochGroup", "unixEpochGroupAlias"):
+            sql = bucket(args[0])
+            return f'{sql} AS "time"' if name == "unixEpochGroupAlias" else sql
+        raise ValueError(f"[Expand] Unsupported macro: $__{name}")
+
+
+def _find_closing(sql: str, start: int) -> int:
+    """Find the `)` closing the parenthesis opened before `start`, skipping quoted literals.
+    """
+    depth, quoted = 1, False
+    for position in range(start, len(sql)):
+        char = sql[position]
+        if char == "'":
+            quoted = not quoted
+        elif not quoted:
+            depth += {"(": 1, ")": -1}.get(char, 0)
+            if depth == 0:
+                return position
+    raise ValueError(f"[Expand] Unbalanced macro arguments: {sql[start:start + 80]}")
+
+def _split_args(text: str) -> list:
+    """Split macro arguments on the top level commas.
+    """
+    args, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == "'":
+            quoted = not quoted
+        elif not quoted:
+            depth += {"(": 1, ")": -1}.get(char, 0)
+            if char == "," and depth == 0:
+                args.append(current.strip())
+                current = ""
+                continue
+        current += char
+    if current.strip():
+        args.append(current.strip())
+    return args
+
+
+# ============================================================
+# === Dashboards =============================================
+# ============================================================
+
+def iter_panel_sql(dashboard_json: dict):
+    """Yield `(panel title, rawSql)` for every query target of a dashboard json, rows included.
+    """
+    for panel in dashboard_json.get("panels", []):
+        for target in panel.get("targets") or []:
+            if isinstance(target.get("rawSql"), str):
+                yield panel.get("title", ""), target["rawSql"]
+        yield from iter_panel_sql(panel)
+
+def iter_variable_sql(dashboard_json: dict):
+    """Yield `(variable name, query)` for every query variable of a dashboard json.
+    """
+    for variable in dashboard_json.get("templating", {}).get("list", []):
+        if variable.get("type") == "query" and isinstance(variable.get("query"), str):
+            yield variable["name"], variable["query"]
+
+def fetch_variable_options(dashboard_json: dict, expander: GrafanaSQLExpander, dsn: str = None) -> dict:
+    """Run the query of every query variable with `psql` and return {name: values}, like Grafana fills the dropdowns.
+       - In dashboard order, so a variable query can read the options of the variables before it, like in Grafana.
+       - A variable query that fails (e.g. it reads another variable without a value) is reported and skipped.
+    """
+    from tool.latest_views import run_psql
+
+    given = dict(expander.options)
+    options = {}
+    for name, query in iter_variable_sql(dashboard_json):
+        expander.options = {**options, **given}
+        try:
+            sql = expander.expand(query)
+        except (KeyError, ValueError) as e:
+            print(f"[Expand] Skip the options of {name}: {e}")
+            continue
+        result = run_psql(sql, ["-A", "-t"], dsn)
+        if result.returncode != 0:
+            print(f"[Expand] Skip the options of {name}: {result.stderr.strip()}")
+            continue
+        options[name] = [line for line in result.stdout.splitlines() if line]
+
+    expander.options = given
+    return options
@@ -0,0 +1,52 @@
+import os
+import sys
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool.helper import *
+from tool.generator import load_dashboard_jobs
+from tool.index_advisor import IndexAdvisor, collect_queries
+from tool.latest_views import run_psql
+
+"""
+This script recommends the indexes for the SQL the dashboards run. -> tool/index_advisor.py
+    - Every panel, template variable and alert of the configs is analyzed: join keys, filters, `DISTINCT ON` orders, time ranges and textbox inputs.
+    - The ranked `CREATE INDEX` script is written to `views/indexes.sql`, each index with the queries it serves. Review it before applying it.
+    - `--apply` also runs it with `psql`, as `views_user` in db_conn.yaml (falls back to `user`). The indexes are built `CONCURRENTLY`.
+
+    - `--min-queries N` keeps the indexes serving at least N queries (default 2).
+
+Usage: python views/create_indexes.py [--apply] [--min-queries N]
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend the indexes for the generated dashboard SQL.")
+    parser.add_argument("--apply", action="store_true", help="also create the indexes with psql")
+    parser.add_argument("--min-queries", type=int, default=2, metavar="N", help="keep the indexes serving at least N queries")
+    args = parser.parse_args()
+
+    advisor = IndexAdvisor()
+    for source, sql in collect_queries(load_dashboard_jobs()):
+        advisor.analyze(sql, source)
+
+    candidates = advisor.recommend(args.min_queries)
+    sql = advisor.render_sql(candidates)
+
+    os.makedirs(os.path.dirname(INDEXES_SQL_PATH), exist_ok=True)
+    with open(INDEXES_SQL_PATH, 'w') as f:
+        f.write(sql)
+
+    for rank, candidate in enumerate(candidates, 1):
+        print(f"[Index] {rank:>3}. {candidate.name} | {', '.join(candidate.kinds)} | {len(candidate.usages)} queries")
+    print(f"[Index] Saved {len(candidates)} indexes for {advisor.queries} queries to {INDEXES_SQL_PATH}")
+
+    if args.apply:
+        result = run_psql(sql)
+        if result.returncode != 0:
+            print(f"[ERROR] Failed to create the indexes | Reason: {result.stderr.strip()}")
+            sys.exit(1)
+        print(f"[Index] Created {len(candidates)} indexes")
+
+
+if __name__ == "__main__":
+    main()
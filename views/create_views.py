@@ -0,0 +1,47 @@
+import os
+import sys
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool.helper import *
+from tool.generator import load_dashboard_jobs
+from tool.latest_views import collect_latest_views, run_psql
+
+"""
+This script writes the DDL of the materialized "latest row" views used by the dashboards. -> tool/latest_views.py
+    - The views are derived from the yaml `distinct` lists, the IV curves and the special builders.
+    - The DDL is written to `views/latest_views.sql`: each view, its unique index, and a GRANT to the dashboard user (`user` in db_conn.yaml).
+    - `--apply` also runs it with `psql`, as `views_user` in db_conn.yaml (the owner of the views, falls back to `user`).
+    - Then set `latest_views: true` in db_conn.yaml and regenerate the dashboards, and keep the views fresh with `views/refresh_views.py`.
+
+Usage: python views/create_views.py [--apply]
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the DDL of the materialized latest row views.")
+    parser.add_argument("--apply", action="store_true", help="also run the DDL with psql")
+    args = parser.parse_args()
+
+    views = collect_latest_views(load_dashboard_jobs())
+
+    sql = ["-- Materialized latest row views, generated by views/create_views.py\n"]
+    for view in views:
+        sql.append(f"-- {view.table}: read by {view.uses} queries")
+        sql.append(view.create_sql(grant_to=settings.DB_USER) + "\n")
+    sql = "\n".join(sql)
+
+    os.makedirs(os.path.dirname(LATEST_VIEWS_SQL_PATH), exist_ok=True)
+    with open(LATEST_VIEWS_SQL_PATH, 'w') as f:
+        f.write(sql)
+    print(f"[Views] Saved {len(views)} views to {LATEST_VIEWS_SQL_PATH}")
+
+    if args.apply:
+        result = run_psql(sql)
+        if result.returncode != 0:
+            print(f"[ERROR] Failed to create the views | Reason: {result.stderr.strip()}")
+            sys.exit(1)
+        print(f"[Views] Created {len(views)} views")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import re
+import sys
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool.helper import *
+from tool.latest_views import LatestView, run_psql
+
+"""
+This script refreshes the materialized "latest row" views listed in `views/latest_views.sql`. -> views/create_views.py
+    - Each view is refreshed `CONCURRENTLY`, so the dashboards can still read it, and on its own, so one failure does not stop the others.
+    - `--every SECONDS` keeps refreshing on a schedule; without it the views are refreshed once (e.g. from cron).
+    - `--blocking` refreshes without `CONCURRENTLY`: faster, but locks the view. Needed once if a view was created `WITH NO DATA`.
+
+Usage: python views/refresh_views.py [--every SECONDS] [--blocking]
+"""
+
+def load_view_names(sql_path: str = LATEST_VIEWS_SQL_PATH) -> list:
+    """Read the view names from the DDL written by create_views.py.
+    """
+    if not os.path.exists(sql_path):
+        raise FileNotFoundError(f"[Views] File not found: {sql_path}, run views/create_views.py first")
+    with open(sql_path, 'r') as f:
+        return re.findall(r"CREATE MATERIALIZED VIEW IF NOT EXISTS (\w+)", f.read())
+
+def refresh_views(view_names: list, concurrently: bool = True) -> int:
+    """Refresh every view, return the number of failures.
+    """
+    failures = 0
+
+    for name in view_names:
+        view = LatestView(name[len(LATEST_VIEW_PREFIX):], [], [])
+        start = time.perf_counter()
+        result = run_psql(view.refresh_sql(concurrently))
+        elapsed = time.perf_counter() - start
+
+        if result.returncode != 0:
+            failures += 1
+            print(f"[ERROR] Failed to refresh {name} | Reason: {result.stderr.strip()}")
+        else:
+            print(f"[Views] Refreshed {name} in {elapsed:.2f} s")
+
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the materialized latest row views.")
+    parser.add_argument("--every", type=float, metavar="SECONDS", help="keep refreshing on this schedule (default: once)")
+    parser.add_argument("--blocking", action="store_true", help="refresh without CONCURRENTLY")
+    args = parser.parse_args()
+
+    view_names = load_view_names()
+
+    while True:
+        failures = refresh_views(view_names, concurrently=not args.blocking)
+        if args.every is None:
+            sys.exit(1 if failures else 0)
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()